@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Anomaly
+from .models import Anomaly, AnomalyState
 
 
 @admin.register(Anomaly)
@@ -11,3 +11,13 @@ class AnomalyAdmin(admin.ModelAdmin):
     )
     list_filter = ("anomaly_type", "severity", "is_resolved")
     search_fields = ("title", "meter__mpan")
+
+
+@admin.register(AnomalyState)
+class AnomalyStateAdmin(admin.ModelAdmin):
+    list_display = ("meter", "count", "mean", "last_value", "last_reading_at", "updated_at")
+    search_fields = ("meter__mpan",)
+    readonly_fields = (
+        "count", "mean", "variance", "last_value", "last_reading_at",
+        "streak_start_at", "streak_reported", "updated_at",
+    )
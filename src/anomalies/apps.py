@@ -5,3 +5,5 @@ class AnomaliesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "anomalies"
 
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,237 @@
+"""
+Management command checking and benchmarking the vectorised anomaly detector.
+
+For each lookback window it generates synthetic half-hourly readings with
+spikes, drops, gaps, flatlines and negative readings, then detects
+anomalies with both:
+
+- the original per-reading implementation (kept here as the reference),
+- anomalies.services.find_anomalies on epoch-second / kWh arrays,
+
+fails unless both give the same anomalies in the same order (type,
+severity, title, description, time and values), and reports the time each
+takes: the numpy column includes building the arrays from the readings,
+the detect column is find_anomalies alone. Nothing touches the database.
+
+Usage:
+    python manage.py benchmark_anomalies
+    python manage.py benchmark_anomalies --lookbacks 7 30 365 --repeat 5 --seed 1
+"""
+
+import random
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from anomalies.models import Anomaly
+from anomalies.services import find_anomalies
+from customers.models import Meter
+from forecasting.profile import epoch_seconds
+from metering.models import MeterReading
+
+FIELDS = ("anomaly_type", "severity", "title", "description", "detected_at", "value_kwh", "expected_kwh")
+PLACES = Decimal("0.0001")
+
+
+def legacy_anomalies(meter, readings, spike_threshold=3.0):
+    """
+    The per-reading detect_anomalies passes as they were before
+    vectorisation, over MeterReading instances oldest first.
+    """
+    if len(readings) < 10:
+        return []
+
+    anomalies = []
+
+    values = [float(r.value_kwh) for r in readings]
+    mean = sum(values) / len(values)
+    variance = sum((v - mean) ** 2 for v in values) / len(values)
+    std_dev = variance ** 0.5
+
+    if std_dev == 0:
+        std_dev = 0.01
+
+    for reading in readings:
+        val = float(reading.value_kwh)
+        z_score = abs(val - mean) / std_dev
+
+        if z_score > spike_threshold:
+            anomaly_type = "spike" if val > mean else "drop"
+            severity = "critical" if z_score > 5.0 else "warning"
+
+            anomalies.append(Anomaly(
+                meter=meter,
+                anomaly_type=anomaly_type,
+                severity=severity,
+                title=f"Usage {'spike' if val > mean else 'drop'} detected",
+                description=(
+                    f"Reading of {reading.value_kwh} kWh at {reading.reading_at:%Y-%m-%d %H:%M} "
+                    f"is {z_score:.1f} standard deviations from the mean ({mean:.2f} kWh). "
+                    f"This may indicate a faulty meter or unusual consumption."
+                ),
+                detected_at=reading.reading_at,
+                value_kwh=reading.value_kwh,
+                expected_kwh=Decimal(str(round(mean, 4))),
+            ))
+
+    for i in range(1, len(readings)):
+        gap = readings[i].reading_at - readings[i - 1].reading_at
+        if gap > timedelta(hours=2):
+            hours = gap.total_seconds() / 3600
+            anomalies.append(Anomaly(
+                meter=meter,
+                anomaly_type="gap",
+                severity="warning" if hours < 6 else "critical",
+                title=f"Reading gap of {hours:.1f} hours",
+                description=(
+                    f"No readings between {readings[i-1].reading_at:%Y-%m-%d %H:%M} "
+                    f"and {readings[i].reading_at:%Y-%m-%d %H:%M} ({hours:.1f} hours). "
+                    f"This may indicate meter communication issues."
+                ),
+                detected_at=readings[i - 1].reading_at,
+            ))
+
+    streak_start = 0
+    for i in range(1, len(readings)):
+        if readings[i].value_kwh != readings[streak_start].value_kwh:
+            streak_duration = readings[i - 1].reading_at - readings[streak_start].reading_at
+            if streak_duration > timedelta(hours=4):
+                hours = streak_duration.total_seconds() / 3600
+                anomalies.append(Anomaly(
+                    meter=meter,
+                    anomaly_type="flatline",
+                    severity="info",
+                    title=f"Flatline for {hours:.1f} hours",
+                    description=(
+                        f"Constant reading of {readings[streak_start].value_kwh} kWh "
+                        f"from {readings[streak_start].reading_at:%Y-%m-%d %H:%M} "
+                        f"to {readings[i-1].reading_at:%Y-%m-%d %H:%M}. "
+                        f"This may indicate a stuck meter."
+                    ),
+                    detected_at=readings[streak_start].reading_at,
+                    value_kwh=readings[streak_start].value_kwh,
+                ))
+            streak_start = i
+
+    for reading in readings:
+        if reading.value_kwh < 0:
+            anomalies.append(Anomaly(
+                meter=meter,
+                anomaly_type="negative",
+                severity="critical",
+                title="Negative reading detected",
+                description=(
+                    f"Reading of {reading.value_kwh} kWh at {reading.reading_at:%Y-%m-%d %H:%M}. "
+                    f"Negative readings are invalid and may indicate a meter fault."
+                ),
+                detected_at=reading.reading_at,
+                value_kwh=reading.value_kwh,
+                expected_kwh=Decimal(str(round(mean, 4))),
+            ))
+
+    return anomalies
+
+
+def vectorised_anomalies(meter, readings, spike_threshold=3.0):
+    # The same conversion forecasting.readings.reading_arrays makes from database rows
+    timestamps = np.fromiter((epoch_seconds(r.reading_at) for r in readings), dtype=np.int64)
+    values = np.fromiter((float(r.value_kwh) for r in readings), dtype=np.float64)
+    return find_anomalies(meter, timestamps, values, spike_threshold)
+
+
+def synthetic_readings(rng, meter, now, lookback_days):
+    """Half-hourly readings with the occasional spike, drop, gap, flatline and negative value."""
+    readings = []
+    current = now - timedelta(days=lookback_days)
+    stuck_until, stuck_value = None, None
+    while current < now:
+        roll = rng.random()
+        if roll < 0.003:  # a gap of 1–12 hours
+            current += timedelta(minutes=30 * rng.randint(2, 24))
+            continue
+        if stuck_until is None and roll < 0.005:  # a stuck meter for 2–10 hours
+            stuck_until = current + timedelta(minutes=30 * rng.randint(4, 20))
+            stuck_value = Decimal(rng.randrange(1000, 8000)).scaleb(-4)
+
+        if stuck_until is not None and current < stuck_until:
+            value = stuck_value
+        else:
+            stuck_until = None
+            base = 0.3 + 0.5 * (17 <= current.hour < 21)
+            value = Decimal(rng.randrange(int(base * 10**4) // 2, int(base * 10**4) * 2)).scaleb(-4)
+            if roll > 0.998:
+                value *= rng.choice([8, 15])  # spike
+            elif roll > 0.997:
+                value = -value  # negative
+        readings.append(MeterReading(meter=meter, reading_at=current, value_kwh=value.quantize(PLACES)))
+        current += timedelta(minutes=30)
+    return readings
+
+
+class Command(BaseCommand):
+    help = "Verify the vectorised anomaly detector against the original and benchmark both"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--lookbacks",
+            type=int,
+            nargs="+",
+            default=[7, 14, 30, 90, 180, 365],
+            help="Lookback windows in days (default: 7 14 30 90 180 365)",
+        )
+        parser.add_argument("--threshold", type=float, default=3.0, help="Spike z-score (default: 3.0)")
+        parser.add_argument("--repeat", type=int, default=3, help="Timed runs per case, best kept (default: 3)")
+        parser.add_argument("--seed", type=int, default=None, help="Random seed (default: random)")
+
+    def handle(self, *args, **options):
+        seed = options["seed"] if options["seed"] is not None else random.randrange(2**32)
+        rng = random.Random(seed)
+        meter = Meter(mpan="BENCHMARK", fuel_type="electricity")
+        now = datetime(2026, 3, 29, 14, tzinfo=dt_timezone.utc)
+        self.stdout.write(f"Seed: {seed}")
+        self.stdout.write(
+            f"{'lookback':>9} {'readings':>9} {'anomalies':>10} {'legacy':>10} {'numpy':>10} {'speed-up':>9} {'detect':>10}"
+        )
+
+        for lookback in options["lookbacks"]:
+            readings = synthetic_readings(rng, meter, now, lookback)
+            args = (meter, readings, options["threshold"])
+            expected = legacy_anomalies(*args)
+            self._compare(expected, vectorised_anomalies(*args), lookback, seed)
+
+            legacy_secs = self._best(legacy_anomalies, args, options["repeat"])
+            numpy_secs = self._best(vectorised_anomalies, args, options["repeat"])
+            arrays = (
+                meter,
+                np.fromiter((epoch_seconds(r.reading_at) for r in readings), dtype=np.int64),
+                np.fromiter((float(r.value_kwh) for r in readings), dtype=np.float64),
+                options["threshold"],
+            )
+            detect_secs = self._best(find_anomalies, arrays, options["repeat"])
+            self.stdout.write(
+                f"{lookback:>8}d {len(readings):>9} {len(expected):>10} "
+                f"{legacy_secs * 1000:>8.1f}ms {numpy_secs * 1000:>8.1f}ms {legacy_secs / numpy_secs:>8.1f}× "
+                f"{detect_secs * 1000:>8.1f}ms"
+            )
+        self.stdout.write(self.style.SUCCESS("All anomalies identical"))
+
+    def _compare(self, expected, actual, lookback, seed):
+        if len(expected) != len(actual):
+            raise CommandError(f"{lookback}d (seed {seed}): {len(expected)} anomalies vs {len(actual)}")
+        for old, new in zip(expected, actual):
+            old_fields = tuple(getattr(old, f) for f in FIELDS)
+            new_fields = tuple(getattr(new, f) for f in FIELDS)
+            if old_fields != new_fields or str(old.value_kwh) != str(new.value_kwh):
+                raise CommandError(f"{lookback}d (seed {seed}): {old_fields} vs {new_fields}")
+
+    def _best(self, func, args, repeat):
+        best = None
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            func(*args)
+            elapsed = time.perf_counter() - t0
+            best = elapsed if best is None else min(best, elapsed)
+        return best
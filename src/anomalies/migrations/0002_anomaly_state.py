@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('anomalies', '0001_initial'),
+        ('customers', '0002_customer_user'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnomalyState',
+            fields=[
+                ('meter', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='anomaly_state', serialize=False, to='customers.meter')),
+                ('count', models.PositiveIntegerField(default=0, help_text='Readings in the statistics, up to the window')),
+                ('mean', models.FloatField(default=0)),
+                ('variance', models.FloatField(default=0)),
+                ('last_value', models.FloatField(blank=True, null=True)),
+                ('last_reading_at', models.DateTimeField(blank=True, null=True)),
+                ('streak_start_at', models.DateTimeField(blank=True, help_text='First reading of the current run of identical values', null=True)),
+                ('streak_reported', models.BooleanField(default=False)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -48,3 +48,29 @@ class Anomaly(models.Model):
 
     def __str__(self):
         return f"[{self.severity.upper()}] {self.title}"
+
+
+class AnomalyState(models.Model):
+    """
+    Rolling reading statistics for a meter, advanced as readings are
+    ingested so anomalies are found without rescanning (see
+    anomalies.streaming).
+    """
+
+    meter = models.OneToOneField(
+        Meter, on_delete=models.CASCADE, primary_key=True, related_name="anomaly_state"
+    )
+    count = models.PositiveIntegerField(default=0, help_text="Readings in the statistics, up to the window")
+    mean = models.FloatField(default=0)
+    variance = models.FloatField(default=0)
+    last_value = models.FloatField(null=True, blank=True)
+    last_reading_at = models.DateTimeField(null=True, blank=True)
+    streak_start_at = models.DateTimeField(
+        null=True, blank=True,
+        help_text="First reading of the current run of identical values",
+    )
+    streak_reported = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Anomaly state {self.meter.mpan} @ {self.last_reading_at:%Y-%m-%d %H:%M}"
@@ -5,22 +5,49 @@ Detects unusual patterns in meter readings using statistical methods:
 - Spikes/drops: readings > 3 standard deviations from the mean
 - Gaps: missing readings for > 2 hours
 - Flatlines: identical readings for > 4 hours
+
+detect_anomalies(meter_id, lookback_days)  → saved Anomaly records
+find_anomalies(meter, timestamps, values)  → unsaved Anomaly records for
+                                             readings given as arrays
+
+Readings are handled as two arrays, int64 epoch seconds and float64 kWh
+(see forecasting.readings), and every rule is a NumPy expression: z-scores
+over the whole array, gaps from np.diff, flatlines as run lengths. The
+anomalies, and their order, are those of the original per-reading loops.
+The mean and variance are correctly rounded sums (math.fsum), so they do
+not depend on summation order or on how the Python version's sum() adds
+floats.
 """
 
 import logging
-from collections import defaultdict
-from datetime import timedelta
+import math
+from datetime import datetime, timedelta, timezone as dt_timezone
 from decimal import Decimal
 
+import numpy as np
 from django.utils import timezone
 
 from customers.models import Meter
+from forecasting.readings import reading_arrays
 from metering.models import MeterReading
 
 from .models import Anomaly
 
 logger = logging.getLogger(__name__)
 
+MIN_READINGS = 10
+GAP_SECONDS = 2 * 3600
+FLATLINE_SECONDS = 4 * 3600
+
+
+def _at(ts) -> datetime:
+    return datetime.fromtimestamp(int(ts), tz=dt_timezone.utc)
+
+
+def _kwh(value) -> Decimal:
+    # MeterReading.value_kwh has 4 decimal places, so this is the stored Decimal
+    return Decimal(f"{value:.4f}")
+
 
 def detect_anomalies(
     meter_id: str,
@@ -36,115 +63,138 @@ def detect_anomalies(
     now = timezone.now()
     since = now - timedelta(days=lookback_days)
 
-    readings = list(
+    timestamps, values = reading_arrays(
         MeterReading.objects.filter(
             meter=meter,
             reading_at__gte=since,
-        ).order_by("reading_at")
+        )
     )
 
-    if len(readings) < 10:
+    anomalies = find_anomalies(meter, timestamps, values, spike_threshold)
+    if anomalies:
+        Anomaly.objects.bulk_create(anomalies)
+        logger.info(
+            "Detected %d anomalies for meter %s",
+            len(anomalies), meter.mpan,
+        )
+
+    return anomalies
+
+
+def find_anomalies(
+    meter: Meter,
+    timestamps: np.ndarray,
+    values: np.ndarray,
+    spike_threshold: float = 3.0,
+) -> list[Anomaly]:
+    """Anomalies (unsaved) in readings given oldest first as epoch seconds and kWh."""
+    ts = np.asarray(timestamps, dtype=np.int64)
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) < MIN_READINGS:
         return []
 
     anomalies = []
 
     # ── Stats ────────────────────────────────────────────────────────────
-    values = [float(r.value_kwh) for r in readings]
-    mean = sum(values) / len(values)
-    variance = sum((v - mean) ** 2 for v in values) / len(values)
+    mean = math.fsum(values.tolist()) / len(values)
+    variance = math.fsum(((values - mean) ** 2).tolist()) / len(values)
     std_dev = variance ** 0.5
 
     if std_dev == 0:
         std_dev = 0.01  # avoid division by zero
 
     # ── 1. Spikes and Drops ──────────────────────────────────────────────
-    for reading in readings:
-        val = float(reading.value_kwh)
-        z_score = abs(val - mean) / std_dev
-
-        if z_score > spike_threshold:
-            anomaly_type = "spike" if val > mean else "drop"
-            severity = "critical" if z_score > 5.0 else "warning"
-
-            anomalies.append(Anomaly(
-                meter=meter,
-                anomaly_type=anomaly_type,
-                severity=severity,
-                title=f"Usage {'spike' if val > mean else 'drop'} detected",
-                description=(
-                    f"Reading of {reading.value_kwh} kWh at {reading.reading_at:%Y-%m-%d %H:%M} "
-                    f"is {z_score:.1f} standard deviations from the mean ({mean:.2f} kWh). "
-                    f"This may indicate a faulty meter or unusual consumption."
-                ),
-                detected_at=reading.reading_at,
-                value_kwh=reading.value_kwh,
-                expected_kwh=Decimal(str(round(mean, 4))),
-            ))
+    z_scores = np.abs(values - mean) / std_dev
+    for i in np.flatnonzero(z_scores > spike_threshold).tolist():
+        anomalies.append(spike_anomaly(_at(ts[i]), float(values[i]), float(z_scores[i]), mean, meter=meter))
 
     # ── 2. Gaps (missing readings > 2 hours) ─────────────────────────────
-    for i in range(1, len(readings)):
-        gap = readings[i].reading_at - readings[i - 1].reading_at
-        if gap > timedelta(hours=2):
-            hours = gap.total_seconds() / 3600
-            anomalies.append(Anomaly(
-                meter=meter,
-                anomaly_type="gap",
-                severity="warning" if hours < 6 else "critical",
-                title=f"Reading gap of {hours:.1f} hours",
-                description=(
-                    f"No readings between {readings[i-1].reading_at:%Y-%m-%d %H:%M} "
-                    f"and {readings[i].reading_at:%Y-%m-%d %H:%M} ({hours:.1f} hours). "
-                    f"This may indicate meter communication issues."
-                ),
-                detected_at=readings[i - 1].reading_at,
-            ))
+    gaps = np.diff(ts)
+    for i in np.flatnonzero(gaps > GAP_SECONDS).tolist():
+        anomalies.append(gap_anomaly(_at(ts[i]), _at(ts[i + 1]), meter=meter))
 
     # ── 3. Flatlines (identical readings > 4 hours) ──────────────────────
-    streak_start = 0
-    for i in range(1, len(readings)):
-        if readings[i].value_kwh != readings[streak_start].value_kwh:
-            # Check if streak was long enough
-            streak_duration = readings[i - 1].reading_at - readings[streak_start].reading_at
-            if streak_duration > timedelta(hours=4):
-                hours = streak_duration.total_seconds() / 3600
-                anomalies.append(Anomaly(
-                    meter=meter,
-                    anomaly_type="flatline",
-                    severity="info",
-                    title=f"Flatline for {hours:.1f} hours",
-                    description=(
-                        f"Constant reading of {readings[streak_start].value_kwh} kWh "
-                        f"from {readings[streak_start].reading_at:%Y-%m-%d %H:%M} "
-                        f"to {readings[i-1].reading_at:%Y-%m-%d %H:%M}. "
-                        f"This may indicate a stuck meter."
-                    ),
-                    detected_at=readings[streak_start].reading_at,
-                    value_kwh=readings[streak_start].value_kwh,
-                ))
-            streak_start = i
+    # Runs of equal values; a run still going at the last reading is not reported
+    ends = np.flatnonzero(values[1:] != values[:-1])  # last index of each finished run
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    long = ts[ends] - ts[starts] > FLATLINE_SECONDS
+    for start, end in zip(starts[long].tolist(), ends[long].tolist()):
+        anomalies.append(flatline_anomaly(_at(ts[start]), _at(ts[end]), float(values[start]), meter=meter))
 
     # ── 4. Negative readings ─────────────────────────────────────────────
-    for reading in readings:
-        if reading.value_kwh < 0:
-            anomalies.append(Anomaly(
-                meter=meter,
-                anomaly_type="negative",
-                severity="critical",
-                title="Negative reading detected",
-                description=(
-                    f"Reading of {reading.value_kwh} kWh at {reading.reading_at:%Y-%m-%d %H:%M}. "
-                    f"Negative readings are invalid and may indicate a meter fault."
-                ),
-                detected_at=reading.reading_at,
-                value_kwh=reading.value_kwh,
-                expected_kwh=Decimal(str(round(mean, 4))),
-            ))
-
-    if anomalies:
-        Anomaly.objects.bulk_create(anomalies)
-        logger.info(
-            "Detected %d anomalies for meter %s",
-            len(anomalies), meter.mpan,
-        )
+    for i in np.flatnonzero(values < 0).tolist():
+        anomalies.append(negative_anomaly(_at(ts[i]), float(values[i]), mean, meter=meter))
 
     return anomalies
+
+
+# ---------------------------------------------------------------------------
+# Anomaly records, shared with anomalies.streaming. ``owner`` is meter=
+# or meter_id=.
+# ---------------------------------------------------------------------------
+def spike_anomaly(at: datetime, value: float, z_score: float, mean: float, **owner) -> Anomaly:
+    kind = "spike" if value > mean else "drop"
+    return Anomaly(
+        **owner,
+        anomaly_type=kind,
+        severity="critical" if z_score > 5.0 else "warning",
+        title=f"Usage {kind} detected",
+        description=(
+            f"Reading of {_kwh(value)} kWh at {at:%Y-%m-%d %H:%M} "
+            f"is {z_score:.1f} standard deviations from the mean ({mean:.2f} kWh). "
+            f"This may indicate a faulty meter or unusual consumption."
+        ),
+        detected_at=at,
+        value_kwh=_kwh(value),
+        expected_kwh=Decimal(str(round(mean, 4))),
+    )
+
+
+def gap_anomaly(last: datetime, at: datetime, **owner) -> Anomaly:
+    hours = (at - last).total_seconds() / 3600
+    return Anomaly(
+        **owner,
+        anomaly_type="gap",
+        severity="warning" if hours < 6 else "critical",
+        title=f"Reading gap of {hours:.1f} hours",
+        description=(
+            f"No readings between {last:%Y-%m-%d %H:%M} "
+            f"and {at:%Y-%m-%d %H:%M} ({hours:.1f} hours). "
+            f"This may indicate meter communication issues."
+        ),
+        detected_at=last,
+    )
+
+
+def flatline_anomaly(start: datetime, end: datetime, value: float, **owner) -> Anomaly:
+    hours = (end - start).total_seconds() / 3600
+    return Anomaly(
+        **owner,
+        anomaly_type="flatline",
+        severity="info",
+        title=f"Flatline for {hours:.1f} hours",
+        description=(
+            f"Constant reading of {_kwh(value)} kWh "
+            f"from {start:%Y-%m-%d %H:%M} "
+            f"to {end:%Y-%m-%d %H:%M}. "
+            f"This may indicate a stuck meter."
+        ),
+        detected_at=start,
+        value_kwh=_kwh(value),
+    )
+
+
+def negative_anomaly(at: datetime, value: float, mean: float, **owner) -> Anomaly:
+    return Anomaly(
+        **owner,
+        anomaly_type="negative",
+        severity="critical",
+        title="Negative reading detected",
+        description=(
+            f"Reading of {_kwh(value)} kWh at {at:%Y-%m-%d %H:%M}. "
+            f"Negative readings are invalid and may indicate a meter fault."
+        ),
+        detected_at=at,
+        value_kwh=_kwh(value),
+        expected_kwh=Decimal(str(round(mean, 4))),
+    )
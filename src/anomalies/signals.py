@@ -0,0 +1,14 @@
+"""
+Signal handlers for anomalies.
+"""
+
+from django.dispatch import receiver
+
+from metering.signals import readings_ingested
+
+
+@receiver(readings_ingested)
+def detect_ingested_anomalies(sender, readings, replaced=(), **kwargs):
+    from .streaming import detect_ingested
+
+    detect_ingested(readings)
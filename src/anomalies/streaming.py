@@ -0,0 +1,194 @@
+"""
+Streaming anomaly detection at ingestion.
+
+observe(stats, timestamp, value, meter_id)  → anomalies for one reading,
+                                              with stats advanced in O(1)
+detect_ingested(readings)                   → saved anomalies for a batch
+                                              of newly ingested readings
+
+Each meter keeps an AnomalyState: a rolling mean and variance, the last
+reading and the start of the current run of identical values. Every
+reading is checked against it by the rules of anomalies.services:
+
+- spike/drop: more than SPIKE_THRESHOLD standard deviations from the
+  rolling mean (once MIN_READINGS readings are in the statistics),
+- gap: more than 2 hours since the previous reading,
+- flatline: the same value for more than 4 hours, reported once, as soon
+  as the run passes 4 hours rather than when it ends,
+- negative: below zero.
+
+The statistics are Welford's running mean and variance with the count
+capped at STATS_WINDOW (7 days of half-hours); beyond that each reading
+carries weight 1/STATS_WINDOW, so they follow roughly the last week like
+the scheduled detector's window. A meter's state is seeded from that
+window of history before its first ingested reading the first time it is
+seen. Readings at or before a meter's last reading (late arrivals,
+corrections) are only checked for negative values.
+
+The readings_ingested receiver (anomalies.signals) runs this for every
+ingestion batch, writing its anomalies with one bulk insert.
+"""
+
+import logging
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+
+from forecasting.profile import epoch_seconds
+from forecasting.readings import readings_in_windows
+
+from .models import Anomaly, AnomalyState
+from .services import (
+    FLATLINE_SECONDS,
+    GAP_SECONDS,
+    MIN_READINGS,
+    flatline_anomaly,
+    gap_anomaly,
+    negative_anomaly,
+    spike_anomaly,
+)
+
+logger = logging.getLogger(__name__)
+
+SPIKE_THRESHOLD = 3.0
+SEED_DAYS = 7
+STATS_WINDOW = SEED_DAYS * 48  # half-hours
+STATE_FIELDS = [
+    "count", "mean", "variance", "last_value", "last_reading_at",
+    "streak_start_at", "streak_reported", "updated_at",
+]
+
+
+@dataclass
+class MeterStats:
+    count: int = 0
+    mean: float = 0.0
+    variance: float = 0.0
+    last_value: float | None = None
+    last_ts: int | None = None
+    streak_start: int | None = None
+    streak_reported: bool = False
+
+
+def _at(ts: int) -> datetime:
+    return datetime.fromtimestamp(ts, tz=dt_timezone.utc)
+
+
+def observe(stats: MeterStats, timestamp: int, value: float, meter_id) -> list[Anomaly]:
+    """Check one reading against the meter's statistics, then add it to them."""
+    anomalies = []
+    if value < 0:
+        anomalies.append(negative_anomaly(_at(timestamp), value, stats.mean, meter_id=meter_id))
+    if stats.last_ts is not None and timestamp <= stats.last_ts:
+        return anomalies
+
+    # ── Gap and flatline, against the previous reading ──────────────────
+    if stats.last_ts is not None and timestamp - stats.last_ts > GAP_SECONDS:
+        anomalies.append(gap_anomaly(_at(stats.last_ts), _at(timestamp), meter_id=meter_id))
+    if value == stats.last_value:
+        if not stats.streak_reported and timestamp - stats.streak_start > FLATLINE_SECONDS:
+            anomalies.append(flatline_anomaly(_at(stats.streak_start), _at(timestamp), value, meter_id=meter_id))
+            stats.streak_reported = True
+    else:
+        stats.streak_start, stats.streak_reported = timestamp, False
+
+    # ── Spike or drop, against the rolling mean ─────────────────────────
+    if stats.count >= MIN_READINGS:
+        z_score = abs(value - stats.mean) / (stats.variance ** 0.5 or 0.01)
+        if z_score > SPIKE_THRESHOLD:
+            anomalies.append(spike_anomaly(_at(timestamp), value, z_score, stats.mean, meter_id=meter_id))
+
+    # ── Welford update, the count capped at the window ──────────────────
+    n = min(stats.count + 1, STATS_WINDOW)
+    delta = value - stats.mean
+    stats.mean += delta / n
+    stats.variance = (1 - 1 / n) * (stats.variance + delta * delta / n)
+    stats.count = n
+    stats.last_value, stats.last_ts = value, timestamp
+    return anomalies
+
+
+def _seed(timestamps: np.ndarray, values: np.ndarray) -> MeterStats:
+    """Statistics over the last STATS_WINDOW readings of a history, oldest first."""
+    recent = values[-STATS_WINDOW:]
+    changed = np.flatnonzero(values != values[-1])
+    streak_start = int(timestamps[changed[-1] + 1]) if len(changed) else int(timestamps[0])
+    return MeterStats(
+        count=len(recent),
+        mean=float(recent.mean()),
+        variance=float(recent.var()),
+        last_value=float(values[-1]),
+        last_ts=int(timestamps[-1]),
+        streak_start=streak_start,
+    )
+
+
+def _from_row(row: AnomalyState) -> MeterStats:
+    return MeterStats(
+        count=row.count,
+        mean=row.mean,
+        variance=row.variance,
+        last_value=row.last_value,
+        last_ts=epoch_seconds(row.last_reading_at) if row.last_reading_at else None,
+        streak_start=epoch_seconds(row.streak_start_at) if row.streak_start_at else None,
+        streak_reported=row.streak_reported,
+    )
+
+
+def _to_row(row: AnomalyState, stats: MeterStats) -> AnomalyState:
+    row.count = stats.count
+    row.mean = stats.mean
+    row.variance = stats.variance
+    row.last_value = stats.last_value
+    row.last_reading_at = _at(stats.last_ts) if stats.last_ts is not None else None
+    row.streak_start_at = _at(stats.streak_start) if stats.streak_start is not None else None
+    row.streak_reported = stats.streak_reported
+    row.updated_at = timezone.now()
+    return row
+
+
+def detect_ingested(readings) -> list[Anomaly]:
+    """Advance the meters' states by newly ingested readings and save the anomalies found."""
+    by_meter = defaultdict(list)
+    for reading in readings:
+        by_meter[reading.meter_id].append((epoch_seconds(reading.reading_at), float(reading.value_kwh)))
+    if not by_meter:
+        return []
+
+    # ── 1. Seed states for meters seen for the first time ───────────────
+    known = AnomalyState.objects.filter(meter_id__in=list(by_meter)).values_list("meter_id", flat=True)
+    new = set(by_meter) - set(known)
+    if new:
+        # Each up to its own first ingested reading, all in one query
+        windows = {}
+        for meter_id in new:
+            until = _at(min(ts for ts, _ in by_meter[meter_id]))
+            windows[meter_id] = (until - timedelta(days=SEED_DAYS), until)
+        seeded = {
+            meter_id: _seed(timestamps, values)
+            for meter_id, timestamps, values in readings_in_windows(windows)
+        }
+        AnomalyState.objects.bulk_create(
+            [_to_row(AnomalyState(meter_id=m), seeded.get(str(m), MeterStats())) for m in new],
+            ignore_conflicts=True,
+        )
+
+    # ── 2. Apply the readings in time order, then save ──────────────────
+    anomalies = []
+    with transaction.atomic():
+        rows = list(AnomalyState.objects.select_for_update().filter(meter_id__in=list(by_meter)))
+        for row in rows:
+            stats = _from_row(row)
+            for timestamp, value in sorted(by_meter[row.meter_id]):
+                anomalies += observe(stats, timestamp, value, row.meter_id)
+            _to_row(row, stats)
+        AnomalyState.objects.bulk_update(rows, STATE_FIELDS)
+        Anomaly.objects.bulk_create(anomalies)
+
+    if anomalies:
+        logger.info("Detected %d anomalies at ingestion across %d meters", len(anomalies), len(by_meter))
+    return anomalies
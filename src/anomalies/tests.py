@@ -0,0 +1,137 @@
+import random
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from customers.models import Customer, Meter, Property
+from metering.models import MeterReading
+
+from .management.commands.benchmark_anomalies import (
+    FIELDS,
+    legacy_anomalies,
+    synthetic_readings,
+    vectorised_anomalies,
+)
+from .models import Anomaly, AnomalyState
+from .streaming import detect_ingested
+
+LOCMEM_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+NOW = datetime(2026, 3, 29, 14, tzinfo=dt_timezone.utc)
+
+
+def fields(anomalies):
+    return [tuple(getattr(a, f) for f in FIELDS) + (str(a.value_kwh),) for a in anomalies]
+
+
+class FindAnomaliesTests(SimpleTestCase):
+    """find_anomalies gives exactly the anomalies of the original per-reading loops."""
+
+    meter = Meter(mpan="19000000001", fuel_type="electricity")
+
+    def readings(self, seed, lookback_days):
+        # Seeded spikes, drops, gaps, flatlines and negatives, then a flatline still running at the end
+        readings = synthetic_readings(random.Random(seed), self.meter, NOW, lookback_days)
+        readings += [
+            MeterReading(meter=self.meter, reading_at=NOW + timedelta(minutes=30 * i), value_kwh=Decimal("0.4321"))
+            for i in range(12)
+        ]
+        return readings
+
+    def test_matches_the_original_loops(self):
+        seen = set()
+        for seed in range(8):
+            for lookback_days in (7, 30, 90):
+                with self.subTest(seed=seed, lookback_days=lookback_days):
+                    readings = self.readings(seed, lookback_days)
+                    expected = legacy_anomalies(self.meter, readings)
+                    self.assertEqual(fields(vectorised_anomalies(self.meter, readings)), fields(expected))
+                    seen.update(a.anomaly_type for a in expected)
+                    # The run still going at the last reading is not reported
+                    self.assertFalse(any(a.anomaly_type == "flatline" and a.detected_at == NOW for a in expected))
+        self.assertEqual(seen, {"spike", "drop", "gap", "flatline", "negative"})
+
+    def test_too_few_readings(self):
+        readings = self.readings(0, 7)[-9:]
+        self.assertEqual(vectorised_anomalies(self.meter, readings), [])
+        self.assertEqual(legacy_anomalies(self.meter, readings), [])
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class DetectIngestedTests(TestCase):
+    def setUp(self):
+        customer = Customer.objects.create(
+            account_number="GG-TEST-1", first_name="Test", last_name="Customer", email="test1@example.com",
+        )
+        self.property = Property.objects.create(
+            customer=customer, address_line_1="1 Test Street", city="London", postcode="SW1A 1AA",
+        )
+        self.meter = self.make_meter("19000000001")
+        # Three days of varied history up to NOW
+        self.history = self.save(self.meter, [
+            (NOW - timedelta(minutes=30 * i), Decimal(3000 + i * 37 % 11 * 100).scaleb(-4)) for i in range(144, 0, -1)
+        ])
+
+    def make_meter(self, mpan):
+        return Meter.objects.create(property=self.property, mpan=mpan, serial_number=mpan, fuel_type="electricity")
+
+    def save(self, meter, points):
+        return MeterReading.objects.bulk_create(
+            [MeterReading(meter=meter, reading_at=at, value_kwh=value) for at, value in points]
+        )
+
+    def ingest(self, meter, points):
+        return detect_ingested(self.save(meter, points))
+
+    def half_hours(self, start, count, value="0.3500"):
+        return [(NOW + timedelta(minutes=30 * (start + i)), Decimal(value)) for i in range(count)]
+
+    def test_first_sight_seeds_from_history_before_the_batch(self):
+        self.assertEqual(self.ingest(self.meter, self.half_hours(0, 1)), [])
+
+        state = AnomalyState.objects.get(meter=self.meter)
+        self.assertEqual(state.count, len(self.history) + 1)
+        self.assertEqual((state.last_reading_at, state.last_value), (NOW, 0.35))
+
+    def test_new_meters_are_seeded_in_one_query(self):
+        other = self.make_meter("19000000002")
+        self.save(other, [(NOW - timedelta(days=1, minutes=30 * i), Decimal("0.3000")) for i in range(12)])
+        batch = self.save(self.meter, self.half_hours(0, 1)) + self.save(other, self.half_hours(-40, 1))
+
+        with CaptureQueriesContext(connection) as queries:
+            detect_ingested(batch)
+        scans = [q for q in queries if MeterReading._meta.db_table in q["sql"]]
+        self.assertEqual(len(scans), 1)
+        self.assertEqual(AnomalyState.objects.get(meter=self.meter).count, len(self.history) + 1)
+        # The other meter's history runs up to its own first ingested reading
+        self.assertEqual(AnomalyState.objects.get(meter=other).count, 13)
+
+    def test_gap(self):
+        (gap,) = self.ingest(self.meter, self.half_hours(6, 1))
+        self.assertEqual(gap.anomaly_type, "gap")
+        self.assertEqual(gap.detected_at, self.history[-1].reading_at)
+        self.assertEqual(gap.title, "Reading gap of 3.5 hours")
+
+    def test_flatline_is_reported_once(self):
+        found = self.ingest(self.meter, self.half_hours(0, 12)) + self.ingest(self.meter, self.half_hours(12, 4))
+
+        (flatline,) = found
+        self.assertEqual(flatline.anomaly_type, "flatline")
+        self.assertEqual(flatline.detected_at, NOW)
+        self.assertEqual(Anomaly.objects.filter(meter=self.meter).count(), 1)
+
+    def test_late_reading_does_not_advance_the_state(self):
+        self.ingest(self.meter, self.half_hours(0, 2))
+        before = AnomalyState.objects.get(meter=self.meter)
+
+        late = [(NOW - timedelta(days=5), Decimal("0.3500")), (NOW - timedelta(days=4), Decimal("-0.1000"))]
+        (negative,) = self.ingest(self.meter, late)
+
+        self.assertEqual(negative.anomaly_type, "negative")
+        after = AnomalyState.objects.get(meter=self.meter)
+        self.assertEqual(
+            (after.count, after.mean, after.last_reading_at, after.streak_start_at),
+            (before.count, before.mean, before.last_reading_at, before.streak_start_at),
+        )
@@ -0,0 +1,225 @@
+"""
+Accrued-to-date running balances.
+
+record_readings(readings)
+  → folds newly ingested readings into each customer's Accrual for the
+    open period (the current calendar month), one locked update per batch.
+accrual_statement(accrual, as_of)
+  → priced breakdown: usage per band plus standing charge to date, priced
+    exactly as generate_bill(period_start, as_of) would.
+reconcile_accruals()
+  → nightly: recomputes every open accrual from readings with the batch
+    engine (nothing persisted but the accruals) and closes past periods.
+"""
+
+import calendar
+import logging
+from datetime import date, datetime, time as dtime, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from customers.models import Meter
+from tariffs.assignments import resolve_assignments
+from tariffs.lookup import get_compiled_tariff, get_compiled_tariffs
+from tariffs.models import Tariff
+
+from .batch import calculate_bills
+from .models import Accrual
+from .services import calculate_line_items, summarise_line_items
+
+logger = logging.getLogger(__name__)
+
+
+def open_period(today: date | None = None) -> tuple[date, date]:
+    """The calendar month currently accruing."""
+    today = today or timezone.localdate()
+    last_day = calendar.monthrange(today.year, today.month)[1]
+    return today.replace(day=1), today.replace(day=last_day)
+
+
+def record_readings(readings, replaced=()) -> int:
+    """
+    Add freshly ingested readings to the open period's accruals, taking
+    out any readings they replaced. Returns customers updated.
+    """
+    period_start, period_end = open_period()
+    tz = timezone.get_current_timezone()
+    lo = timezone.make_aware(datetime.combine(period_start, dtime.min), tz)
+    hi = timezone.make_aware(datetime.combine(period_end + timedelta(days=1), dtime.min), tz)
+
+    readings = [r for r in readings if lo <= r.reading_at < hi]
+    replaced = [r for r in replaced if lo <= r.reading_at < hi]
+    if not readings and not replaced:
+        return 0
+
+    owners = {
+        meter_id: str(customer_id)
+        for meter_id, customer_id in Meter.objects.filter(
+            pk__in={r.meter_id for r in readings + replaced}
+        ).values_list("id", "property__customer_id")
+    }
+    assignments = resolve_assignments(set(owners.values()), period_start, period_end)
+    compiled = get_compiled_tariffs({a.tariff for a in assignments.values()})
+
+    deltas = {}
+    last_seen = {}
+    for sign, batch in ((1, readings), (-1, replaced)):
+        for reading in batch:
+            cid = owners.get(reading.meter_id)
+            if cid not in assignments:
+                continue
+            tariff = compiled[assignments[cid].tariff_id]
+            idx = tariff.band_index(reading.reading_at) if tariff.is_time_of_use else 0
+            deltas.setdefault(cid, [Decimal("0")] * max(len(tariff.bands), 1))[idx] += sign * reading.value_kwh
+            if sign > 0:
+                last_seen[cid] = max(last_seen.get(cid, reading.reading_at), reading.reading_at)
+
+    if not deltas:
+        return 0
+
+    recompute = []
+    with transaction.atomic():
+        # Create missing rows first so every row can be locked
+        Accrual.objects.bulk_create(
+            [Accrual(customer_id=cid, period_start=period_start, period_end=period_end) for cid in deltas],
+            ignore_conflicts=True,
+        )
+        accruals = Accrual.objects.select_for_update().filter(customer_id__in=list(deltas), period_start=period_start)
+
+        changed = []
+        for accrual in accruals:
+            cid = str(accrual.customer_id)
+            tariff = compiled[assignments[cid].tariff_id]
+            if accrual.band_kwh and (
+                accrual.tariff_id != tariff.tariff_id or len(accrual.band_kwh) != len(deltas[cid])
+            ):
+                recompute.append(cid)  # tariff changed or re-banded mid-period: bands no longer line up
+                continue
+            band_kwh = [Decimal(k) for k in accrual.band_kwh] or [Decimal("0")] * len(deltas[cid])
+            band_kwh = [old + new for old, new in zip(band_kwh, deltas[cid])]
+            if _apply(accrual, tariff, band_kwh):
+                accrual.last_reading_at = max(filter(None, [accrual.last_reading_at, last_seen.get(cid)]), default=None)
+                changed.append(accrual)
+
+        Accrual.objects.bulk_update(
+            changed,
+            ["tariff", "band_kwh", "total_kwh", "usage_charge_pence", "last_reading_at", "updated_at"],
+        )
+
+    if recompute:
+        _reconcile_chunk(recompute, period_start, period_end, timezone.localdate())
+    return len(changed) + len(recompute)
+
+
+def _apply(accrual: Accrual, tariff, band_kwh: list[Decimal]) -> bool:
+    """Store band usage and its usage charge on an accrual (not saved)."""
+    try:
+        line_items = calculate_line_items(tariff, band_kwh, accrual.period_start, accrual.period_end)
+    except ValueError as exc:
+        logger.warning("Cannot accrue for customer %s: %s", accrual.customer_id, exc)
+        return False
+
+    totals = summarise_line_items(line_items)
+    accrual.tariff_id = tariff.tariff_id
+    accrual.band_kwh = [str(k) for k in band_kwh]
+    accrual.total_kwh = totals["total_kwh"]
+    accrual.usage_charge_pence = totals["usage_charge_pence"]
+    accrual.updated_at = timezone.now()
+    return True
+
+
+def accrual_statement(accrual: Accrual, as_of: date | None = None) -> dict:
+    """
+    Cost so far for an accrual, with standing charge up to as_of (default today).
+
+    Raises ValueError if the accrual cannot be priced as stored: its tariff
+    was deleted, or its bands no longer match the tariff's. The nightly
+    reconcile_accruals rebuilds both.
+    """
+    as_of = min(as_of or timezone.localdate(), accrual.period_end)
+    try:
+        tariff = get_compiled_tariff(accrual.tariff_id) if accrual.tariff_id else None
+    except Tariff.DoesNotExist:
+        tariff = None
+    if tariff is None:
+        raise ValueError("The accrual's tariff no longer exists; it is rebuilt at the next reconciliation")
+
+    band_kwh = [Decimal(k) for k in accrual.band_kwh]
+    if len(band_kwh) != max(len(tariff.bands), 1):
+        raise ValueError(
+            f"The accrual has {len(band_kwh)} bands but tariff {tariff.code} has {len(tariff.bands)}; "
+            f"it is rebuilt at the next reconciliation"
+        )
+    line_items = calculate_line_items(tariff, band_kwh, accrual.period_start, as_of)
+    totals = summarise_line_items(line_items)
+    return {
+        "customer": str(accrual.customer_id),
+        "tariff": tariff.code,
+        "period_start": accrual.period_start,
+        "period_end": accrual.period_end,
+        "as_of": as_of,
+        "line_items": line_items,
+        **totals,
+        "last_reading_at": accrual.last_reading_at,
+        "updated_at": accrual.updated_at,
+        "reconciled_at": accrual.reconciled_at,
+    }
+
+
+def reconcile_accruals(customer_ids: list[str] | None = None, chunk_size: int = 500) -> dict:
+    """
+    Recompute open-period accruals from readings and close finished periods.
+
+    Returns counts of customers checked, accruals that had drifted, and
+    accruals removed because their period has closed.
+    """
+    from .runs import billable_customer_ids
+
+    today = timezone.localdate()
+    period_start, period_end = open_period(today)
+
+    closed, _ = Accrual.objects.filter(period_start__lt=period_start).delete()
+    if customer_ids is None:
+        customer_ids = billable_customer_ids(period_start, period_end)
+
+    drifted = 0
+    for start in range(0, len(customer_ids), chunk_size):
+        drifted += _reconcile_chunk(customer_ids[start : start + chunk_size], period_start, period_end, today)
+
+    logger.info(
+        "Reconciled %d accruals for %s: %d drifted, %d closed",
+        len(customer_ids), period_start, drifted, closed,
+    )
+    return {"checked": len(customer_ids), "drifted": drifted, "closed": closed}
+
+
+def _reconcile_chunk(customer_ids, period_start: date, period_end: date, today: date) -> int:
+    calculations, _ = calculate_bills(customer_ids, period_start, today)
+    compiled = get_compiled_tariffs({c.tariff_id for c in calculations})
+    now = timezone.now()
+
+    drifted = 0
+    with transaction.atomic():
+        Accrual.objects.bulk_create(
+            [Accrual(customer_id=c.customer_id, period_start=period_start, period_end=period_end) for c in calculations],
+            ignore_conflicts=True,
+        )
+        accruals = {
+            str(a.customer_id): a
+            for a in Accrual.objects.select_for_update().filter(
+                customer_id__in=[c.customer_id for c in calculations], period_start=period_start,
+            )
+        }
+        for calc in calculations:
+            accrual = accruals[calc.customer_id]
+            if accrual.tariff_id != calc.tariff_id or [Decimal(k) for k in accrual.band_kwh] != calc.band_kwh:
+                drifted += 1
+                _apply(accrual, compiled[calc.tariff_id], calc.band_kwh)
+            accrual.reconciled_at = now
+        Accrual.objects.bulk_update(
+            accruals.values(),
+            ["tariff", "band_kwh", "total_kwh", "usage_charge_pence", "updated_at", "reconciled_at"],
+        )
+    return drifted
@@ -1,6 +1,18 @@
 from django.contrib import admin
 
-from .models import Bill, BillLineItem, Payment
+from .models import (
+    Accrual,
+    Bill,
+    BillAdjustment,
+    BillAudit,
+    BillDiscrepancy,
+    BillExport,
+    BillLineItem,
+    BillPDF,
+    BillRun,
+    BillRunChunk,
+    Payment,
+)
 
 
 class BillLineItemInline(admin.TabularInline):
@@ -9,21 +21,109 @@ class BillLineItemInline(admin.TabularInline):
     readonly_fields = ("description", "rate_band_label", "kwh", "rate_pence_per_kwh", "amount_pence")
 
 
+class BillAdjustmentInline(admin.TabularInline):
+    model = BillAdjustment
+    extra = 0
+    fields = (
+        "created_at", "previous_total_amount_pence", "new_total_amount_pence",
+        "kwh_difference", "amount_difference_pence", "applied",
+    )
+    readonly_fields = fields
+    can_delete = False
+
+
+class BillPDFInline(admin.StackedInline):
+    model = BillPDF
+    extra = 0
+    fields = ("status", "file", "content_hash", "error", "requested_at", "rendered_at", "render_seconds")
+    readonly_fields = fields
+    can_delete = False
+
+
 @admin.register(Bill)
 class BillAdmin(admin.ModelAdmin):
     list_display = (
         "id", "customer", "period_start", "period_end",
         "status", "total_kwh", "total_amount_display", "created_at",
     )
-    list_filter = ("status", "period_start", "created_at")
+    list_filter = ("status", "period_start", "created_at", ("stale_since", admin.EmptyFieldListFilter))
     search_fields = ("customer__account_number", "customer__last_name", "id")
-    inlines = [BillLineItemInline]
+    inlines = [BillLineItemInline, BillAdjustmentInline, BillPDFInline]
     date_hierarchy = "created_at"
 
     @admin.display(description="Total (£)")
     def total_amount_display(self, obj):
         return f"£{obj.total_amount_pence / 100:.2f}"
 
+class BillRunChunkInline(admin.TabularInline):
+    model = BillRunChunk
+    extra = 0
+    fields = ("index", "status", "attempts", "billed", "skipped", "failed", "error", "duration_seconds")
+    readonly_fields = fields
+    can_delete = False
+
+
+@admin.register(BillRun)
+class BillRunAdmin(admin.ModelAdmin):
+    list_display = (
+        "id", "period_start", "period_end", "status",
+        "customers_billed", "customers_skipped", "customers_failed",
+        "wall_time_seconds", "customers_per_second", "created_at",
+    )
+    list_filter = ("status", "period_start")
+    readonly_fields = (
+        "status", "total_customers", "chunks_total", "chunks_completed", "chunks_failed",
+        "customers_billed", "customers_skipped", "customers_failed",
+        "started_at", "finished_at", "wall_time_seconds", "customers_per_second",
+    )
+    inlines = [BillRunChunkInline]
+    date_hierarchy = "created_at"
+
+
+class BillDiscrepancyInline(admin.TabularInline):
+    model = BillDiscrepancy
+    extra = 0
+    fields = ("bill", "kind", "stored_total_pence", "expected_total_pence", "difference_pence", "details")
+    readonly_fields = fields
+    can_delete = False
+
+
+@admin.register(BillAudit)
+class BillAuditAdmin(admin.ModelAdmin):
+    list_display = (
+        "id", "status", "period_start", "period_end", "bills_checked",
+        "discrepancies_found", "amount_difference_pence", "started_at", "finished_at",
+    )
+    list_filter = ("status",)
+    readonly_fields = (
+        "status", "bills_total", "bills_checked", "chunks_total", "chunks_completed", "chunks_failed",
+        "discrepancies_found", "amount_difference_pence", "report", "started_at", "finished_at",
+    )
+    inlines = [BillDiscrepancyInline]
+
+
+@admin.register(BillExport)
+class BillExportAdmin(admin.ModelAdmin):
+    list_display = (
+        "id", "status", "period_start", "period_end", "bill_run",
+        "bills_total", "bills_added", "pdfs_rendered", "bills_failed", "created_at",
+    )
+    list_filter = ("status",)
+    readonly_fields = (
+        "status", "bills_total", "pdfs_rendered", "bills_added", "bills_failed",
+        "file", "error", "created_at", "finished_at",
+    )
+    raw_id_fields = ("bill_run",)
+
+
+@admin.register(Accrual)
+class AccrualAdmin(admin.ModelAdmin):
+    list_display = ("customer", "period_start", "tariff", "total_kwh", "usage_charge_pence", "updated_at", "reconciled_at")
+    list_filter = ("period_start",)
+    search_fields = ("customer__account_number",)
+    raw_id_fields = ("customer", "tariff")
+
+
 @admin.register(Payment)
 class PaymentAdmin(admin.ModelAdmin):
     list_display = ("id", "bill", "amount", "status", "created_at")
@@ -0,0 +1,247 @@
+"""
+Billing reconciliation audit.
+
+start_bill_audit(period_start, period_end)
+  → creates a BillAudit, splits the stored bills into chunks and dispatches
+    one Celery task per chunk, spaced out to cap database load.
+audit_bill_chunk(audit_id, bill_ids)
+  → recomputes a chunk of bills in memory with the batch engine (nothing
+    is written but discrepancies) and compares them with what is stored.
+
+A bill is discrepant when any total differs to the penny (kWh to
+MeterReading precision), when its line items differ, or when it can no
+longer be recomputed at all. Issued and paid bills carrying re-billing
+adjustments (billing.rebilling) are compared on their settled totals
+instead: the stored totals and line items are the bill as issued, which
+the adjustments have since corrected.
+
+A chunk that raises records every bill in it as an "error" discrepancy
+and counts as failed. Once every chunk has reported, successfully or
+not, a CSV report of the discrepancies is written to the audit's report
+file and the audit is completed, with errors if any chunk failed.
+"""
+
+import csv
+import io
+import json
+import logging
+from collections import defaultdict
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .batch import KWH_PLACES, calculate_bills
+from .models import Bill, BillAudit, BillDiscrepancy
+from .rebilling import settled_totals
+from .tasks import BATCH_SIZE, audit_bill_chunk_task
+
+logger = logging.getLogger(__name__)
+
+PENNY = Decimal("0.01")
+TOTAL_PLACES = {
+    "total_kwh": KWH_PLACES,
+    "standing_charge_pence": PENNY,
+    "usage_charge_pence": PENNY,
+    "total_amount_pence": PENNY,
+}
+
+
+def start_bill_audit(period_start=None, period_end=None, chunk_size: int = BATCH_SIZE) -> BillAudit:
+    """Create an audit over every non-void bill in range and dispatch its chunks."""
+    bills = Bill.objects.exclude(status="void")
+    if period_start:
+        bills = bills.filter(period_start__gte=period_start)
+    if period_end:
+        bills = bills.filter(period_end__lte=period_end)
+
+    # Chunks never mix periods: each one is a single calculate_bills() call
+    by_period = defaultdict(list)
+    for bill_id, start, end in bills.order_by("period_start", "period_end", "customer_id").values_list(
+        "id", "period_start", "period_end"
+    ):
+        by_period[(start, end)].append(str(bill_id))
+    chunks = [
+        ids[i : i + chunk_size]
+        for ids in by_period.values()
+        for i in range(0, len(ids), chunk_size)
+    ]
+
+    audit = BillAudit.objects.create(
+        period_start=period_start,
+        period_end=period_end,
+        chunk_size=chunk_size,
+        bills_total=sum(len(c) for c in chunks),
+        chunks_total=len(chunks),
+    )
+    if not chunks:
+        _finish_if_done(audit.pk)
+    else:
+        # Stagger chunks so at most BILL_AUDIT_CHUNKS_PER_MINUTE start per minute
+        interval = 60 / settings.BILL_AUDIT_CHUNKS_PER_MINUTE
+        transaction.on_commit(lambda: [
+            audit_bill_chunk_task.apply_async((str(audit.pk), chunk), countdown=round(i * interval, 1))
+            for i, chunk in enumerate(chunks)
+        ])
+
+    logger.info("Bill audit %s: %d bills in %d chunks", audit.pk, audit.bills_total, len(chunks))
+    return audit
+
+
+def audit_bill_chunk(audit_id, bill_ids: list[str]) -> int:
+    """Recompute one chunk of bills and record discrepancies. Returns the number found."""
+    try:
+        return _audit_chunk(audit_id, bill_ids)
+    except Exception as exc:
+        logger.exception("Bill audit %s: chunk of %d bills failed", audit_id, len(bill_ids))
+        _record_chunk_failure(audit_id, bill_ids, exc)
+        raise
+    finally:
+        _finish_if_done(audit_id)
+
+
+def _audit_chunk(audit_id, bill_ids: list[str]) -> int:
+    bills = list(Bill.objects.filter(pk__in=bill_ids).prefetch_related("line_items"))
+    settled = settled_totals(b.pk for b in bills)
+    discrepancies = []
+    by_period = defaultdict(list)
+    for bill in bills:
+        by_period[(bill.period_start, bill.period_end)].append(bill)
+
+    for (period_start, period_end), period_bills in by_period.items():
+        calculations, failures = calculate_bills(
+            [b.customer_id for b in period_bills], period_start, period_end,
+        )
+        expected = {c.customer_id: c for c in calculations}
+        for bill in period_bills:
+            cid = str(bill.customer_id)
+            if cid in expected:
+                discrepancy = compare_bill(bill, expected[cid], settled.get(bill.pk))
+            else:
+                discrepancy = BillDiscrepancy(
+                    bill=bill,
+                    kind="error",
+                    stored_total_pence=bill.total_amount_pence,
+                    details={"error": failures.get(cid, "not recomputed")},
+                )
+            if discrepancy is not None:
+                discrepancy.audit_id = audit_id
+                discrepancies.append(discrepancy)
+
+    difference = sum((d.difference_pence or 0 for d in discrepancies), Decimal("0"))
+    with transaction.atomic():
+        BillDiscrepancy.objects.bulk_create(discrepancies)
+        BillAudit.objects.filter(pk=audit_id).update(
+            bills_checked=F("bills_checked") + len(bills),
+            chunks_completed=F("chunks_completed") + 1,
+            discrepancies_found=F("discrepancies_found") + len(discrepancies),
+            amount_difference_pence=F("amount_difference_pence") + difference,
+        )
+    return len(discrepancies)
+
+
+def _record_chunk_failure(audit_id, bill_ids: list[str], exc: Exception) -> None:
+    """Count a chunk as failed and list each of its bills as an error discrepancy."""
+    error = f"Audit chunk failed: {type(exc).__name__}: {exc}"
+    with transaction.atomic():
+        discrepancies = [
+            BillDiscrepancy(
+                audit_id=audit_id, bill_id=bill_id, kind="error",
+                stored_total_pence=total, details={"error": error},
+            )
+            for bill_id, total in Bill.objects.filter(pk__in=bill_ids).values_list("id", "total_amount_pence")
+        ]
+        BillDiscrepancy.objects.bulk_create(discrepancies)
+        BillAudit.objects.filter(pk=audit_id).update(
+            chunks_failed=F("chunks_failed") + 1,
+            discrepancies_found=F("discrepancies_found") + len(discrepancies),
+        )
+
+
+def compare_bill(bill: Bill, calc, settled: tuple | None = None) -> BillDiscrepancy | None:
+    """
+    Discrepancy between a stored bill and its recomputation, or None if
+    they match. settled is the bill's (total_kwh, total_amount_pence)
+    after re-billing adjustments, if it has any.
+    """
+    stored_totals = {field: getattr(bill, field) for field in TOTAL_PLACES}
+    adjusted = settled is not None and settled != (bill.total_kwh, bill.total_amount_pence)
+    if adjusted:
+        # Only the settled totals are known: the split and line items are as issued
+        stored_totals = dict(zip(("total_kwh", "total_amount_pence"), settled))
+
+    differing = {}
+    for field, stored in stored_totals.items():
+        places = TOTAL_PLACES[field]
+        stored, recomputed = stored.quantize(places), calc.totals[field].quantize(places)
+        if stored != recomputed:
+            differing[field] = [str(stored), str(recomputed)]
+
+    kind = "totals" if differing else None
+    if not differing and not adjusted and _line_item_key(bill.line_items.all()) != _line_item_key(calc.line_items):
+        kind = "line_items"
+    if kind is None:
+        return None
+
+    stored_total = stored_totals["total_amount_pence"]
+    expected_total = calc.totals["total_amount_pence"].quantize(PENNY)
+    return BillDiscrepancy(
+        bill=bill,
+        kind=kind,
+        stored_total_pence=stored_total,
+        expected_total_pence=expected_total,
+        difference_pence=expected_total - stored_total,
+        details={**differing, "adjusted": True} if adjusted else differing,
+    )
+
+
+def _line_item_key(items) -> list[tuple]:
+    def get(item, name):
+        return item[name] if isinstance(item, dict) else getattr(item, name)
+
+    return sorted(
+        (
+            get(li, "description"),
+            get(li, "rate_band_label"),
+            Decimal(get(li, "kwh")).quantize(KWH_PLACES),
+            Decimal(get(li, "amount_pence")).quantize(PENNY),
+        )
+        for li in items
+    )
+
+
+def _finish_if_done(audit_id) -> None:
+    with transaction.atomic():
+        audit = BillAudit.objects.select_for_update().get(pk=audit_id)
+        if audit.status != "running" or audit.chunks_completed + audit.chunks_failed < audit.chunks_total:
+            return
+        audit.status = "completed_with_errors" if audit.chunks_failed else "completed"
+        audit.finished_at = timezone.now()
+        audit.report.save(f"{audit.pk}.csv", ContentFile(write_report(audit)), save=False)
+        audit.save()
+
+    logger.info(
+        "Bill audit %s %s: %d/%d bills checked, %d discrepancies (%s p), %d chunks failed",
+        audit.pk, audit.status, audit.bills_checked, audit.bills_total,
+        audit.discrepancies_found, audit.amount_difference_pence, audit.chunks_failed,
+    )
+
+
+def write_report(audit: BillAudit) -> str:
+    """CSV of an audit's discrepancies, one line per bill."""
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow([
+        "bill_id", "account_number", "period_start", "period_end", "status",
+        "kind", "stored_total_pence", "expected_total_pence", "difference_pence", "details",
+    ])
+    for d in audit.discrepancies.select_related("bill__customer").iterator():
+        writer.writerow([
+            d.bill_id, d.bill.customer.account_number, d.bill.period_start, d.bill.period_end,
+            d.bill.status, d.kind, d.stored_total_pence, d.expected_total_pence,
+            d.difference_pence, json.dumps(d.details, separators=(",", ":"), ensure_ascii=False) if d.details else "",
+        ])
+    return out.getvalue()
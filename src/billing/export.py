@@ -0,0 +1,267 @@
+"""
+Bulk bill PDF export.
+
+export_bills(period_start, period_end, bill_run, statuses)
+  → the bills an export covers.
+queue_missing_pdfs(bills)
+  → queues a worker render for every bill without a current PDF, and
+    returns how many are still pending.
+iter_bills_zip(bills, processes, progress, render_missing)
+  → yields a ZIP of the bills' PDFs chunk by chunk, rendering any PDFs
+    missing from the cache with a process pool as it goes (in-process
+    when processes == 1). With render_missing=False, as the streaming
+    view uses it, only stored PDFs are added and the rest are listed as
+    failures.
+run_bill_export(export_id)
+  → builds a BillExport's ZIP into media storage, recording progress.
+
+Bills are taken in batches: the PDFs a batch is missing are rendered in
+parallel, then the batch is written to the archive before the next batch
+is rendered, so bytes start flowing straight away and nothing but one
+read buffer is ever held in memory. PDFs are already compressed, so
+entries are stored rather than deflated. Bills whose PDF cannot be
+rendered are listed in a failures.csv entry at the end of the archive.
+"""
+
+import csv
+import io
+import logging
+import multiprocessing
+import os
+import tempfile
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.files import File
+from django.db import connections
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Bill, BillExport, BillPDF
+from .pdf import bill_content_hash, render_bill_pdf, request_bill_pdf
+
+logger = logging.getLogger(__name__)
+
+EXPORT_BATCH_SIZE = 100
+READ_CHUNK = 64 * 1024
+DEFAULT_STATUSES = ("issued",)
+
+
+def export_bills(period_start=None, period_end=None, bill_run=None, statuses=DEFAULT_STATUSES):
+    """Bills covered by an export: a bill run, or bills inside a period."""
+    bills = Bill.objects.filter(status__in=list(statuses))
+    if bill_run is not None:
+        bills = bills.filter(bill_run=bill_run)
+    if period_start:
+        bills = bills.filter(period_start__gte=period_start)
+    if period_end:
+        bills = bills.filter(period_end__lte=period_end)
+    return bills.order_by("period_start", "customer__account_number", "id")
+
+
+class _ZipStream(io.RawIOBase):
+    """Unseekable sink for ZipFile; the generator drains it after each write."""
+
+    def __init__(self):
+        self._chunks = deque()
+        self._size = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._size += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._size
+
+    def drain(self):
+        while self._chunks:
+            yield self._chunks.popleft()
+
+
+def queue_missing_pdfs(bills) -> int:
+    """Queue renders for the bills' missing or out-of-date PDFs. Returns how many are pending."""
+    pending = 0
+    for batch in _batches(bills):
+        for bill in batch:
+            if not _has_current_pdf(bill):
+                pending += request_bill_pdf(bill).status == "pending"
+    return pending
+
+
+def iter_bills_zip(bills, processes: int | None = None, progress=None, render_missing: bool = True):
+    """
+    Yield a ZIP archive of the bills' PDFs as bytes chunks.
+
+    progress, if given, is called as progress(event, count) with event one
+    of "rendered", "added" or "failed". With render_missing=False nothing
+    is rendered: bills without a current PDF go to failures.csv.
+    """
+    progress = progress or (lambda event, count: None)
+    sink = _ZipStream()
+    failures = []
+
+    pool = _render_pool(processes if render_missing else 1)
+    with pool as render, zipfile.ZipFile(sink, "w", zipfile.ZIP_STORED) as archive:
+        for batch in _batches(bills):
+            stale = [str(b.pk) for b in batch if not _has_current_pdf(b)]
+            if stale and render_missing:
+                render(stale)
+                progress("rendered", len(stale))
+                documents = {d.bill_id: d for d in BillPDF.objects.filter(bill_id__in=stale)}
+                for bill in batch:
+                    if bill.pk in documents:
+                        bill.pdf = documents[bill.pk]
+            unrendered = set() if render_missing else set(stale)
+
+            for bill in batch:
+                document = getattr(bill, "pdf", None)
+                if document is None or document.status != "ready" or str(bill.pk) in unrendered:
+                    failures.append((bill, (document.error if document else "") or "not rendered"))
+                    progress("failed", 1)
+                    continue
+                with document.file.open("rb") as src, archive.open(_entry_name(bill), "w") as dest:
+                    while chunk := src.read(READ_CHUNK):
+                        dest.write(chunk)
+                        yield from sink.drain()
+                progress("added", 1)
+                yield from sink.drain()
+
+        if failures:
+            archive.writestr("failures.csv", _failures_csv(failures))
+    yield from sink.drain()
+
+
+def _batches(bills):
+    batch = []
+    for bill in bills.select_related("customer", "pdf").prefetch_related("line_items").iterator(
+        chunk_size=EXPORT_BATCH_SIZE
+    ):
+        batch.append(bill)
+        if len(batch) == EXPORT_BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _has_current_pdf(bill: Bill) -> bool:
+    document = getattr(bill, "pdf", None)
+    return (
+        document is not None
+        and document.status == "ready"
+        and bool(document.file)
+        and document.content_hash == bill_content_hash(bill)
+    )
+
+
+def _entry_name(bill: Bill) -> str:
+    return f"{bill.period_start:%Y-%m}/{bill.customer.account_number}_{bill.pk}.pdf"
+
+
+def _failures_csv(failures) -> str:
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(["bill_id", "account_number", "period_start", "period_end", "error"])
+    for bill, error in failures:
+        writer.writerow([bill.pk, bill.customer.account_number, bill.period_start, bill.period_end, error])
+    return out.getvalue()
+
+
+# ---------------------------------------------------------------------------
+# Rendering pool
+# ---------------------------------------------------------------------------
+_inherited_connections = []
+
+
+def _init_render_worker():
+    import django
+
+    django.setup()
+    # A forked worker shares any open connection's socket with the parent:
+    # closing it would end the parent's session mid-iteration. Keep the
+    # inherited handles referenced, never closed, and let Django open its own.
+    for conn in connections.all(initialized_only=True):
+        if conn.connection is not None:
+            _inherited_connections.append(conn.connection)
+            conn.connection = None
+
+
+def _render_one(bill_id: str) -> str:
+    return render_bill_pdf(bill_id).status
+
+
+class _render_pool:
+    """
+    Context manager giving render(bill_ids), backed by a process pool.
+
+    Renders in-process when processes == 1 or when already inside a
+    daemonic process (e.g. a prefork Celery worker), which cannot fork.
+    Workers are started on entry, before the bills are queried, so they
+    inherit no open database connection.
+    """
+
+    def __init__(self, processes: int | None):
+        self.processes = processes or os.cpu_count() or 1
+        self.executor = None
+
+    def __enter__(self):
+        if self.processes > 1 and not multiprocessing.current_process().daemon:
+            connections.close_all()
+            self.executor = ProcessPoolExecutor(max_workers=self.processes, initializer=_init_render_worker)
+            self.executor.submit(os.getpid).result()  # with fork, starts every worker now
+        return self.render
+
+    def __exit__(self, *exc):
+        if self.executor is not None:
+            self.executor.shutdown()
+
+    def render(self, bill_ids: list[str]) -> None:
+        if self.executor is None:
+            for bill_id in bill_ids:
+                _render_one(bill_id)
+        else:
+            list(self.executor.map(_render_one, bill_ids))
+
+
+# ---------------------------------------------------------------------------
+# Stored exports
+# ---------------------------------------------------------------------------
+def run_bill_export(export_id, processes: int | None = None) -> BillExport:
+    """Build a BillExport's ZIP into media storage."""
+    export = BillExport.objects.get(pk=export_id)
+    bills = export_bills(export.period_start, export.period_end, export.bill_run, export.statuses)
+    BillExport.objects.filter(pk=export.pk).update(status="running", bills_total=bills.count())
+
+    counters = {"rendered": "pdfs_rendered", "added": "bills_added", "failed": "bills_failed"}
+
+    def progress(event, count):
+        BillExport.objects.filter(pk=export.pk).update(**{counters[event]: F(counters[event]) + count})
+
+    try:
+        with tempfile.TemporaryFile() as tmp:
+            for chunk in iter_bills_zip(bills, processes=processes, progress=progress):
+                tmp.write(chunk)
+            tmp.seek(0)
+            export.refresh_from_db()
+            export.file.save(f"{export.pk}.zip", File(tmp), save=False)
+    except Exception as exc:
+        logger.exception("Bill export %s failed", export.pk)
+        export.refresh_from_db()
+        export.status = "failed"
+        export.error = str(exc)
+    else:
+        export.status = "completed"
+    export.finished_at = timezone.now()
+    export.save()
+
+    logger.info(
+        "Bill export %s %s: %d/%d bills, %d rendered, %d failed",
+        export.pk, export.status, export.bills_added, export.bills_total,
+        export.pdfs_rendered, export.bills_failed,
+    )
+    return export
@@ -0,0 +1,183 @@
+"""
+Integer billing arithmetic.
+
+price_bill(compiled, band_mwh, period_start, period_end)
+  → (line_items, totals) exactly as calculate_line_items() and
+    summarise_line_items() produce them, computed in scaled integers.
+
+Units
+-----
+energy           milli-watt-hours (mWh)  1 kWh = 1 000 000 mWh
+unit rates       micro-pence per kWh     1 p   = 1 000 000 µp
+standing charge  micro-pence per day
+money            centipence (0.01 p)     the precision Bill/BillLineItem store
+
+MeterReading.value_kwh, RateBand.rate_pence_per_kwh and
+Tariff.standing_charge_pence are all stored to 4 decimal places, so every
+input converts to these units exactly and sums of them are exact.
+
+Rounding points
+---------------
+There are exactly two, the same two the Decimal path has:
+
+1. Each usage line: mWh × µp/kWh is in units of 10⁻¹² p and is rounded to
+   centipence (÷ 10¹⁰).
+2. The standing charge: µp/day × days is rounded to centipence (÷ 10⁴).
+
+Both round half to even, which is what Decimal.quantize() does under the
+default context. Totals are plain integer sums of the rounded lines, so
+they need no further rounding.
+"""
+
+from datetime import date
+from decimal import Decimal
+
+from django.db.models import BigIntegerField, DecimalField, F, Value
+from django.db.models.functions import Cast, Round
+
+from tariffs.lookup import CompiledTariff
+
+MWH_PER_KWH = 10**6
+MICROPENCE_PER_PENNY = 10**6
+CENTIPENCE_PER_PENNY = 100
+
+# mWh × µp/kWh → 10⁻¹² p; ÷ this → centipence
+_USAGE_TO_CENTIPENCE = MWH_PER_KWH * MICROPENCE_PER_PENNY // CENTIPENCE_PER_PENNY
+# µp → centipence
+_MICRO_TO_CENTIPENCE = MICROPENCE_PER_PENNY // CENTIPENCE_PER_PENNY
+
+_ZERO_KWH = Decimal("0")
+
+
+def _scaled(value: Decimal, scale_exp: int) -> int:
+    """value × 10**scale_exp as an int; raises ValueError if that is not exact."""
+    sign, digits, exp = Decimal(value).as_tuple()
+    n = int("".join(map(str, digits)) or "0")
+    shift = exp + scale_exp
+    if shift < 0:
+        n, rem = divmod(n, 10**-shift)
+        if rem:
+            raise ValueError(f"{value} has more than {scale_exp} decimal places")
+    else:
+        n *= 10**shift
+    return -n if sign else n
+
+
+def kwh_to_mwh(kwh: Decimal) -> int:
+    return _scaled(kwh, 6)
+
+
+def pence_to_micropence(pence: Decimal) -> int:
+    return _scaled(pence, 6)
+
+
+def reading_mwh(field: str = "value_kwh"):
+    """
+    ORM expression for a reading's energy in mWh, so the database returns
+    (and sums) integers instead of Decimals. The ROUND only absorbs float
+    noise on backends that store decimals as REAL; the value is exact.
+    """
+    return Cast(
+        Round(F(field) * Value(MWH_PER_KWH, output_field=DecimalField())),
+        BigIntegerField(),
+    )
+
+
+def mwh_to_kwh(mwh: int) -> Decimal:
+    """kWh as a Decimal, at MeterReading's 4 places whenever that is exact."""
+    if mwh % 100 == 0:
+        return Decimal(mwh // 100).scaleb(-4)
+    return Decimal(mwh).scaleb(-6)
+
+
+def centipence_to_pence(centipence: int) -> Decimal:
+    return Decimal(centipence).scaleb(-2)
+
+
+def round_half_even(numerator: int, denominator: int) -> int:
+    """numerator / denominator rounded half to even (denominator > 0)."""
+    quotient, remainder = divmod(abs(numerator), denominator)
+    twice = remainder * 2
+    if twice > denominator or (twice == denominator and quotient % 2):
+        quotient += 1
+    return -quotient if numerator < 0 else quotient
+
+
+def usage_centipence(mwh: int, rate_micropence: int) -> int:
+    """Rounding point 1: one usage line, to the nearest 0.01 p."""
+    return round_half_even(mwh * rate_micropence, _USAGE_TO_CENTIPENCE)
+
+
+def standing_centipence(standing_micropence: int, days: int) -> int:
+    """Rounding point 2: the standing charge for a period, to the nearest 0.01 p."""
+    return round_half_even(standing_micropence * days, _MICRO_TO_CENTIPENCE)
+
+
+def price_bill(
+    compiled: CompiledTariff,
+    band_mwh: list[int],
+    period_start: date,
+    period_end: date,
+) -> tuple[list[dict], dict]:
+    """
+    Integer twin of calculate_line_items() + summarise_line_items().
+
+    band_mwh holds mWh per compiled band (summed for flat tariffs). Returns
+    the same line-item dicts and bill totals, as Decimals.
+    """
+    rates = compiled.rates_micropence
+    line_items = []
+    total_mwh = 0
+    usage_cp = 0  # lines with positive kWh, as summarise_line_items counts usage
+    lines_cp = 0  # every usage line, whatever its sign
+
+    if compiled.is_time_of_use:
+        for rb, rate, mwh in zip(compiled.bands, rates, band_mwh):
+            if mwh > 0:
+                amount = usage_centipence(mwh, rate)
+                total_mwh += mwh
+                usage_cp += amount
+                lines_cp += amount
+                line_items.append({
+                    "description": f"{compiled.name} — {rb.label or 'Band'} usage",
+                    "rate_band_label": rb.label or "",
+                    "kwh": mwh_to_kwh(mwh),
+                    "rate_pence_per_kwh": rb.rate_pence_per_kwh,
+                    "amount_pence": centipence_to_pence(amount),
+                })
+    else:
+        flat_rate = compiled.bands[0] if compiled.bands else None
+        if not flat_rate:
+            raise ValueError(f"Tariff {compiled.code} has no rate bands")
+
+        total_mwh = sum(band_mwh)
+        amount = usage_centipence(total_mwh, rates[0])
+        lines_cp = amount
+        if total_mwh > 0:
+            usage_cp = amount
+        line_items.append({
+            "description": f"{compiled.name} — usage",
+            "rate_band_label": flat_rate.label or "Standard",
+            "kwh": mwh_to_kwh(total_mwh),
+            "rate_pence_per_kwh": flat_rate.rate_pence_per_kwh,
+            "amount_pence": centipence_to_pence(amount),
+        })
+
+    days = max((period_end - period_start).days, 1)
+    standing_cp = standing_centipence(compiled.standing_charge_micropence, days)
+    standing = centipence_to_pence(standing_cp)
+    line_items.append({
+        "description": f"Standing charge ({days} days × {compiled.standing_charge_pence}p/day)",
+        "rate_band_label": "",
+        "kwh": _ZERO_KWH,
+        "rate_pence_per_kwh": _ZERO_KWH,
+        "amount_pence": standing,
+    })
+
+    totals = {
+        "total_kwh": mwh_to_kwh(total_mwh),
+        "standing_charge_pence": standing,
+        "usage_charge_pence": centipence_to_pence(usage_cp),
+        "total_amount_pence": centipence_to_pence(lines_cp + standing_cp),
+    }
+    return line_items, totals
@@ -0,0 +1,50 @@
+"""
+Management command to start a billing reconciliation audit.
+
+Chunks are dispatched to Celery workers at BILL_AUDIT_CHUNKS_PER_MINUTE;
+progress and the discrepancy report are on the BillAudit record.
+
+Usage:
+    python manage.py audit_bills
+    python manage.py audit_bills --from 2025-01-01 --to 2025-12-31 --chunk-size 250
+"""
+
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from billing.audit import start_bill_audit
+
+
+class Command(BaseCommand):
+    help = "Recompute stored bills in memory and report any that do not match"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--from", dest="period_start", type=date.fromisoformat, help="Bills starting on/after")
+        parser.add_argument("--to", dest="period_end", type=date.fromisoformat, help="Bills ending on/before")
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=500,
+            help="Bills per chunk task (default: 500)",
+        )
+
+    def handle(self, *args, **options):
+        audit = start_bill_audit(
+            period_start=options["period_start"],
+            period_end=options["period_end"],
+            chunk_size=options["chunk_size"],
+        )
+        audit.refresh_from_db()
+        self.stdout.write(
+            f"Audit {audit.pk}: {audit.bills_total} bills in {audit.chunks_total} chunks ({audit.status})"
+        )
+        if audit.status != "running":
+            style = self.style.SUCCESS if audit.status == "completed" else self.style.WARNING
+            self.stdout.write(
+                style(
+                    f"Done: {audit.bills_checked} checked, {audit.discrepancies_found} discrepancies, "
+                    f"net difference {audit.amount_difference_pence}p, {audit.chunks_failed} chunks failed, "
+                    f"report {audit.report.name}"
+                )
+            )
@@ -0,0 +1,62 @@
+"""
+Management command to backfill monthly bills for migrated customers.
+
+Readings for each batch of customers are scanned once for the whole range.
+
+Usage:
+    python manage.py backfill_bills 2024-01 2025-12 --customers <id> <id> ...
+    python manage.py backfill_bills 2024-01 2025-12 --all
+"""
+
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from billing.backfill import backfill_bills, monthly_periods
+from customers.models import Customer
+
+
+def _month(value: str) -> date:
+    return date.fromisoformat(f"{value}-01")
+
+
+class Command(BaseCommand):
+    help = "Backfill monthly bills for customers over a range of months"
+
+    def add_arguments(self, parser):
+        parser.add_argument("first_month", type=_month, help="First month (YYYY-MM)")
+        parser.add_argument("last_month", type=_month, help="Last month (YYYY-MM)")
+        parser.add_argument("--customers", nargs="+", default=[], help="Customer ids to backfill")
+        parser.add_argument("--all", action="store_true", help="Backfill every customer")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=200,
+            help="Customers per readings scan (default: 200)",
+        )
+
+    def handle(self, *args, **options):
+        periods = monthly_periods(options["first_month"], options["last_month"])
+        if not periods:
+            raise CommandError("last_month must not be before first_month")
+
+        if options["all"]:
+            customer_ids = [str(pk) for pk in Customer.objects.order_by("pk").values_list("pk", flat=True)]
+        elif options["customers"]:
+            customer_ids = options["customers"]
+        else:
+            raise CommandError("Pass --customers or --all")
+
+        batch_size = options["batch_size"]
+        billed = failed = 0
+        for start in range(0, len(customer_ids), batch_size):
+            result = backfill_bills(customer_ids[start : start + batch_size], periods)
+            billed += len(result.bills)
+            failed += len(result.failures)
+            for key, error in result.failures.items():
+                self.stderr.write(f"  {key}: {error}")
+            self.stdout.write(f"  {min(start + batch_size, len(customer_ids))}/{len(customer_ids)} customers")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Done: {billed} bills over {len(periods)} periods, {failed} failures")
+        )
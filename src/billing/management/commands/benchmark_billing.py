@@ -0,0 +1,105 @@
+"""
+Management command comparing per-customer and batch billing throughput.
+
+Both paths run inside a transaction that is rolled back, so no bills are
+kept. Totals from the two paths are compared bill by bill.
+
+Usage:
+    python manage.py benchmark_billing 2026-01-01 2026-01-31 --customers 2000
+"""
+
+import time
+from datetime import date
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from billing.batch import generate_bills_batch
+from billing.services import generate_bill
+from tariffs.models import CustomerTariff
+
+# Bill total fields and the precision they are stored at
+TOTAL_FIELDS = {
+    "total_kwh": Decimal("0.0001"),
+    "standing_charge_pence": Decimal("0.01"),
+    "usage_charge_pence": Decimal("0.01"),
+    "total_amount_pence": Decimal("0.01"),
+}
+
+
+def _totals(bill):
+    return tuple(Decimal(getattr(bill, f)).quantize(places) for f, places in TOTAL_FIELDS.items())
+
+
+class Command(BaseCommand):
+    help = "Benchmark per-customer vs batch bill generation (nothing is persisted)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("period_start", type=date.fromisoformat)
+        parser.add_argument("period_end", type=date.fromisoformat)
+        parser.add_argument(
+            "--customers",
+            type=int,
+            default=500,
+            help="Number of customers to bill (default: 500)",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=500,
+            help="Customers per batch (default: 500)",
+        )
+
+    def handle(self, *args, **options):
+        start, end = options["period_start"], options["period_end"]
+        if end < start:
+            raise CommandError("period_end must not be before period_start")
+
+        customer_ids = [
+            str(cid)
+            for cid in CustomerTariff.objects.filter(effective_from__lte=end)
+            .order_by()
+            .values_list("customer_id", flat=True)
+            .distinct()[: options["customers"]]
+        ]
+        if not customer_ids:
+            raise CommandError("No customers with tariff assignments in that period")
+
+        # ── Per-customer path ───────────────────────────────────────────
+        single = {}
+        t0 = time.perf_counter()
+        with transaction.atomic():
+            for cid in customer_ids:
+                try:
+                    bill = generate_bill(cid, start, end)
+                except ValueError:
+                    continue
+                single[cid] = _totals(bill)
+            transaction.set_rollback(True)
+        single_secs = time.perf_counter() - t0
+
+        # ── Batch path ──────────────────────────────────────────────────
+        batch = {}
+        chunk = options["chunk_size"]
+        t0 = time.perf_counter()
+        with transaction.atomic():
+            for i in range(0, len(customer_ids), chunk):
+                result = generate_bills_batch(customer_ids[i : i + chunk], start, end)
+                for bill in result.bills:
+                    batch[str(bill.customer_id)] = _totals(bill)
+            transaction.set_rollback(True)
+        batch_secs = time.perf_counter() - t0
+
+        mismatches = [cid for cid in single if batch.get(cid) != single[cid]]
+        mismatches += [cid for cid in batch if cid not in single]
+
+        n = len(customer_ids)
+        self.stdout.write(f"Customers:    {n} ({len(single)} billable)")
+        self.stdout.write(f"Per-customer: {single_secs:.2f}s ({n / single_secs:.1f} customers/s)")
+        self.stdout.write(f"Batch:        {batch_secs:.2f}s ({n / batch_secs:.1f} customers/s)")
+        self.stdout.write(f"Speed-up:     {single_secs / batch_secs:.1f}×")
+
+        if mismatches:
+            raise CommandError(f"{len(mismatches)} bills differ between paths, e.g. customer {mismatches[0]}")
+        self.stdout.write(self.style.SUCCESS("Totals identical"))
@@ -0,0 +1,221 @@
+"""
+Management command checking and benchmarking the integer pricing core.
+
+1. Equivalence: prices randomly generated tariffs and usages (including
+   negative, zero and exact half-penny cases) with both the Decimal path
+   (calculate_line_items + summarise_line_items) and billing.fixedpoint,
+   and fails on the first difference in any line item or total. The
+   same property is tested in billing.tests; this is a larger seeded run.
+2. Speed: for a fleet-sized batch, times pricing alone and pricing
+   after accumulating a month of half-hourly readings into bands, with
+   both paths. Each timing is the best of --repeat runs with the garbage
+   collector paused, the two paths alternating, so one slow run on a busy
+   machine does not decide the ratio.
+
+Nothing touches the database.
+
+Usage:
+    python manage.py benchmark_pricing --cases 50000 --bills 20000 --seed 1
+"""
+
+import gc
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+
+from billing.fixedpoint import kwh_to_mwh, price_bill
+from billing.services import calculate_line_items, summarise_line_items
+from tariffs.lookup import CompiledBand, CompiledTariff
+
+PERIOD_START = date(2026, 1, 1)
+
+
+def _dec4(rng, upper: int) -> Decimal:
+    return Decimal(rng.randrange(upper * 10**4)).scaleb(-4)
+
+
+def _random_tariff(rng, n_bands: int | None = None) -> CompiledTariff:
+    n_bands = n_bands or rng.choice([1, 1, 2, 3, 4, 5])
+    bands = tuple(
+        CompiledBand(id=i, label=rng.choice(["", "Day", "Night", "Peak"]), rate_pence_per_kwh=_dec4(rng, 100))
+        for i in range(n_bands)
+    )
+    return CompiledTariff(
+        tariff_id=rng.randrange(10**6),
+        version=1,
+        name="Synthetic",
+        code="SYN",
+        fuel_type="electricity",
+        tariff_type=rng.choice(["time_of_use", "variable"]),
+        standing_charge_pence=_dec4(rng, 1000),
+        bands=bands,
+        minute_bands=bytes(1440),
+    )
+
+
+def _random_usage(rng, tariff: CompiledTariff) -> list[Decimal]:
+    usage = []
+    for band in tariff.bands:
+        roll = rng.random()
+        if roll < 0.05:
+            usage.append(Decimal("0"))
+        elif roll < 0.10:
+            usage.append(-_dec4(rng, 50))  # corrections can net negative
+        elif roll < 0.20 and band.rate_pence_per_kwh:
+            usage.append(_half_penny_kwh(rng, band.rate_pence_per_kwh))
+        else:
+            usage.append(_dec4(rng, 5000))
+    return usage
+
+
+def _half_penny_kwh(rng, rate: Decimal) -> Decimal:
+    """A 4dp kWh whose cost lands exactly halfway between two 0.01p steps, if one turns up."""
+    kwh = _dec4(rng, 500)
+    for _ in range(50):
+        if _is_tie(kwh, rate):
+            break
+        kwh = _dec4(rng, 500)
+    return kwh
+
+
+def _is_tie(kwh: Decimal, rate: Decimal) -> bool:
+    return (kwh * rate).scaleb(2) % 1 == Decimal("0.5")
+
+
+# Hand-picked ties for both rounding points: (rate, kWh, standing charge, days)
+FIXED_TIES = [
+    (Decimal("0.0100"), Decimal("0.5000"), Decimal("0.0050"), 1),   # 0.005 → 0.00
+    (Decimal("0.0300"), Decimal("0.5000"), Decimal("0.0150"), 1),   # 0.015 → 0.02
+    (Decimal("12.3450"), Decimal("1.0000"), Decimal("25.1250"), 2),
+    (Decimal("0.0100"), Decimal("-0.5000"), Decimal("0.0025"), 6),  # negative tie
+]
+
+
+class Command(BaseCommand):
+    help = "Verify integer pricing against the Decimal path and benchmark both"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--cases", type=int, default=20000, help="Random equivalence cases (default: 20000)")
+        parser.add_argument("--bills", type=int, default=5000, help="Bills in the speed batch (default: 5000)")
+        parser.add_argument(
+            "--readings",
+            type=int,
+            default=1440,
+            help="Half-hourly readings per bill (default: 1440, a 30-day month)",
+        )
+        parser.add_argument("--repeat", type=int, default=5, help="Timed runs per path, best kept (default: 5)")
+        parser.add_argument("--seed", type=int, default=None, help="Random seed (default: random)")
+
+    def handle(self, *args, **options):
+        seed = options["seed"] if options["seed"] is not None else random.randrange(2**32)
+        rng = random.Random(seed)
+        self.stdout.write(f"Seed: {seed}")
+
+        # ── 1. Equivalence ──────────────────────────────────────────────
+        cases = []
+        for rate, kwh, standing, days in FIXED_TIES:
+            for tariff_type in ("time_of_use", "variable"):
+                tariff = CompiledTariff(
+                    tariff_id=0, version=1, name="Tie", code="TIE", fuel_type="electricity",
+                    tariff_type=tariff_type, standing_charge_pence=standing,
+                    bands=(CompiledBand(id=0, label="A", rate_pence_per_kwh=rate),
+                           CompiledBand(id=1, label="B", rate_pence_per_kwh=rate)),
+                    minute_bands=bytes(1440),
+                )
+                cases.append((tariff, [kwh, kwh], PERIOD_START + timedelta(days=days)))
+        for _ in range(options["cases"]):
+            tariff = _random_tariff(rng)
+            cases.append((tariff, _random_usage(rng, tariff), PERIOD_START + timedelta(days=rng.randrange(0, 400))))
+
+        ties = 0
+        for case, (tariff, usage, end) in enumerate(cases):
+            try:
+                expected_items = calculate_line_items(tariff, usage, PERIOD_START, end)
+            except ValueError:
+                continue
+            expected_totals = summarise_line_items(expected_items)
+            items, totals = price_bill(tariff, [kwh_to_mwh(k) for k in usage], PERIOD_START, end)
+
+            ties += sum(1 for b, k in zip(tariff.bands, usage) if _is_tie(k, b.rate_pence_per_kwh))
+            if items != expected_items or totals != expected_totals:
+                raise CommandError(
+                    f"Case {case} differs (seed {seed}): tariff {tariff.bands}, usage {usage}, "
+                    f"end {end}\n  decimal: {expected_totals}\n  integer: {totals}"
+                )
+        self.stdout.write(f"Equivalence:  {len(cases)} cases identical ({ties} usage lines on a rounding tie)")
+
+        # ── 2. Speed ────────────────────────────────────────────────────
+        # Pricing alone, then each bill accumulating a month of half-hourly
+        # readings into bands (as the batch and backfill engines do) first.
+        tariffs = [_random_tariff(rng, n) for n in (1, 2, 4) for _ in range(10)]
+        n_readings = options["readings"]
+        batch = []
+        for _ in range(options["bills"]):
+            tariff = rng.choice(tariffs)
+            bands = [rng.randrange(len(tariff.bands)) for _ in range(n_readings)]
+            values = [_dec4(rng, 3) for _ in range(n_readings)]
+            batch.append((tariff, bands, values, [kwh_to_mwh(v) for v in values]))
+        end = PERIOD_START + timedelta(days=30)
+
+        usages = []
+        for tariff, bands, values, values_mwh in batch:
+            usage, usage_mwh = [Decimal("0")] * len(tariff.bands), [0] * len(tariff.bands)
+            for idx, kwh, mwh in zip(bands, values, values_mwh):
+                usage[idx] += kwh
+                usage_mwh[idx] += mwh
+            usages.append((tariff, usage, usage_mwh))
+
+        def decimal_pricing():
+            for tariff, usage, _ in usages:
+                summarise_line_items(calculate_line_items(tariff, usage, PERIOD_START, end))
+
+        def integer_pricing():
+            for tariff, _, usage in usages:
+                price_bill(tariff, usage, PERIOD_START, end)
+
+        def decimal_bills():
+            for tariff, bands, values, _ in batch:
+                usage = [Decimal("0")] * len(tariff.bands)
+                for idx, kwh in zip(bands, values):
+                    usage[idx] += kwh
+                summarise_line_items(calculate_line_items(tariff, usage, PERIOD_START, end))
+
+        def integer_bills():
+            for tariff, bands, _, values_mwh in batch:
+                usage = [0] * len(tariff.bands)
+                for idx, mwh in zip(bands, values_mwh):
+                    usage[idx] += mwh
+                price_bill(tariff, usage, PERIOD_START, end)
+
+        n = len(batch)
+        self.stdout.write(f"Batch:        {n} bills × {n_readings} readings, best of {options['repeat']}")
+        self.stdout.write(f"{'':15}{'decimal':>10} {'integer':>10} {'speed-up':>9}")
+        for label, decimal_path, integer_path in (
+            ("Pricing", decimal_pricing, integer_pricing),
+            ("With readings", decimal_bills, integer_bills),
+        ):
+            decimal_secs, integer_secs = _best_of(options["repeat"], decimal_path, integer_path)
+            self.stdout.write(
+                f"{label + ':':15}{n / decimal_secs:>8,.0f}/s {n / integer_secs:>8,.0f}/s "
+                f"{decimal_secs / integer_secs:>8.2f}×"
+            )
+
+
+def _best_of(repeat: int, *paths) -> list[float]:
+    """Best wall time of each path over repeat alternating runs, with GC paused."""
+    best = [float("inf")] * len(paths)
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            for i, path in enumerate(paths):
+                t0 = time.perf_counter()
+                path()
+                best[i] = min(best[i], time.perf_counter() - t0)
+    finally:
+        if enabled:
+            gc.enable()
+    return best
@@ -0,0 +1,66 @@
+"""
+Management command to export bill PDFs as a ZIP for print/mail vendors.
+
+PDFs missing from the cache are rendered with a process pool; the archive
+is streamed to disk as it is built.
+
+Usage:
+    python manage.py export_bill_pdfs bills.zip --from 2025-01-01 --to 2025-01-31
+    python manage.py export_bill_pdfs bills.zip --run <bill run id> --processes 8
+"""
+
+from datetime import date
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from billing.export import DEFAULT_STATUSES, export_bills, iter_bills_zip
+from billing.models import BillRun
+
+
+class Command(BaseCommand):
+    help = "Write a ZIP of bill PDFs for a period or bill run"
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", help="Path of the ZIP file to write")
+        parser.add_argument("--from", dest="period_start", type=date.fromisoformat, help="Bills starting on/after")
+        parser.add_argument("--to", dest="period_end", type=date.fromisoformat, help="Bills ending on/before")
+        parser.add_argument("--run", dest="bill_run", help="Bill run id")
+        parser.add_argument(
+            "--status",
+            nargs="+",
+            default=list(DEFAULT_STATUSES),
+            help="Bill statuses to include (default: issued)",
+        )
+        parser.add_argument("--processes", type=int, default=None, help="Render processes (default: CPU count)")
+
+    def handle(self, *args, **options):
+        bill_run = None
+        if options["bill_run"]:
+            try:
+                bill_run = BillRun.objects.get(pk=options["bill_run"])
+            except (BillRun.DoesNotExist, ValidationError):
+                raise CommandError(f"Bill run {options['bill_run']} not found")
+        elif not (options["period_start"] and options["period_end"]):
+            raise CommandError("Pass --run, or both --from and --to")
+
+        bills = export_bills(options["period_start"], options["period_end"], bill_run, options["status"])
+        total = bills.count()
+        counts = {"rendered": 0, "added": 0, "failed": 0}
+
+        def progress(event, count):
+            counts[event] += count
+            done = counts["added"] + counts["failed"]
+            if event != "rendered" and (done % 100 == 0 or done == total):
+                self.stdout.write(f"  {done}/{total} bills ({counts['rendered']} rendered)")
+
+        with open(options["output"], "wb") as out:
+            for chunk in iter_bills_zip(bills, processes=options["processes"], progress=progress):
+                out.write(chunk)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Done: {counts['added']} PDFs written to {options['output']}, "
+                f"{counts['rendered']} rendered, {counts['failed']} failed"
+            )
+        )
@@ -0,0 +1,68 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:56
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('billing', '0002_payment'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BillRun',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('period_start', models.DateField()),
+                ('period_end', models.DateField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed'), ('completed_with_errors', 'Completed with errors')], default='pending', max_length=25)),
+                ('chunk_size', models.PositiveIntegerField(default=500)),
+                ('total_customers', models.PositiveIntegerField(default=0)),
+                ('chunks_total', models.PositiveIntegerField(default=0)),
+                ('chunks_completed', models.PositiveIntegerField(default=0)),
+                ('chunks_failed', models.PositiveIntegerField(default=0)),
+                ('customers_billed', models.PositiveIntegerField(default=0)),
+                ('customers_skipped', models.PositiveIntegerField(default=0, help_text='Already billed for the period')),
+                ('customers_failed', models.PositiveIntegerField(default=0)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('wall_time_seconds', models.FloatField(blank=True, null=True)),
+                ('customers_per_second', models.FloatField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='bill',
+            name='bill_run',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='bills', to='billing.billrun'),
+        ),
+        migrations.CreateModel(
+            name='BillRunChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('index', models.PositiveIntegerField()),
+                ('customer_ids', models.JSONField(default=list)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('billed', models.PositiveIntegerField(default=0)),
+                ('skipped', models.PositiveIntegerField(default=0)),
+                ('failed', models.PositiveIntegerField(default=0)),
+                ('failures', models.JSONField(blank=True, default=dict, help_text='customer_id → error')),
+                ('error', models.TextField(blank=True, help_text='Chunk-level error from the last attempt')),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('duration_seconds', models.FloatField(blank=True, null=True)),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chunks', to='billing.billrun')),
+            ],
+            options={
+                'ordering': ['index'],
+                'unique_together': {('run', 'index')},
+            },
+        ),
+    ]
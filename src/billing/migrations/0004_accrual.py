@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('billing', '0003_bill_run'),
+        ('customers', '0002_customer_user'),
+        ('tariffs', '0002_tariff_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Accrual',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period_start', models.DateField()),
+                ('period_end', models.DateField()),
+                ('band_kwh', models.JSONField(default=list, help_text='kWh per compiled tariff band, as decimal strings')),
+                ('total_kwh', models.DecimalField(decimal_places=4, default=0, max_digits=12)),
+                ('usage_charge_pence', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('last_reading_at', models.DateTimeField(blank=True, null=True)),
+                ('reconciled_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='accruals', to='customers.customer')),
+                ('tariff', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='tariffs.tariff')),
+            ],
+            options={
+                'ordering': ['-period_start'],
+                'unique_together': {('customer', 'period_start')},
+            },
+        ),
+    ]
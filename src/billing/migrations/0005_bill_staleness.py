@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('billing', '0004_accrual'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bill',
+            name='stale_since',
+            field=models.DateTimeField(blank=True, db_index=True, help_text='Set when late or corrected readings land in the period; cleared on re-bill', null=True),
+        ),
+        migrations.CreateModel(
+            name='BillAdjustment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('previous_total_kwh', models.DecimalField(decimal_places=4, max_digits=12)),
+                ('new_total_kwh', models.DecimalField(decimal_places=4, max_digits=12)),
+                ('previous_total_amount_pence', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('new_total_amount_pence', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('kwh_difference', models.DecimalField(decimal_places=4, max_digits=12)),
+                ('amount_difference_pence', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('applied', models.BooleanField(default=False, help_text='Bill totals and line items were replaced')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('bill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='adjustments', to='billing.bill')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
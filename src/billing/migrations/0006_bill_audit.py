@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:03
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('billing', '0005_bill_staleness'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BillAudit',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('period_start', models.DateField(blank=True, help_text='Only bills starting on/after', null=True)),
+                ('period_end', models.DateField(blank=True, help_text='Only bills ending on/before', null=True)),
+                ('status', models.CharField(choices=[('running', 'Running'), ('completed', 'Completed')], default='running', max_length=10)),
+                ('chunk_size', models.PositiveIntegerField(default=500)),
+                ('bills_total', models.PositiveIntegerField(default=0)),
+                ('bills_checked', models.PositiveIntegerField(default=0)),
+                ('chunks_total', models.PositiveIntegerField(default=0)),
+                ('chunks_completed', models.PositiveIntegerField(default=0)),
+                ('discrepancies_found', models.PositiveIntegerField(default=0)),
+                ('amount_difference_pence', models.DecimalField(decimal_places=2, default=0, help_text='Sum of (expected − stored) total across discrepant bills', max_digits=14)),
+                ('report', models.FileField(blank=True, upload_to='reports/bill_audits/')),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['-started_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='BillDiscrepancy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('totals', 'Totals differ'), ('line_items', 'Line items differ'), ('error', 'Could not recompute')], max_length=10)),
+                ('stored_total_pence', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('expected_total_pence', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('difference_pence', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('details', models.JSONField(blank=True, default=dict, help_text='field → [stored, expected], or error')),
+                ('audit', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='discrepancies', to='billing.billaudit')),
+                ('bill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='discrepancies', to='billing.bill')),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:05
+
+import billing.models
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('billing', '0006_bill_audit'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BillPDF',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('ready', 'Ready'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('content_hash', models.CharField(blank=True, max_length=64)),
+                ('file', models.FileField(blank=True, upload_to=billing.models.bill_pdf_path)),
+                ('error', models.TextField(blank=True)),
+                ('requested_at', models.DateTimeField(blank=True, null=True)),
+                ('rendered_at', models.DateTimeField(blank=True, null=True)),
+                ('render_seconds', models.FloatField(blank=True, null=True)),
+                ('bill', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='pdf', to='billing.bill')),
+            ],
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:06
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('billing', '0007_bill_pdf'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BillExport',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('period_start', models.DateField(blank=True, null=True)),
+                ('period_end', models.DateField(blank=True, null=True)),
+                ('statuses', models.JSONField(default=list, help_text='Bill statuses included')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('bills_total', models.PositiveIntegerField(default=0)),
+                ('pdfs_rendered', models.PositiveIntegerField(default=0, help_text='Rendered because not cached')),
+                ('bills_added', models.PositiveIntegerField(default=0)),
+                ('bills_failed', models.PositiveIntegerField(default=0)),
+                ('file', models.FileField(blank=True, upload_to='exports/bills/')),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('bill_run', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='exports', to='billing.billrun')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('billing', '0008_bill_export'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='billaudit',
+            name='chunks_failed',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='billaudit',
+            name='status',
+            field=models.CharField(choices=[('running', 'Running'), ('completed', 'Completed'), ('completed_with_errors', 'Completed with errors')], default='running', max_length=25),
+        ),
+    ]
@@ -6,6 +6,81 @@ from customers.models import Customer, Meter
 from tariffs.models import Tariff
 
 
+class BillRun(models.Model):
+    """A billing cycle: every billable customer for one period, in chunks."""
+
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("running", "Running"),
+        ("completed", "Completed"),
+        ("completed_with_errors", "Completed with errors"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    period_start = models.DateField()
+    period_end = models.DateField()
+    status = models.CharField(max_length=25, choices=STATUS_CHOICES, default="pending")
+    chunk_size = models.PositiveIntegerField(default=500)
+
+    # Progress
+    total_customers = models.PositiveIntegerField(default=0)
+    chunks_total = models.PositiveIntegerField(default=0)
+    chunks_completed = models.PositiveIntegerField(default=0)
+    chunks_failed = models.PositiveIntegerField(default=0)
+    customers_billed = models.PositiveIntegerField(default=0)
+    customers_skipped = models.PositiveIntegerField(
+        default=0, help_text="Already billed for the period",
+    )
+    customers_failed = models.PositiveIntegerField(default=0)
+
+    # Timings
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    wall_time_seconds = models.FloatField(null=True, blank=True)
+    customers_per_second = models.FloatField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"Bill run {self.period_start} → {self.period_end} | {self.status}"
+
+
+class BillRunChunk(models.Model):
+    """One chunk of customers within a bill run, processed by one task."""
+
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("running", "Running"),
+        ("completed", "Completed"),
+        ("failed", "Failed"),
+    ]
+
+    run = models.ForeignKey(BillRun, on_delete=models.CASCADE, related_name="chunks")
+    index = models.PositiveIntegerField()
+    customer_ids = models.JSONField(default=list)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="pending")
+    attempts = models.PositiveIntegerField(default=0)
+
+    billed = models.PositiveIntegerField(default=0)
+    skipped = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+    failures = models.JSONField(default=dict, blank=True, help_text="customer_id → error")
+    error = models.TextField(blank=True, help_text="Chunk-level error from the last attempt")
+
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    duration_seconds = models.FloatField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["index"]
+        unique_together = ["run", "index"]
+
+    def __str__(self):
+        return f"Chunk {self.index} of {self.run_id} | {self.status}"
+
+
 class Bill(models.Model):
     """Monthly or periodic bill for a customer."""
 
@@ -23,6 +98,9 @@ class Bill(models.Model):
     period_start = models.DateField()
     period_end = models.DateField()
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="draft")
+    bill_run = models.ForeignKey(
+        BillRun, on_delete=models.SET_NULL, null=True, blank=True, related_name="bills"
+    )
 
     # Totals (all in pence)
     total_kwh = models.DecimalField(max_digits=12, decimal_places=4, default=0)
@@ -31,6 +109,10 @@ class Bill(models.Model):
     total_amount_pence = models.DecimalField(max_digits=10, decimal_places=2, default=0)
 
     issued_at = models.DateTimeField(null=True, blank=True)
+    stale_since = models.DateTimeField(
+        null=True, blank=True, db_index=True,
+        help_text="Set when late or corrected readings land in the period; cleared on re-bill",
+    )
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -65,6 +147,192 @@ class BillLineItem(models.Model):
         return f"{self.description} - {self.amount_pence / 100:.2f}"
 
 
+def bill_pdf_path(instance, filename):
+    return f"bills/pdf/{instance.bill_id}/{filename}"
+
+
+class BillPDF(models.Model):
+    """
+    Rendered PDF for a bill, cached in media storage.
+
+    content_hash fingerprints everything the PDF shows, so a stored file is
+    only served while it still matches the bill. See billing.pdf.
+    """
+
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("ready", "Ready"),
+        ("failed", "Failed"),
+    ]
+
+    bill = models.OneToOneField(Bill, on_delete=models.CASCADE, related_name="pdf")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="pending")
+    content_hash = models.CharField(max_length=64, blank=True)
+    file = models.FileField(upload_to=bill_pdf_path, blank=True)
+    error = models.TextField(blank=True)
+    requested_at = models.DateTimeField(null=True, blank=True)
+    rendered_at = models.DateTimeField(null=True, blank=True)
+    render_seconds = models.FloatField(null=True, blank=True)
+
+    def __str__(self):
+        return f"PDF {self.bill_id} | {self.status}"
+
+
+class BillExport(models.Model):
+    """A ZIP of bill PDFs for a period or bill run, built by a worker. See billing.export."""
+
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("running", "Running"),
+        ("completed", "Completed"),
+        ("failed", "Failed"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    period_start = models.DateField(null=True, blank=True)
+    period_end = models.DateField(null=True, blank=True)
+    bill_run = models.ForeignKey(
+        BillRun, on_delete=models.SET_NULL, null=True, blank=True, related_name="exports"
+    )
+    statuses = models.JSONField(default=list, help_text="Bill statuses included")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="pending")
+
+    # Progress
+    bills_total = models.PositiveIntegerField(default=0)
+    pdfs_rendered = models.PositiveIntegerField(default=0, help_text="Rendered because not cached")
+    bills_added = models.PositiveIntegerField(default=0)
+    bills_failed = models.PositiveIntegerField(default=0)
+
+    file = models.FileField(upload_to="exports/bills/", blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"Bill export {self.created_at:%Y-%m-%d %H:%M} | {self.status}"
+
+
+class BillAdjustment(models.Model):
+    """
+    Difference between a stored bill and a recalculation after late or
+    corrected readings. Draft bills are rewritten in place (applied=True);
+    issued and paid bills keep their totals and the adjustment is the
+    amount to credit or charge. Each adjustment's previous totals are the
+    last adjustment's new totals, so the differences sum to the net.
+    """
+
+    bill = models.ForeignKey(Bill, on_delete=models.CASCADE, related_name="adjustments")
+    previous_total_kwh = models.DecimalField(max_digits=12, decimal_places=4)
+    new_total_kwh = models.DecimalField(max_digits=12, decimal_places=4)
+    previous_total_amount_pence = models.DecimalField(max_digits=10, decimal_places=2)
+    new_total_amount_pence = models.DecimalField(max_digits=10, decimal_places=2)
+    kwh_difference = models.DecimalField(max_digits=12, decimal_places=4)
+    amount_difference_pence = models.DecimalField(max_digits=10, decimal_places=2)
+    applied = models.BooleanField(default=False, help_text="Bill totals and line items were replaced")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"Adjustment {self.bill_id} | {self.amount_difference_pence:+}p"
+
+
+class BillAudit(models.Model):
+    """
+    A reconciliation pass: stored bills recomputed in memory and compared
+    to the penny. See billing.audit.
+    """
+
+    STATUS_CHOICES = [
+        ("running", "Running"),
+        ("completed", "Completed"),
+        ("completed_with_errors", "Completed with errors"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    period_start = models.DateField(null=True, blank=True, help_text="Only bills starting on/after")
+    period_end = models.DateField(null=True, blank=True, help_text="Only bills ending on/before")
+    status = models.CharField(max_length=25, choices=STATUS_CHOICES, default="running")
+    chunk_size = models.PositiveIntegerField(default=500)
+
+    bills_total = models.PositiveIntegerField(default=0)
+    bills_checked = models.PositiveIntegerField(default=0)
+    chunks_total = models.PositiveIntegerField(default=0)
+    chunks_completed = models.PositiveIntegerField(default=0)
+    chunks_failed = models.PositiveIntegerField(default=0)
+    discrepancies_found = models.PositiveIntegerField(default=0)
+    amount_difference_pence = models.DecimalField(
+        max_digits=14, decimal_places=2, default=0,
+        help_text="Sum of (expected − stored) total across discrepant bills",
+    )
+    report = models.FileField(upload_to="reports/bill_audits/", blank=True)
+
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-started_at"]
+
+    def __str__(self):
+        return f"Bill audit {self.started_at:%Y-%m-%d %H:%M} | {self.status} | {self.discrepancies_found} discrepancies"
+
+
+class BillDiscrepancy(models.Model):
+    """A stored bill that does not match its recomputation."""
+
+    KIND_CHOICES = [
+        ("totals", "Totals differ"),
+        ("line_items", "Line items differ"),
+        ("error", "Could not recompute"),
+    ]
+
+    audit = models.ForeignKey(BillAudit, on_delete=models.CASCADE, related_name="discrepancies")
+    bill = models.ForeignKey(Bill, on_delete=models.CASCADE, related_name="discrepancies")
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    stored_total_pence = models.DecimalField(max_digits=10, decimal_places=2)
+    expected_total_pence = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    difference_pence = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    details = models.JSONField(default=dict, blank=True, help_text="field → [stored, expected], or error")
+
+    class Meta:
+        ordering = ["id"]
+
+    def __str__(self):
+        return f"{self.bill_id} | {self.kind}"
+
+
+class Accrual(models.Model):
+    """
+    Running cost-so-far for a customer's open (calendar-month) period.
+
+    Maintained incrementally as readings are ingested; see billing.accrual.
+    """
+
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name="accruals")
+    tariff = models.ForeignKey(Tariff, on_delete=models.SET_NULL, null=True, blank=True)
+    period_start = models.DateField()
+    period_end = models.DateField()
+    band_kwh = models.JSONField(
+        default=list, help_text="kWh per compiled tariff band, as decimal strings",
+    )
+    total_kwh = models.DecimalField(max_digits=12, decimal_places=4, default=0)
+    usage_charge_pence = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    last_reading_at = models.DateTimeField(null=True, blank=True)
+    reconciled_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-period_start"]
+        unique_together = ["customer", "period_start"]
+
+    def __str__(self):
+        return f"Accrual {self.customer_id} | {self.period_start} | {self.total_kwh} kWh"
+
+
 class Payment(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     bill = models.ForeignKey(Bill, on_delete=models.CASCADE, related_name="payments")
@@ -0,0 +1,158 @@
+"""
+Cached bill PDF rendering.
+
+request_bill_pdf(bill)   → BillPDF; queues a render unless a current PDF exists
+render_bill_pdf(bill_id) → BillPDF; renders in a worker and stores the file
+invalidate_bill_pdf(bill_id)
+  → drops a stored PDF that no longer matches its bill, re-rendering it
+    straight away if the bill has been issued.
+
+Files are stored as bills/pdf/<bill id>/<content hash>.pdf, where the hash
+covers every bill, customer and line item field the template shows (plus
+PDF_TEMPLATE_VERSION). A PDF is only served while its hash matches the
+bill, so a change that bypasses signals (e.g. a queryset update) can never
+serve an out-of-date document.
+"""
+
+import hashlib
+import io
+import json
+import logging
+import time
+from datetime import timedelta
+
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.template.loader import get_template
+from django.utils import timezone
+
+try:
+    from xhtml2pdf import pisa
+except ImportError:
+    pisa = None
+
+from .models import Bill, BillPDF
+
+logger = logging.getLogger(__name__)
+
+PDF_TEMPLATE = "billing/bill_pdf.html"
+PDF_TEMPLATE_VERSION = 1  # bump when the template changes to re-render every PDF
+PENDING_TIMEOUT = timedelta(minutes=10)  # re-queue renders that never finished
+RENDER_ON_STATUSES = ("issued", "paid")
+
+
+def bill_content_hash(bill: Bill) -> str:
+    """SHA-256 of everything the PDF shows for a bill."""
+    customer = bill.customer
+    payload = {
+        "template": PDF_TEMPLATE_VERSION,
+        "bill": [
+            str(bill.pk), bill.status, str(bill.period_start), str(bill.period_end),
+            str(bill.total_kwh), str(bill.standing_charge_pence), str(bill.usage_charge_pence),
+            str(bill.total_amount_pence), str(bill.issued_at), str(bill.created_at),
+        ],
+        "customer": [customer.account_number, customer.first_name, customer.last_name],
+        "line_items": [
+            [li.description, li.rate_band_label, str(li.kwh), str(li.rate_pence_per_kwh), str(li.amount_pence)]
+            for li in bill.line_items.all()
+        ],
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def render_pdf_bytes(bill: Bill) -> bytes:
+    """Render the bill template to PDF. Raises RuntimeError when rendering fails."""
+    if pisa is None:
+        raise RuntimeError("PDF generation disabled")
+
+    html = get_template(PDF_TEMPLATE).render({"bill": bill})
+    out = io.BytesIO()
+    result = pisa.CreatePDF(html, dest=out)
+    if result.err:
+        raise RuntimeError(f"PDF generation failed ({result.err} errors)")
+    return out.getvalue()
+
+
+def _load_bill(bill_id) -> Bill:
+    return Bill.objects.select_related("customer").prefetch_related("line_items").get(pk=bill_id)
+
+
+def request_bill_pdf(bill: Bill, retry_failed: bool = False) -> BillPDF:
+    """
+    The bill's PDF record, queueing a render if the stored PDF is missing
+    or out of date. Failed renders are only re-queued when retry_failed.
+    """
+    from .tasks import render_bill_pdf_task
+
+    content_hash = bill_content_hash(bill)
+    document, _ = BillPDF.objects.get_or_create(bill=bill)
+    if document.content_hash == content_hash:
+        if document.status == "ready" and document.file and document.file.storage.exists(document.file.name):
+            return document
+        if document.status == "failed" and not retry_failed:
+            return document
+        if (
+            document.status == "pending"
+            and document.requested_at
+            and timezone.now() - document.requested_at < PENDING_TIMEOUT
+        ):
+            return document  # already queued
+
+    BillPDF.objects.filter(pk=document.pk).update(
+        status="pending", content_hash=content_hash, error="", requested_at=timezone.now(),
+    )
+    transaction.on_commit(lambda: render_bill_pdf_task.delay(str(bill.pk)))
+    document.refresh_from_db()
+    return document
+
+
+def render_bill_pdf(bill_id) -> BillPDF:
+    """Render and store a bill's PDF unless the stored one is already current."""
+    bill = _load_bill(bill_id)
+    content_hash = bill_content_hash(bill)
+    document, _ = BillPDF.objects.get_or_create(bill=bill)
+    if document.status == "ready" and document.content_hash == content_hash and document.file:
+        return document
+
+    t0 = time.perf_counter()
+    try:
+        pdf = render_pdf_bytes(bill)
+    except Exception as exc:
+        logger.exception("PDF render failed for bill %s", bill.pk)
+        document.status = "failed"
+        document.content_hash = content_hash
+        document.error = str(exc)
+        document.save(update_fields=["status", "content_hash", "error"])
+        return document
+
+    previous = document.file.name if document.file else None
+    document.file.save(f"{content_hash}.pdf", ContentFile(pdf), save=False)
+    document.status = "ready"
+    document.content_hash = content_hash
+    document.error = ""
+    document.rendered_at = timezone.now()
+    document.render_seconds = time.perf_counter() - t0
+    document.save()
+    if previous and previous != document.file.name:
+        document.file.storage.delete(previous)
+
+    logger.info("Rendered PDF for bill %s in %.2fs", bill.pk, document.render_seconds)
+    return document
+
+
+def invalidate_bill_pdf(bill_id) -> None:
+    """Drop a stored PDF that no longer matches its bill; re-render issued bills."""
+    document = BillPDF.objects.filter(bill_id=bill_id).first()
+    try:
+        bill = _load_bill(bill_id)
+    except Bill.DoesNotExist:
+        return
+
+    if document is not None and document.content_hash != bill_content_hash(bill):
+        if document.file:
+            document.file.delete(save=False)
+        document.delete()
+        document = None
+
+    if document is None and bill.status in RENDER_ON_STATUSES and pisa is not None:
+        request_bill_pdf(bill)
@@ -1,24 +1,27 @@
-import os
-from django.http import HttpResponse
-from django.template.loader import get_template
-try:
-    from xhtml2pdf import pisa
-except ImportError:
-    pisa = None
+from django.http import FileResponse, HttpResponse
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import status
 from rest_framework.response import Response
 
 from .models import Bill
+from .pdf import pisa, request_bill_pdf
 
 class GenerateBillPDFView(APIView):
+    """
+    Download a bill's PDF.
+
+    PDFs are rendered by a Celery worker and cached in media storage. Until
+    the current PDF exists this returns 202 with a Retry-After header;
+    poll the same URL. Pass ?retry=1 to re-queue a failed render.
+    """
+
     permission_classes = [IsAuthenticated]
 
     def get(self, request, pk=None):
         try:
-            bill = Bill.objects.get(pk=pk)
-            
+            bill = Bill.objects.select_related("customer").prefetch_related("line_items").get(pk=pk)
+
             # Ensure user owns the bill
             if not request.user.is_staff and bill.customer.user != request.user:
                  return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
@@ -26,27 +29,30 @@ class GenerateBillPDFView(APIView):
         except Bill.DoesNotExist:
             return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
 
-        # Context for template
-        context = {"bill": bill}
-        
-        # Determine template path (we need to create this)
-        template_path = "billing/bill_pdf.html"
-        
-        # Create response
-        response = HttpResponse(content_type="application/pdf")
-        response["Content-Disposition"] = f'attachment; filename="bill_{bill.pk}.pdf"'
-        
-        # Find template
-        template = get_template(template_path)
-        html = template.render(context)
-        
-        # Create PDF
         if pisa is None:
             return HttpResponse("PDF generation disabled", status=501)
 
-        pisa_status = pisa.CreatePDF(html, dest=response)
-        
-        if pisa_status.err:
-            return Response({"error": "PDF generation failed"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-            
+        document = request_bill_pdf(bill, retry_failed=request.query_params.get("retry") == "1")
+
+        if document.status == "ready":
+            response = FileResponse(
+                document.file.open("rb"),
+                as_attachment=True,
+                filename=f"bill_{bill.pk}.pdf",
+                content_type="application/pdf",
+            )
+            response["ETag"] = f'"{document.content_hash}"'
+            return response
+
+        if document.status == "failed":
+            return Response(
+                {"error": "PDF generation failed", "detail": document.error},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+        response = Response(
+            {"status": "pending", "bill": str(bill.pk), "requested_at": document.requested_at},
+            status=status.HTTP_202_ACCEPTED,
+        )
+        response["Retry-After"] = "2"
         return response
@@ -0,0 +1,192 @@
+"""
+Incremental re-billing after late or corrected readings.
+
+mark_stale_bills(readings)
+  → maps the (meter, local date) of each ingested reading to the bills
+    whose period covers it and flags those bills stale.
+rebill_stale_bills()
+  → recalculates only the stale bills with the batch engine and records a
+    BillAdjustment wherever the totals moved.
+settled_totals(bill_ids)
+  → each bill's totals after its adjustments, as (total_kwh,
+    total_amount_pence).
+
+Bills in a period are matched the same way generate_bill selects readings:
+by the reading's date in the current timezone. Void bills are never
+touched. Draft bills are rewritten in place; issued and paid bills keep
+their totals and the adjustment records the difference to settle. Each
+adjustment is taken against the bill's settled totals (the latest
+adjustment's new totals, if any), so successive corrections chain and
+their differences sum to the net amount to settle.
+"""
+
+import logging
+from collections import defaultdict
+from functools import partial
+
+from django.db import transaction
+from django.utils import timezone
+
+from customers.models import Meter
+from tariffs.assignments import AssignmentResolver
+
+from .batch import calculate_bills
+from .models import Bill, BillAdjustment, BillLineItem
+from .pdf import invalidate_bill_pdf
+
+logger = logging.getLogger(__name__)
+
+REBILL_CHUNK_SIZE = 500
+TOTAL_FIELDS = ("total_kwh", "standing_charge_pence", "usage_charge_pence", "total_amount_pence")
+
+
+def mark_stale_bills(readings) -> int:
+    """Flag every non-void bill covering one of the readings. Returns bills newly flagged."""
+    meter_dates = defaultdict(set)
+    for reading in readings:
+        meter_dates[reading.meter_id].add(timezone.localtime(reading.reading_at).date())
+    if not meter_dates:
+        return 0
+
+    dates_by_customer = defaultdict(set)
+    for meter_id, customer_id in Meter.objects.filter(pk__in=list(meter_dates)).values_list(
+        "id", "property__customer_id"
+    ):
+        dates_by_customer[customer_id] |= meter_dates[meter_id]
+    if not dates_by_customer:
+        return 0
+
+    all_dates = set().union(*dates_by_customer.values())
+    candidates = (
+        Bill.objects.filter(
+            customer_id__in=list(dates_by_customer),
+            period_start__lte=max(all_dates),
+            period_end__gte=min(all_dates),
+            stale_since__isnull=True,
+        )
+        .exclude(status="void")
+        .order_by()
+        .values_list("id", "customer_id", "period_start", "period_end")
+    )
+    stale_ids = [
+        bill_id
+        for bill_id, customer_id, start, end in candidates
+        if any(start <= d <= end for d in dates_by_customer[customer_id])
+    ]
+    if stale_ids:
+        Bill.objects.filter(pk__in=stale_ids, stale_since__isnull=True).update(stale_since=timezone.now())
+        logger.info("Marked %d bills stale after ingesting %d readings", len(stale_ids), len(readings))
+    return len(stale_ids)
+
+
+def rebill_stale_bills(limit: int | None = None) -> dict:
+    """
+    Recalculate stale bills, oldest flag first.
+
+    Bills are grouped by period so each group is one calculate_bills()
+    call per chunk of customers. Returns counts of bills recalculated,
+    adjusted (totals changed) and failed.
+    """
+    stale = Bill.objects.filter(stale_since__isnull=False).order_by("stale_since")
+    if limit:
+        stale = stale[:limit]
+
+    by_period = defaultdict(list)
+    for bill in stale:
+        by_period[(bill.period_start, bill.period_end)].append(bill)
+
+    # Every affected customer's assignments across all the periods, once
+    resolver = AssignmentResolver()
+    if by_period:
+        resolver.overlapping(
+            {b.customer_id for bills in by_period.values() for b in bills},
+            min(start for start, _ in by_period),
+            max(end for _, end in by_period),
+        )
+
+    counts = {"recalculated": 0, "adjusted": 0, "failed": 0}
+    for (period_start, period_end), bills in by_period.items():
+        for start in range(0, len(bills), REBILL_CHUNK_SIZE):
+            chunk = bills[start : start + REBILL_CHUNK_SIZE]
+            for key, value in _rebill_chunk(chunk, period_start, period_end, resolver).items():
+                counts[key] += value
+
+    logger.info(
+        "Re-billed %d stale bills: %d adjusted, %d failed",
+        counts["recalculated"], counts["adjusted"], counts["failed"],
+    )
+    return counts
+
+
+def settled_totals(bill_ids) -> dict:
+    """
+    {bill_id: (total_kwh, total_amount_pence)} as settled after
+    adjustments, for the bills that have any; other bills stand at their
+    stored totals.
+    """
+    settled = {}
+    for bill_id, kwh, amount in (
+        BillAdjustment.objects.filter(bill_id__in=list(bill_ids))
+        .order_by("created_at", "pk")
+        .values_list("bill_id", "new_total_kwh", "new_total_amount_pence")
+    ):
+        settled[bill_id] = (kwh, amount)  # the latest adjustment wins
+    return settled
+
+
+def _rebill_chunk(bills: list[Bill], period_start, period_end, resolver=None) -> dict:
+    calculations, failures = calculate_bills(
+        [b.customer_id for b in bills], period_start, period_end, resolver=resolver,
+    )
+    by_customer = {c.customer_id: c for c in calculations}
+    settled = settled_totals(b.pk for b in bills)
+
+    adjusted = 0
+    with transaction.atomic():
+        for bill in bills:
+            calc = by_customer.get(str(bill.customer_id))
+            if calc is None:
+                # Leave it flagged; the failure is logged and retried next sweep
+                logger.warning(
+                    "Cannot re-bill %s: %s", bill.pk, failures.get(str(bill.customer_id), "unknown error"),
+                )
+                continue
+
+            # Only clear the flag we read: readings landing mid-recalculation re-flag it
+            cleared = Bill.objects.filter(pk=bill.pk, stale_since=bill.stale_since).update(stale_since=None)
+            if not cleared:
+                continue
+
+            applied = bill.status == "draft"
+            if applied:
+                unchanged = all(getattr(bill, f) == calc.totals[f] for f in TOTAL_FIELDS)
+                previous_kwh, previous_amount = bill.total_kwh, bill.total_amount_pence
+            else:
+                previous_kwh, previous_amount = settled.get(bill.pk, (bill.total_kwh, bill.total_amount_pence))
+                unchanged = (calc.totals["total_kwh"], calc.totals["total_amount_pence"]) == (
+                    previous_kwh, previous_amount,
+                )
+            if unchanged:
+                continue
+
+            BillAdjustment.objects.create(
+                bill=bill,
+                previous_total_kwh=previous_kwh,
+                new_total_kwh=calc.totals["total_kwh"],
+                previous_total_amount_pence=previous_amount,
+                new_total_amount_pence=calc.totals["total_amount_pence"],
+                kwh_difference=calc.totals["total_kwh"] - previous_kwh,
+                amount_difference_pence=calc.totals["total_amount_pence"] - previous_amount,
+                applied=applied,
+            )
+            if applied:
+                Bill.objects.filter(pk=bill.pk).update(**calc.totals)
+                bill.line_items.all().delete()
+                BillLineItem.objects.bulk_create(
+                    BillLineItem(bill=bill, meter_id=calc.meter_id, tariff_id=calc.tariff_id, **li)
+                    for li in calc.line_items
+                )
+                transaction.on_commit(partial(invalidate_bill_pdf, bill.pk))
+            adjusted += 1
+
+    return {"recalculated": len(calculations), "adjusted": adjusted, "failed": len(failures)}
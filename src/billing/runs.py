@@ -0,0 +1,192 @@
+"""
+Bill run orchestration.
+
+start_bill_run(period_start, period_end)
+  → creates a BillRun, splits billable customers into chunks and
+    dispatches one Celery task per chunk.
+
+Chunks are idempotent: customers that already have a Bill for the period
+are skipped, so a crashed or failed chunk can simply be dispatched again
+with resume_bill_run() / retry_failed_chunks(). A worker claims a chunk
+under a row lock; a delivery that finds it running or completed does
+nothing, so redelivered tasks never bill a chunk twice at once.
+"""
+
+import logging
+import time
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from tariffs.models import CustomerTariff
+
+from .batch import BatchBillingResult, generate_bills_batch
+from .models import Bill, BillRun, BillRunChunk
+from .tasks import BATCH_SIZE, process_bill_run_chunk_task
+
+logger = logging.getLogger(__name__)
+
+
+def billable_customer_ids(period_start, period_end) -> list[str]:
+    """Customers with a tariff assignment overlapping the period."""
+    return [
+        str(cid)
+        for cid in CustomerTariff.objects.filter(effective_from__lte=period_end)
+        .filter(Q(effective_to__isnull=True) | Q(effective_to__gte=period_start))
+        .order_by("customer_id")
+        .values_list("customer_id", flat=True)
+        .distinct()
+    ]
+
+
+def start_bill_run(period_start, period_end, chunk_size: int = BATCH_SIZE) -> BillRun:
+    """Create a bill run for the period and dispatch all of its chunks."""
+    customer_ids = billable_customer_ids(period_start, period_end)
+
+    with transaction.atomic():
+        run = BillRun.objects.create(
+            period_start=period_start,
+            period_end=period_end,
+            chunk_size=chunk_size,
+            total_customers=len(customer_ids),
+            chunks_total=(len(customer_ids) + chunk_size - 1) // chunk_size,
+        )
+        chunks = BillRunChunk.objects.bulk_create([
+            BillRunChunk(run=run, index=i, customer_ids=customer_ids[start : start + chunk_size])
+            for i, start in enumerate(range(0, len(customer_ids), chunk_size))
+        ])
+        _dispatch(run, chunks)
+
+    if not chunks:
+        refresh_bill_run(run.pk)
+
+    logger.info(
+        "Bill run %s: %d customers in %d chunks for %s–%s",
+        run.pk, len(customer_ids), len(chunks), period_start, period_end,
+    )
+    run.refresh_from_db()
+    return run
+
+
+def resume_bill_run(run: BillRun, statuses=("pending", "running", "failed")) -> int:
+    """
+    Re-dispatch every chunk of a run that has not completed.
+
+    Chunks left "running" by a dead worker are included, so only resume a
+    run once its workers have stopped. Returns the number of chunks sent.
+    """
+    with transaction.atomic():
+        run = BillRun.objects.select_for_update().get(pk=run.pk)
+        chunks = list(run.chunks.filter(status__in=statuses))
+        if chunks:
+            BillRunChunk.objects.filter(pk__in=[c.pk for c in chunks]).update(status="pending")
+            run.finished_at = None
+            run.wall_time_seconds = None
+            run.customers_per_second = None
+            run.save(update_fields=["finished_at", "wall_time_seconds", "customers_per_second"])
+            _dispatch(run, chunks)
+
+    logger.info("Bill run %s: re-dispatched %d chunks", run.pk, len(chunks))
+    return len(chunks)
+
+
+def retry_failed_chunks(run: BillRun) -> int:
+    """Re-dispatch only the chunks that failed."""
+    return resume_bill_run(run, statuses=("failed",))
+
+
+def _dispatch(run: BillRun, chunks: list[BillRunChunk]) -> None:
+    if chunks:
+        BillRun.objects.filter(pk=run.pk).update(status="running")
+        BillRun.objects.filter(pk=run.pk, started_at__isnull=True).update(started_at=timezone.now())
+
+    chunk_ids = [c.pk for c in chunks]
+    transaction.on_commit(
+        lambda: [process_bill_run_chunk_task.delay(chunk_id) for chunk_id in chunk_ids]
+    )
+
+
+def process_bill_run_chunk(chunk_id: int) -> BillRunChunk:
+    """Bill one chunk, skipping customers already billed for the period."""
+    # Claim the chunk under a row lock, so a concurrent duplicate delivery
+    # finds it running and leaves it alone
+    with transaction.atomic():
+        chunk = BillRunChunk.objects.select_for_update(of=("self",)).select_related("run").get(pk=chunk_id)
+        if chunk.status in ("running", "completed"):
+            return chunk  # duplicate delivery
+
+        chunk.status = "running"
+        chunk.attempts += 1
+        chunk.error = ""
+        chunk.started_at = timezone.now()
+        chunk.save(update_fields=["status", "attempts", "error", "started_at"])
+    run = chunk.run
+
+    t0 = time.perf_counter()
+    try:
+        existing = dict(
+            Bill.objects.filter(
+                customer_id__in=chunk.customer_ids,
+                period_start=run.period_start,
+                period_end=run.period_end,
+            ).values_list("customer_id", "bill_run_id")
+        )
+        billed = {str(cid) for cid in existing}
+        todo = [cid for cid in chunk.customer_ids if cid not in billed]
+        if todo:
+            result = generate_bills_batch(todo, run.period_start, run.period_end, bill_run=run)
+        else:
+            result = BatchBillingResult()
+    except Exception as exc:
+        logger.exception("Bill run %s chunk %d failed", run.pk, chunk.index)
+        chunk.status = "failed"
+        chunk.error = str(exc)
+    else:
+        # Bills from an earlier attempt of this run still count as billed
+        billed_earlier = sum(1 for run_id in existing.values() if run_id == run.pk)
+        chunk.billed = len(result.bills) + billed_earlier
+        chunk.skipped = len(existing) - billed_earlier
+        chunk.failed = len(result.failures)
+        chunk.failures = result.failures
+        chunk.status = "failed" if result.failures else "completed"
+
+    chunk.finished_at = timezone.now()
+    chunk.duration_seconds = time.perf_counter() - t0
+    chunk.save()
+
+    refresh_bill_run(run.pk)
+    return chunk
+
+
+def refresh_bill_run(run_id) -> BillRun:
+    """Roll chunk progress up into the run and close it once every chunk is done."""
+    with transaction.atomic():
+        run = BillRun.objects.select_for_update().get(pk=run_id)
+        agg = run.chunks.aggregate(
+            billed=Sum("billed"),
+            skipped=Sum("skipped"),
+            failed=Sum("failed"),
+            completed=Count("id", filter=Q(status="completed")),
+            failed_chunks=Count("id", filter=Q(status="failed")),
+        )
+        run.customers_billed = agg["billed"] or 0
+        run.customers_skipped = agg["skipped"] or 0
+        run.customers_failed = agg["failed"] or 0
+        run.chunks_completed = agg["completed"]
+        run.chunks_failed = agg["failed_chunks"]
+
+        if run.chunks_completed + run.chunks_failed == run.chunks_total:
+            run.status = "completed_with_errors" if run.chunks_failed else "completed"
+            run.finished_at = timezone.now()
+            run.started_at = run.started_at or run.finished_at
+            run.wall_time_seconds = (run.finished_at - run.started_at).total_seconds()
+            if run.wall_time_seconds > 0:
+                run.customers_per_second = run.customers_billed / run.wall_time_seconds
+            logger.info(
+                "Bill run %s %s: %d billed, %d skipped, %d failed in %.1fs",
+                run.pk, run.status, run.customers_billed, run.customers_skipped,
+                run.customers_failed, run.wall_time_seconds,
+            )
+        run.save()
+    return run
@@ -1,6 +1,15 @@
 from rest_framework import serializers
 
-from .models import Bill, BillLineItem
+from .models import (
+    Bill,
+    BillAdjustment,
+    BillAudit,
+    BillDiscrepancy,
+    BillExport,
+    BillLineItem,
+    BillRun,
+    BillRunChunk,
+)
 
 
 class BillLineItemSerializer(serializers.ModelSerializer):
@@ -17,8 +26,19 @@ class BillLineItemSerializer(serializers.ModelSerializer):
         return f"{obj.amount_pence / 100:.2f}"
 
 
+class BillAdjustmentSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = BillAdjustment
+        fields = [
+            "id", "previous_total_kwh", "new_total_kwh",
+            "previous_total_amount_pence", "new_total_amount_pence",
+            "kwh_difference", "amount_difference_pence", "applied", "created_at",
+        ]
+
+
 class BillSerializer(serializers.ModelSerializer):
     line_items = BillLineItemSerializer(many=True, read_only=True)
+    adjustments = BillAdjustmentSerializer(many=True, read_only=True)
     customer_account = serializers.CharField(source="customer.account_number", read_only=True)
     total_pounds = serializers.SerializerMethodField()
 
@@ -29,9 +49,9 @@ class BillSerializer(serializers.ModelSerializer):
             "period_start", "period_end", "status",
             "total_kwh", "standing_charge_pence", "usage_charge_pence",
             "total_amount_pence", "total_pounds",
-            "issued_at", "created_at", "line_items",
+            "issued_at", "stale_since", "created_at", "line_items", "adjustments",
         ]
-        read_only_fields = ["id", "created_at"]
+        read_only_fields = ["id", "stale_since", "created_at"]
 
     def get_total_pounds(self, obj):
         return f"{obj.total_amount_pence / 100:.2f}"
@@ -57,3 +77,130 @@ class GenerateBillSerializer(serializers.Serializer):
     customer_id = serializers.UUIDField()
     period_start = serializers.DateField()
     period_end = serializers.DateField()
+
+
+class BillRunChunkSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = BillRunChunk
+        fields = [
+            "index", "status", "attempts", "billed", "skipped", "failed",
+            "failures", "error", "started_at", "finished_at", "duration_seconds",
+        ]
+
+
+class BillRunSerializer(serializers.ModelSerializer):
+    failed_chunks = serializers.SerializerMethodField()
+
+    class Meta:
+        model = BillRun
+        fields = [
+            "id", "period_start", "period_end", "status", "chunk_size",
+            "total_customers", "chunks_total", "chunks_completed", "chunks_failed",
+            "customers_billed", "customers_skipped", "customers_failed",
+            "started_at", "finished_at", "wall_time_seconds", "customers_per_second",
+            "created_at", "failed_chunks",
+        ]
+        read_only_fields = fields
+
+    def get_failed_chunks(self, obj):
+        return BillRunChunkSerializer(obj.chunks.filter(status="failed"), many=True).data
+
+
+class StartBillRunSerializer(serializers.Serializer):
+    period_start = serializers.DateField()
+    period_end = serializers.DateField()
+    chunk_size = serializers.IntegerField(default=500, min_value=1, max_value=5000)
+
+    def validate(self, attrs):
+        if attrs["period_end"] < attrs["period_start"]:
+            raise serializers.ValidationError("period_end must not be before period_start")
+        return attrs
+
+
+class BillAuditSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = BillAudit
+        fields = [
+            "id", "period_start", "period_end", "status", "chunk_size",
+            "bills_total", "bills_checked", "chunks_total", "chunks_completed", "chunks_failed",
+            "discrepancies_found", "amount_difference_pence", "report",
+            "started_at", "finished_at",
+        ]
+        read_only_fields = fields
+
+
+class BillDiscrepancySerializer(serializers.ModelSerializer):
+    customer_account = serializers.CharField(source="bill.customer.account_number", read_only=True)
+    period_start = serializers.DateField(source="bill.period_start", read_only=True)
+    period_end = serializers.DateField(source="bill.period_end", read_only=True)
+
+    class Meta:
+        model = BillDiscrepancy
+        fields = [
+            "bill", "customer_account", "period_start", "period_end", "kind",
+            "stored_total_pence", "expected_total_pence", "difference_pence", "details",
+        ]
+        read_only_fields = fields
+
+
+class StartBillAuditSerializer(serializers.Serializer):
+    period_start = serializers.DateField(required=False, allow_null=True, default=None)
+    period_end = serializers.DateField(required=False, allow_null=True, default=None)
+    chunk_size = serializers.IntegerField(default=500, min_value=1, max_value=5000)
+
+
+class BillExportSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = BillExport
+        fields = [
+            "id", "period_start", "period_end", "bill_run", "statuses", "status",
+            "bills_total", "pdfs_rendered", "bills_added", "bills_failed",
+            "file", "error", "created_at", "finished_at",
+        ]
+        read_only_fields = fields
+
+
+class StartBillExportSerializer(serializers.Serializer):
+    """Bills for a bill run, or for a period (bills starting and ending inside it)."""
+
+    period_start = serializers.DateField(required=False, allow_null=True, default=None)
+    period_end = serializers.DateField(required=False, allow_null=True, default=None)
+    bill_run = serializers.PrimaryKeyRelatedField(
+        queryset=BillRun.objects.all(), required=False, allow_null=True, default=None,
+    )
+    statuses = serializers.ListField(
+        child=serializers.ChoiceField(choices=[c for c, _ in Bill.STATUS_CHOICES]),
+        default=["issued"],
+        allow_empty=False,
+    )
+
+    def validate(self, attrs):
+        if attrs["bill_run"] is None and not (attrs["period_start"] and attrs["period_end"]):
+            raise serializers.ValidationError("Give a bill_run or both period_start and period_end")
+        return attrs
+
+
+class AccrualLineSerializer(serializers.Serializer):
+    description = serializers.CharField()
+    rate_band_label = serializers.CharField(allow_blank=True)
+    kwh = serializers.DecimalField(max_digits=12, decimal_places=4)
+    rate_pence_per_kwh = serializers.DecimalField(max_digits=8, decimal_places=4)
+    amount_pence = serializers.DecimalField(max_digits=10, decimal_places=2)
+
+
+class AccrualStatementSerializer(serializers.Serializer):
+    """Read-only view of billing.accrual.accrual_statement()."""
+
+    customer = serializers.UUIDField()
+    tariff = serializers.CharField()
+    period_start = serializers.DateField()
+    period_end = serializers.DateField()
+    as_of = serializers.DateField()
+    line_items = AccrualLineSerializer(many=True)
+    total_kwh = serializers.DecimalField(max_digits=12, decimal_places=4)
+    standing_charge_pence = serializers.DecimalField(max_digits=10, decimal_places=2)
+    usage_charge_pence = serializers.DecimalField(max_digits=10, decimal_places=2)
+    total_amount_pence = serializers.DecimalField(max_digits=10, decimal_places=2)
+    last_reading_at = serializers.DateTimeField(allow_null=True)
+    updated_at = serializers.DateTimeField()
+    reconciled_at = serializers.DateTimeField(allow_null=True)
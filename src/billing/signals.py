@@ -0,0 +1,52 @@
+"""
+Signal handlers for billing.
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from metering.signals import readings_ingested
+
+from .models import Bill, BillLineItem, BillPDF
+
+
+@receiver(readings_ingested)
+def accrue_ingested_readings(sender, readings, replaced=(), **kwargs):
+    from .accrual import record_readings
+
+    record_readings(readings, replaced)
+
+
+@receiver(readings_ingested)
+def flag_stale_bills(sender, readings, replaced=(), **kwargs):
+    from .rebilling import mark_stale_bills
+    from .tasks import rebill_stale_bills_task
+
+    if mark_stale_bills(list(readings) + list(replaced)):
+        transaction.on_commit(rebill_stale_bills_task.delay)
+
+
+@receiver(post_save, sender=Bill)
+def refresh_pdf_on_bill_change(sender, instance, created, **kwargs):
+    from .pdf import RENDER_ON_STATUSES, invalidate_bill_pdf
+
+    if instance.status in RENDER_ON_STATUSES or (
+        not created and BillPDF.objects.filter(bill_id=instance.pk).exists()
+    ):
+        transaction.on_commit(lambda: invalidate_bill_pdf(instance.pk))
+
+
+@receiver(post_save, sender=BillLineItem)
+@receiver(post_delete, sender=BillLineItem)
+def refresh_pdf_on_line_item_change(sender, instance, **kwargs):
+    from .pdf import invalidate_bill_pdf
+
+    if BillPDF.objects.filter(bill_id=instance.bill_id).exists():
+        transaction.on_commit(lambda: invalidate_bill_pdf(instance.bill_id))
+
+
+@receiver(post_delete, sender=BillPDF)
+def delete_pdf_file(sender, instance, **kwargs):
+    if instance.file:
+        instance.file.delete(save=False)
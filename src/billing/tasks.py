@@ -9,6 +9,8 @@ from celery import shared_task
 
 logger = logging.getLogger(__name__)
 
+BATCH_SIZE = 500  # customers per batch billing task
+
 
 @shared_task
 def generate_bill_task(customer_id: str, period_start: str, period_end: str):
@@ -24,27 +26,101 @@ def generate_bill_task(customer_id: str, period_start: str, period_end: str):
 
 
 @shared_task
-def generate_all_bills_task(period_start: str, period_end: str):
-    """Generate bills for all customers with active tariff assignments."""
-    from customers.models import Customer
-    from tariffs.models import CustomerTariff
+def generate_bills_batch_task(customer_ids: list[str], period_start: str, period_end: str):
+    """Generate bills for a chunk of customers with the batch engine."""
+    from billing.batch import generate_bills_batch
+
+    result = generate_bills_batch(
+        customer_ids=customer_ids,
+        period_start=date.fromisoformat(period_start),
+        period_end=date.fromisoformat(period_end),
+    )
+    return {"billed": len(result.bills), "failures": result.failures}
 
-    start = date.fromisoformat(period_start)
-    end = date.fromisoformat(period_end)
 
-    # Find customers with active tariffs
-    customer_ids = (
-        CustomerTariff.objects.filter(
-            effective_from__lte=end,
-        )
-        .values_list("customer_id", flat=True)
-        .distinct()
+@shared_task
+def backfill_bills_task(customer_ids: list[str], periods: list[list[str]]):
+    """Backfill bills for a batch of customers over several periods."""
+    from billing.backfill import backfill_bills
+
+    result = backfill_bills(
+        customer_ids=customer_ids,
+        periods=[(date.fromisoformat(start), date.fromisoformat(end)) for start, end in periods],
     )
+    return {"billed": len(result.bills), "failures": result.failures}
+
+
+@shared_task
+def generate_all_bills_task(period_start: str, period_end: str, chunk_size: int = BATCH_SIZE):
+    """Start a bill run covering every customer with an active tariff assignment."""
+    from billing.runs import start_bill_run
+
+    run = start_bill_run(
+        period_start=date.fromisoformat(period_start),
+        period_end=date.fromisoformat(period_end),
+        chunk_size=chunk_size,
+    )
+    return {"bill_run_id": str(run.pk), "chunks": run.chunks_total, "customers": run.total_customers}
+
+
+@shared_task
+def process_bill_run_chunk_task(chunk_id: int):
+    """Bill one chunk of a bill run."""
+    from billing.runs import process_bill_run_chunk
+
+    chunk = process_bill_run_chunk(chunk_id)
+    return {"chunk_id": chunk_id, "status": chunk.status, "billed": chunk.billed}
+
+
+@shared_task
+def reconcile_accruals_task():
+    """Nightly: recompute open-period accruals and close finished periods."""
+    from billing.accrual import reconcile_accruals
 
-    results = []
-    for cid in customer_ids:
-        generate_bill_task.delay(str(cid), period_start, period_end)
-        results.append(str(cid))
+    return reconcile_accruals()
+
+
+@shared_task
+def rebill_stale_bills_task():
+    """Recalculate bills flagged stale by late or corrected readings."""
+    from billing.rebilling import rebill_stale_bills
+
+    return rebill_stale_bills()
+
+
+@shared_task
+def start_bill_audit_task(period_start: str | None = None, period_end: str | None = None):
+    """Start a reconciliation audit of stored bills (all bills when no range is given)."""
+    from billing.audit import start_bill_audit
+
+    audit = start_bill_audit(
+        period_start=date.fromisoformat(period_start) if period_start else None,
+        period_end=date.fromisoformat(period_end) if period_end else None,
+    )
+    return {"audit_id": str(audit.pk), "bills": audit.bills_total, "chunks": audit.chunks_total}
+
+
+@shared_task
+def audit_bill_chunk_task(audit_id: str, bill_ids: list[str]):
+    """Recompute one chunk of bills in memory and record discrepancies."""
+    from billing.audit import audit_bill_chunk
+
+    return {"audit_id": audit_id, "discrepancies": audit_bill_chunk(audit_id, bill_ids)}
+
+
+@shared_task
+def render_bill_pdf_task(bill_id: str):
+    """Render a bill's PDF into media storage."""
+    from billing.pdf import render_bill_pdf
+
+    document = render_bill_pdf(bill_id)
+    return {"bill_id": bill_id, "status": document.status, "file": document.file.name}
+
+
+@shared_task
+def export_bill_pdfs_task(export_id: str):
+    """Build a ZIP of bill PDFs into media storage."""
+    from billing.export import run_bill_export
 
-    logger.info("Dispatched %d bill generation tasks", len(results))
-    return {"dispatched": len(results)}
+    export = run_bill_export(export_id)
+    return {"export_id": export_id, "status": export.status, "bills": export.bills_added}
@@ -0,0 +1,386 @@
+import io
+import tempfile
+import zipfile
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from fractions import Fraction
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from hypothesis import example, given, settings, strategies as st
+from rest_framework.test import APIClient
+
+from customers.models import Customer, Meter, Property
+from metering.ingestion import save_readings
+from metering.models import MeterReading
+from tariffs.lookup import CompiledBand, CompiledTariff
+from tariffs.models import CustomerTariff, RateBand, Tariff
+
+from .accrual import accrual_statement, record_readings
+from .audit import audit_bill_chunk, start_bill_audit
+from .backfill import backfill_bills, monthly_periods
+from .batch import calculate_bills
+from .fixedpoint import kwh_to_mwh, mwh_to_kwh, price_bill, round_half_even
+from .models import Accrual, Bill, BillAudit, BillPDF, BillRunChunk
+from .pdf import render_bill_pdf
+from .rebilling import TOTAL_FIELDS, rebill_stale_bills
+from .runs import process_bill_run_chunk, start_bill_run
+from .services import calculate_line_items, generate_bill, summarise_line_items
+
+LINE_ITEM_FIELDS = ("description", "rate_band_label", "kwh", "rate_pence_per_kwh", "amount_pence")
+TIME_OF_USE = (("Day", time(7), time(23), "28.1230"), ("Night", time(23), time(7), "13.4570"))
+
+LOCMEM_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+def make_customer(suffix="1", rates=(("Standard", None, None, "24.5000"),)):
+    """A customer with one meter on a tariff of the given (label, start, end, rate) bands."""
+    customer = Customer.objects.create(
+        account_number=f"GG-TEST-{suffix}", first_name="Test", last_name="Customer",
+        email=f"test{suffix}@example.com",
+    )
+    prop = Property.objects.create(customer=customer, address_line_1="1 Test Street", city="London", postcode="SW1A 1AA")
+    meter = Meter.objects.create(property=prop, mpan=f"1900000000{suffix}", serial_number="S1", fuel_type="electricity")
+    tariff = Tariff.objects.create(
+        name="Test", code=f"TEST-{suffix}", fuel_type="electricity",
+        tariff_type="time_of_use" if len(rates) > 1 else "variable",
+        standing_charge_pence=Decimal("45.0000"), valid_from=date(2024, 1, 1),
+    )
+    for label, start, end, rate in rates:
+        RateBand.objects.create(tariff=tariff, label=label, start_time=start, end_time=end, rate_pence_per_kwh=Decimal(rate))
+    CustomerTariff.objects.create(customer=customer, tariff=tariff, effective_from=date(2024, 1, 1))
+    return customer, meter
+
+
+def half_hours(day: date, count: int = 48):
+    start = timezone.make_aware(datetime.combine(day, datetime.min.time()))
+    return [start + timedelta(minutes=30 * i) for i in range(count)]
+
+
+def add_readings(meter, day: date, value_kwh="0.5000"):
+    MeterReading.objects.bulk_create(
+        MeterReading(meter=meter, reading_at=at, value_kwh=Decimal(value_kwh)) for at in half_hours(day)
+    )
+
+
+def correct_reading(meter, value_kwh):
+    """Re-ingest one reading on 10 January with a new value, then re-bill."""
+    at = half_hours(date(2025, 1, 10))[20]
+    save_readings([MeterReading(meter=meter, reading_at=at, value_kwh=Decimal(value_kwh))])
+    rebill_stale_bills()
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class RebillingTests(TestCase):
+    period_start, period_end = date(2025, 1, 1), date(2025, 1, 31)
+
+    def setUp(self):
+        self.customer, self.meter = make_customer()
+        add_readings(self.meter, date(2025, 1, 10))
+
+    def test_successive_corrections_chain_on_an_issued_bill(self):
+        bill = generate_bill(self.customer.pk, self.period_start, self.period_end)
+        Bill.objects.filter(pk=bill.pk).update(status="issued")
+        original = bill.total_amount_pence
+
+        correct_reading(self.meter, "1.5000")
+        correct_reading(self.meter, "2.0000")
+
+        first, second = bill.adjustments.order_by("created_at", "pk")
+        self.assertEqual(second.previous_total_kwh, first.new_total_kwh)
+        self.assertEqual(second.previous_total_amount_pence, first.new_total_amount_pence)
+        self.assertEqual(second.kwh_difference, Decimal("0.5000"))
+
+        # Issued totals stay put; the adjustments sum to the recalculated bill
+        calculations, _ = calculate_bills([self.customer.pk], self.period_start, self.period_end)
+        recalculated = calculations[0].totals["total_amount_pence"]
+        bill.refresh_from_db()
+        self.assertEqual(bill.total_amount_pence, original)
+        self.assertEqual(
+            sum(a.amount_difference_pence for a in bill.adjustments.all()), recalculated - original,
+        )
+
+    def test_unchanged_recalculation_records_no_adjustment(self):
+        bill = generate_bill(self.customer.pk, self.period_start, self.period_end)
+        Bill.objects.filter(pk=bill.pk).update(status="issued")
+
+        correct_reading(self.meter, "1.5000")
+        correct_reading(self.meter, "1.5000")
+
+        self.assertEqual(bill.adjustments.count(), 1)
+
+
+def varied_readings(meter, start: datetime, end: datetime):
+    """Half-hourly UTC readings from start to end with uneven values."""
+    readings, at, i = [], start, 0
+    while at < end:
+        readings.append(MeterReading(meter=meter, reading_at=at, value_kwh=Decimal(i * 3769 % 9973).scaleb(-4)))
+        at, i = at + timedelta(minutes=30), i + 1
+    return MeterReading.objects.bulk_create(readings)
+
+
+def by_amount(items):
+    """Line-item dicts in a fixed order, whichever path produced them."""
+    items = [{f: li[f] for f in LINE_ITEM_FIELDS} for li in items]
+    return sorted(items, key=lambda li: (li["amount_pence"], li["description"]))
+
+
+def line_items(bill):
+    return by_amount(bill.line_items.values(*LINE_ITEM_FIELDS))
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class BillingParityTests(TestCase):
+    """The batch, backfill and accrual paths price exactly as generate_bill does."""
+
+    def setUp(self):
+        self.customers = {}
+        for suffix, rates in (("1", TIME_OF_USE), ("2", (("Standard", None, None, "24.5670"),))):
+            customer, meter = make_customer(suffix, rates)
+            # Across the clocks going forward (30 March) and the March/April boundary,
+            # which falls at 23:00 UTC on 31 March
+            varied_readings(
+                meter,
+                datetime(2025, 3, 28, tzinfo=dt_timezone.utc), datetime(2025, 4, 2, 12, tzinfo=dt_timezone.utc),
+            )
+            self.customers[suffix] = customer
+
+    def assertMatchesGenerateBill(self, customer, start, end, items, totals):
+        bill = generate_bill(customer.pk, start, end)
+        self.assertEqual(by_amount(items), line_items(bill))
+        self.assertEqual({f: totals[f] for f in TOTAL_FIELDS}, {f: getattr(bill, f) for f in TOTAL_FIELDS})
+        bill.delete()
+
+    def test_batch_calculation_matches_generate_bill(self):
+        for start, end in ((date(2025, 3, 1), date(2025, 3, 31)), (date(2025, 3, 30), date(2025, 3, 30))):
+            calculations, failures = calculate_bills([c.pk for c in self.customers.values()], start, end)
+            self.assertEqual(failures, {})
+            for calc in calculations:
+                customer = Customer.objects.get(pk=calc.customer_id)
+                self.assertMatchesGenerateBill(customer, start, end, calc.line_items, calc.totals)
+
+    def test_backfill_matches_generate_bill(self):
+        periods = monthly_periods(date(2025, 3, 1), date(2025, 4, 1))
+        result = backfill_bills([c.pk for c in self.customers.values()], periods)
+        self.assertEqual((len(result.bills), result.failures), (4, {}))
+
+        for bill in Bill.objects.order_by("customer_id", "period_start"):
+            items = line_items(bill)
+            totals = {f: getattr(bill, f) for f in TOTAL_FIELDS}
+            bill.delete()
+            self.assertMatchesGenerateBill(bill.customer, bill.period_start, bill.period_end, items, totals)
+
+    def test_accrual_statement_matches_generate_bill(self):
+        as_of = date(2025, 3, 31)
+        with mock.patch("django.utils.timezone.localdate", return_value=as_of):
+            record_readings(list(MeterReading.objects.all()))
+
+        for customer in self.customers.values():
+            statement = accrual_statement(Accrual.objects.get(customer=customer), as_of)
+            self.assertMatchesGenerateBill(customer, date(2025, 3, 1), as_of, statement["line_items"], statement)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class BillRunTests(TestCase):
+    def setUp(self):
+        customer, meter = make_customer()
+        add_readings(meter, date(2025, 1, 10))
+        self.run = start_bill_run(date(2025, 1, 1), date(2025, 1, 31))
+        self.chunk = self.run.chunks.get()
+
+    def test_chunk_bills_its_customers_once(self):
+        chunk = process_bill_run_chunk(self.chunk.pk)
+        self.assertEqual((chunk.status, chunk.billed, chunk.attempts), ("completed", 1, 1))
+
+        # A redelivery after completion changes nothing
+        chunk = process_bill_run_chunk(self.chunk.pk)
+        self.assertEqual((chunk.status, chunk.attempts), ("completed", 1))
+        self.assertEqual(Bill.objects.count(), 1)
+
+    def test_delivery_of_a_chunk_another_worker_holds_does_nothing(self):
+        BillRunChunk.objects.filter(pk=self.chunk.pk).update(status="running", attempts=1)
+
+        chunk = process_bill_run_chunk(self.chunk.pk)
+
+        self.assertEqual((chunk.status, chunk.attempts), ("running", 1))
+        self.assertFalse(Bill.objects.exists())
+        self.run.refresh_from_db()
+        self.assertEqual(self.run.chunks_failed, 0)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class BillAuditTests(TestCase):
+    period_start, period_end = date(2025, 1, 1), date(2025, 1, 31)
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        media_root = override_settings(MEDIA_ROOT=media.name)
+        media_root.enable()
+        self.addCleanup(media_root.disable)
+
+        self.bills = []
+        for suffix in ("1", "2"):
+            customer, meter = make_customer(suffix)
+            add_readings(meter, date(2025, 1, 10))
+            self.bills.append(generate_bill(customer.pk, self.period_start, self.period_end))
+        self.meter = meter
+
+    def audit(self):
+        audit = start_bill_audit(self.period_start, self.period_end, chunk_size=1)
+        for bill in sorted(self.bills, key=lambda b: str(b.customer_id)):
+            audit_bill_chunk(audit.pk, [str(bill.pk)])
+        return BillAudit.objects.get(pk=audit.pk)
+
+    def test_matching_bills_complete_without_discrepancies(self):
+        audit = self.audit()
+        self.assertEqual(audit.status, "completed")
+        self.assertEqual((audit.bills_checked, audit.discrepancies_found), (2, 0))
+
+    def test_failed_chunks_complete_the_audit_with_errors(self):
+        audit = start_bill_audit(self.period_start, self.period_end, chunk_size=1)
+        with mock.patch("billing.audit.calculate_bills", side_effect=RuntimeError("database went away")):
+            with self.assertRaises(RuntimeError), self.assertLogs("billing.audit", "ERROR"):
+                audit_bill_chunk(audit.pk, [str(self.bills[0].pk)])
+        audit_bill_chunk(audit.pk, [str(self.bills[1].pk)])
+
+        audit.refresh_from_db()
+        self.assertEqual(audit.status, "completed_with_errors")
+        self.assertEqual((audit.chunks_completed, audit.chunks_failed), (1, 1))
+        error = audit.discrepancies.get()
+        self.assertEqual((error.bill_id, error.kind), (self.bills[0].pk, "error"))
+        self.assertIn("database went away", audit.report.read().decode())
+
+    def test_adjusted_bills_are_compared_on_settled_totals(self):
+        Bill.objects.filter(pk__in=[b.pk for b in self.bills]).update(status="issued")
+        correct_reading(self.meter, "1.5000")
+        self.assertTrue(self.bills[1].adjustments.exists())
+
+        audit = self.audit()
+        self.assertEqual(audit.status, "completed")
+        self.assertEqual(audit.discrepancies_found, 0)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class BillExportStreamTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        media_root = override_settings(MEDIA_ROOT=media.name)
+        media_root.enable()
+        self.addCleanup(media_root.disable)
+
+        for suffix in ("1", "2"):
+            customer, meter = make_customer(suffix)
+            add_readings(meter, date(2025, 1, 10))
+            generate_bill(customer.pk, date(2025, 1, 1), date(2025, 1, 31))
+        Bill.objects.update(status="issued")
+
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create_user("staff", is_staff=True))
+        self.url = reverse("bill-export-stream") + "?period_start=2025-01-01&period_end=2025-01-31"
+
+    def render_all(self):
+        with mock.patch("billing.pdf.render_pdf_bytes", return_value=b"%PDF-1.4 test"):
+            for bill in Bill.objects.all():
+                render_bill_pdf(bill.pk)
+
+    def test_missing_pdfs_are_queued_not_rendered_in_the_request(self):
+        with mock.patch("billing.pdf.render_pdf_bytes", side_effect=AssertionError("rendered in the request")):
+            with self.captureOnCommitCallbacks() as queued:
+                response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response["Retry-After"], "5")
+        self.assertEqual(response.data["pending"], 2)
+        self.assertEqual(len(queued), 2)
+        self.assertFalse(BillPDF.objects.exclude(status="pending").exists())
+
+    def test_stream_serves_stored_pdfs(self):
+        self.render_all()
+
+        with mock.patch("billing.pdf.render_pdf_bytes", side_effect=AssertionError("rendered in the request")):
+            response = self.client.get(self.url)
+            content = b"".join(response.streaming_content)
+
+        self.assertEqual(response.status_code, 200)
+        with zipfile.ZipFile(io.BytesIO(content)) as archive:
+            self.assertEqual(len(archive.namelist()), 2)
+            self.assertEqual({archive.read(name) for name in archive.namelist()}, {b"%PDF-1.4 test"})
+
+
+# ---------------------------------------------------------------------------
+# Integer pricing (billing.fixedpoint) against the Decimal path
+# ---------------------------------------------------------------------------
+def dec4(low: int, high: int):
+    """Decimals at the 4 places readings, rates and standing charges are stored to."""
+    return st.integers(low * 10**4, high * 10**4).map(lambda n: Decimal(n).scaleb(-4))
+
+
+@st.composite
+def tariffs(draw, rate=dec4(0, 100), standing=dec4(0, 1000)):
+    n_bands = draw(st.integers(1, 5))
+    return CompiledTariff(
+        tariff_id=0, version=1, name="Synthetic", code="SYN", fuel_type="electricity",
+        tariff_type=draw(st.sampled_from(["time_of_use", "variable"])),
+        standing_charge_pence=draw(standing),
+        bands=tuple(
+            CompiledBand(id=i, label=draw(st.sampled_from(["", "Day", "Night", "Peak"])), rate_pence_per_kwh=draw(rate))
+            for i in range(n_bands)
+        ),
+        minute_bands=bytes(1440),
+    )
+
+
+def tie_tariff(rate, standing, tariff_type):
+    return CompiledTariff(
+        tariff_id=0, version=1, name="Tie", code="TIE", fuel_type="electricity", tariff_type=tariff_type,
+        standing_charge_pence=Decimal(standing),
+        bands=tuple(CompiledBand(id=i, label=label, rate_pence_per_kwh=Decimal(rate)) for i, label in enumerate("AB")),
+        minute_bands=bytes(1440),
+    )
+
+
+PERIOD_START = date(2026, 1, 1)
+
+
+class FixedPointPricingTests(SimpleTestCase):
+    @settings(max_examples=500, deadline=None)
+    @given(tariff=tariffs(), data=st.data(), days=st.integers(0, 400))
+    # Exact half-penny ties at both rounding points, positive and negative
+    @example(tariff=tie_tariff("0.0100", "0.0050", "time_of_use"), data=["0.5000", "0.5000"], days=1)
+    @example(tariff=tie_tariff("0.0300", "0.0150", "variable"), data=["0.5000", "0.5000"], days=1)
+    @example(tariff=tie_tariff("12.3450", "25.1250", "time_of_use"), data=["1.0000", "1.0000"], days=2)
+    @example(tariff=tie_tariff("0.0100", "0.0025", "time_of_use"), data=["-0.5000", "-0.5000"], days=6)
+    def test_price_bill_matches_the_decimal_path(self, tariff, data, days):
+        if isinstance(data, list):
+            usage = [Decimal(k) for k in data]
+        else:
+            usage = data.draw(st.lists(
+                st.one_of(dec4(0, 5000), dec4(-50, 0), st.just(Decimal("0"))),
+                min_size=len(tariff.bands), max_size=len(tariff.bands),
+            ))
+        end = PERIOD_START + timedelta(days=days)
+
+        expected_items = calculate_line_items(tariff, usage, PERIOD_START, end)
+        items, totals = price_bill(tariff, [kwh_to_mwh(k) for k in usage], PERIOD_START, end)
+        self.assertEqual(items, expected_items)
+        self.assertEqual(totals, summarise_line_items(expected_items))
+
+    @given(st.integers(-(10**15), 10**15), st.integers(1, 10**12))
+    @example(5, 10)
+    @example(15, 10)
+    @example(-25, 10)
+    @example(-35, 10)
+    def test_round_half_even_matches_exact_rounding(self, numerator, denominator):
+        # round() on a Fraction is exact and rounds half to even
+        self.assertEqual(round_half_even(numerator, denominator), round(Fraction(numerator, denominator)))
+
+    @given(dec4(-(10**6), 10**6))
+    def test_kwh_round_trips_through_mwh(self, kwh):
+        kwh_again = mwh_to_kwh(kwh_to_mwh(kwh))
+        self.assertEqual(kwh_again, kwh)
+        self.assertEqual(kwh_again.as_tuple().exponent, -4)  # MeterReading's places, as generate_bill shows them
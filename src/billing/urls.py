@@ -1,15 +1,26 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import BillViewSet, GenerateBillView
+from .views import (
+    AccrualView,
+    BillAuditViewSet,
+    BillExportViewSet,
+    BillRunViewSet,
+    BillViewSet,
+    GenerateBillView,
+)
 from .pdf_views import GenerateBillPDFView
 from .payment_views import CreatePaymentIntentView
 
 router = DefaultRouter()
 router.register(r"bills", BillViewSet, basename="bill")
+router.register(r"runs", BillRunViewSet, basename="bill-run")
+router.register(r"audits", BillAuditViewSet, basename="bill-audit")
+router.register(r"exports", BillExportViewSet, basename="bill-export")
 
 urlpatterns = [
     path("generate/", GenerateBillView.as_view(), name="generate-bill"),
+    path("accrual/", AccrualView.as_view(), name="billing-accrual"),
     path("bills/<uuid:pk>/pdf/", GenerateBillPDFView.as_view(), name="bill-pdf"),
     path("payments/create-intent/<uuid:pk>/", CreatePaymentIntentView.as_view(), name="create-payment-intent"),
     path("", include(router.urls)),
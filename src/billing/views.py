@@ -1,15 +1,32 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.http import StreamingHttpResponse
 from rest_framework import status, viewsets
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from .models import Bill
+from .accrual import accrual_statement, open_period
+from .audit import start_bill_audit
+from .export import export_bills, iter_bills_zip, queue_missing_pdfs
+from .models import Accrual, Bill, BillAudit, BillExport, BillRun
+from .runs import resume_bill_run, retry_failed_chunks, start_bill_run
 from .serializers import (
+    AccrualStatementSerializer,
+    BillAuditSerializer,
+    BillDiscrepancySerializer,
+    BillExportSerializer,
     BillListSerializer,
+    BillRunSerializer,
     BillSerializer,
     GenerateBillSerializer,
+    StartBillAuditSerializer,
+    StartBillExportSerializer,
+    StartBillRunSerializer,
 )
 from .services import generate_bill
+from .tasks import export_bill_pdfs_task
 
 
 class BillViewSet(viewsets.ReadOnlyModelViewSet):
@@ -17,7 +34,7 @@ class BillViewSet(viewsets.ReadOnlyModelViewSet):
 
     def get_queryset(self):
         user = self.request.user
-        qs = Bill.objects.select_related("customer").prefetch_related("line_items").all()
+        qs = Bill.objects.select_related("customer").prefetch_related("line_items", "adjustments").all()
         if user.is_staff:
             return qs
         return qs.filter(customer__user=user)
@@ -51,3 +68,127 @@ class GenerateBillView(APIView):
             BillSerializer(bill).data,
             status=status.HTTP_201_CREATED,
         )
+
+
+class BillRunViewSet(viewsets.ReadOnlyModelViewSet):
+    """Start, inspect, resume and retry billing runs (staff only)."""
+
+    queryset = BillRun.objects.all()
+    serializer_class = BillRunSerializer
+    permission_classes = [IsAdminUser]
+
+    def create(self, request):
+        serializer = StartBillRunSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        run = start_bill_run(**serializer.validated_data)
+        return Response(BillRunSerializer(run).data, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=True, methods=["post"])
+    def resume(self, request, pk=None):
+        """Re-dispatch every chunk that has not completed."""
+        run = self.get_object()
+        dispatched = resume_bill_run(run)
+        run.refresh_from_db()
+        return Response({"dispatched": dispatched, "run": BillRunSerializer(run).data})
+
+    @action(detail=True, methods=["post"])
+    def retry(self, request, pk=None):
+        """Re-dispatch only the failed chunks."""
+        run = self.get_object()
+        dispatched = retry_failed_chunks(run)
+        run.refresh_from_db()
+        return Response({"dispatched": dispatched, "run": BillRunSerializer(run).data})
+
+
+class BillAuditViewSet(viewsets.ReadOnlyModelViewSet):
+    """Start and inspect billing reconciliation audits (staff only)."""
+
+    queryset = BillAudit.objects.all()
+    serializer_class = BillAuditSerializer
+    permission_classes = [IsAdminUser]
+
+    def create(self, request):
+        serializer = StartBillAuditSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        audit = start_bill_audit(**serializer.validated_data)
+        return Response(BillAuditSerializer(audit).data, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=True, methods=["get"])
+    def discrepancies(self, request, pk=None):
+        audit = self.get_object()
+        qs = audit.discrepancies.select_related("bill__customer")
+        return Response(BillDiscrepancySerializer(qs, many=True).data)
+
+
+class BillExportViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    ZIP exports of bill PDFs (staff only).
+
+    POST builds the ZIP in a worker (poll the export for progress);
+    GET stream/?period_start=&period_end= or ?bill_run= streams one
+    straight back in the response from stored PDFs only. While any are
+    missing it queues their renders and returns 202 with a Retry-After
+    header; poll the same URL.
+    """
+
+    queryset = BillExport.objects.all()
+    serializer_class = BillExportSerializer
+    permission_classes = [IsAdminUser]
+
+    def create(self, request):
+        serializer = StartBillExportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        export = BillExport.objects.create(**serializer.validated_data)
+        transaction.on_commit(lambda: export_bill_pdfs_task.delay(str(export.pk)))
+        return Response(BillExportSerializer(export).data, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=False, methods=["get"])
+    def stream(self, request):
+        serializer = StartBillExportSerializer(data={
+            "period_start": request.query_params.get("period_start"),
+            "period_end": request.query_params.get("period_end"),
+            "bill_run": request.query_params.get("bill_run"),
+            "statuses": request.query_params.getlist("status") or ["issued"],
+        })
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        bills = export_bills(params["period_start"], params["period_end"], params["bill_run"], params["statuses"])
+
+        # Rendering stays in the workers: wait until every PDF is stored
+        pending = queue_missing_pdfs(bills)
+        if pending:
+            response = Response({"status": "pending", "pending": pending}, status=status.HTTP_202_ACCEPTED)
+            response["Retry-After"] = "5"
+            return response
+
+        label = params["bill_run"].pk if params["bill_run"] else f"{params['period_start']}_{params['period_end']}"
+        response = StreamingHttpResponse(iter_bills_zip(bills, render_missing=False), content_type="application/zip")
+        response["Content-Disposition"] = f'attachment; filename="bills_{label}.zip"'
+        return response
+
+
+class AccrualView(APIView):
+    """
+    Cost so far in the open billing period.
+
+    Customers see their own accrual; staff pass ?customer=<id>.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        period_start, _ = open_period()
+        accruals = Accrual.objects.filter(period_start=period_start)
+        try:
+            if request.user.is_staff:
+                accrual = accruals.get(customer_id=request.query_params.get("customer"))
+            else:
+                accrual = accruals.get(customer__user=request.user)
+        except (Accrual.DoesNotExist, ValueError, DjangoValidationError):
+            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            statement = accrual_statement(accrual)
+        except ValueError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_409_CONFLICT)
+        return Response(AccrualStatementSerializer(statement).data)
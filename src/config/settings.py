@@ -6,6 +6,7 @@ import os
 from pathlib import Path
 
 import environ
+from celery.schedules import crontab
 
 # ---------------------------------------------------------------------------
 # Paths
@@ -180,6 +181,31 @@ CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = TIME_ZONE
+CELERY_BEAT_SCHEDULE = {
+    "reconcile-accruals": {
+        "task": "billing.tasks.reconcile_accruals_task",
+        "schedule": crontab(hour=2, minute=0),
+    },
+    "rebill-stale-bills": {
+        "task": "billing.tasks.rebill_stale_bills_task",
+        "schedule": crontab(minute="*/15"),
+    },
+    "audit-bills": {
+        "task": "billing.tasks.start_bill_audit_task",
+        "schedule": crontab(day_of_week="sunday", hour=3, minute=0),
+    },
+    "refresh-tariff-comparisons": {
+        "task": "recommendations.tasks.refresh_tariff_comparisons_task",
+        "schedule": crontab(hour=4, minute=0),
+    },
+    "build-usage-snapshot": {
+        "task": "tariffs.tasks.build_usage_snapshot_task",
+        "schedule": crontab(day_of_month=2, hour=5, minute=0),
+    },
+}
+
+# Bill audits dispatch at most this many chunks per minute to bound DB load
+BILL_AUDIT_CHUNKS_PER_MINUTE = env.int("BILL_AUDIT_CHUNKS_PER_MINUTE", default=30)
 
 # ---------------------------------------------------------------------------
 # Email
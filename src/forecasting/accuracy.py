@@ -0,0 +1,198 @@
+"""
+Forecast accuracy, tracked incrementally as actuals arrive.
+
+record_accuracy(readings, replaced)
+  → scores newly ingested readings against the latest half-hourly
+    forecast of each method covering them when they were ingested, and
+    adds the errors to the per meter/method/day ForecastAccuracy sums
+    (taking out readings they replaced).
+accuracy_summary(totals)
+  → MAE, RMSE, MAPE, WAPE and interval coverage from summed rows.
+summed(rows, *group_by)
+  → the same per group, summing daily rows in the database.
+
+Only the newly ingested (meter, time) range is looked at: the forecasts
+covering it are fetched in one query and the readings are matched to
+their forecast step with NumPy. History is never rescanned; rolling
+metrics are sums of the daily rows over a range of days.
+
+Only half-hourly forecasts are scored, since one reading is one step.
+A reading is scored against the newest forecast created before it was
+ingested (its created_at), never a later one: forecast windows start on
+the hour, so a forecast generated after a reading arrived can cover it.
+A replaced reading keeps its created_at, so backing it out picks the
+same forecast it was scored against and the daily sums net exactly.
+Superseded forecasts are kept past their window (forecasting.reuse) so
+that forecast is still there when a correction arrives.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import date, timedelta
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from . import series
+from .models import DemandForecast, ForecastAccuracy
+from .profile import SECONDS_PER_DAY, epoch_seconds
+
+logger = logging.getLogger(__name__)
+
+MAPE_FLOOR_KWH = 0.05  # smaller actuals are left out of percentage errors
+EPOCH_DATE = date(1970, 1, 1)
+SUM_FIELDS = ["points", "covered", "actual_kwh", "abs_error_kwh", "squared_error", "pct_points", "abs_pct_error"]
+
+
+def _latest_covering(forecasts, ts: np.ndarray, ingested: np.ndarray) -> np.ndarray:
+    """
+    Index into forecasts (newest first) of the newest one covering each
+    timestamp and created no later than that reading was ingested, or -1.
+    """
+    chosen = np.full(len(ts), -1)
+    for i, forecast in enumerate(forecasts):
+        start = epoch_seconds(forecast.forecast_start)
+        end = epoch_seconds(forecast.forecast_end)
+        existed = ingested >= forecast.created_at.timestamp()
+        chosen[(chosen < 0) & (ts >= start) & (ts < end) & existed] = i
+    return chosen
+
+
+def _score(forecasts, readings, now) -> dict:
+    """{UTC date: sums in SUM_FIELDS order} for one meter's readings against one method's forecasts."""
+    ts = np.array([epoch_seconds(r.reading_at) for r in readings], dtype=np.int64)
+    actual = np.array([float(r.value_kwh) for r in readings])
+    ingested = np.array([(r.created_at or now).timestamp() for r in readings])
+    chosen = _latest_covering(forecasts, ts, ingested)
+
+    # Forecast value at each reading's step (NaN where nothing covers it)
+    predicted, lower, upper = (np.full(len(ts), np.nan) for _ in range(3))
+    for i, forecast in enumerate(forecasts):
+        mine = np.flatnonzero(chosen == i)
+        offset = ts[mine] - epoch_seconds(forecast.forecast_start)
+        step = offset // forecast.step_seconds
+        units = forecast.series_units()
+        keep = (offset % forecast.step_seconds == 0) & (step < len(units[0]))
+        mine, step = mine[keep], step[keep]
+        for out, values in zip((predicted, lower, upper), units):
+            out[mine] = values[step] / series.SCALE
+
+    scored = ~np.isnan(predicted)
+    if not scored.any():
+        return {}
+    ts, a, p = ts[scored], actual[scored], predicted[scored]
+    error = np.abs(a - p)
+    covered = (a >= lower[scored]) & (a <= upper[scored])
+    large = a >= MAPE_FLOOR_KWH
+    pct = np.divide(error, a, out=np.zeros_like(error), where=large)
+
+    # Sum per UTC day
+    days, index = np.unique(ts // SECONDS_PER_DAY, return_inverse=True)
+    columns = [
+        np.bincount(index, minlength=len(days)),
+        np.bincount(index, weights=covered, minlength=len(days)),
+        np.bincount(index, weights=a, minlength=len(days)),
+        np.bincount(index, weights=error, minlength=len(days)),
+        np.bincount(index, weights=error ** 2, minlength=len(days)),
+        np.bincount(index, weights=large, minlength=len(days)),
+        np.bincount(index, weights=pct, minlength=len(days)),
+    ]
+    counts = {0, 1, 5}  # integer fields
+    return {
+        EPOCH_DATE + timedelta(days=int(day)): [
+            int(col[k]) if i in counts else float(col[k]) for i, col in enumerate(columns)
+        ]
+        for k, day in enumerate(days)
+    }
+
+
+def record_accuracy(readings, replaced=()) -> int:
+    """Score ingested readings against their forecasts. Returns readings scored."""
+    signed = [(1, r) for r in readings] + [(-1, r) for r in replaced]
+    if not signed:
+        return 0
+    times = [r.reading_at for _, r in signed]
+    now = timezone.now()
+
+    # ── 1. One query for every forecast covering the ingested range ─────
+    forecasts = defaultdict(list)  # (meter_id, method) → newest first
+    for forecast in DemandForecast.objects.filter(
+        meter_id__in={r.meter_id for _, r in signed},
+        granularity="half_hourly",
+        forecast_start__lte=max(times),
+        forecast_end__gt=min(times),
+        created_at__lte=max(r.created_at or now for _, r in signed),
+    ).order_by("-created_at"):
+        forecasts[(forecast.meter_id, forecast.method)].append(forecast)
+    if not forecasts:
+        return 0
+
+    # ── 2. Match readings to forecast steps, per meter and method ───────
+    by_meter = defaultdict(lambda: {1: [], -1: []})
+    for sign, reading in signed:
+        by_meter[reading.meter_id][sign].append(reading)
+
+    deltas = defaultdict(lambda: [0] * len(SUM_FIELDS))  # (meter_id, method, date) → sums
+    for (meter_id, method), meter_forecasts in forecasts.items():
+        for sign, batch in by_meter[meter_id].items():
+            if not batch:
+                continue
+            for day, sums in _score(meter_forecasts, batch, now).items():
+                delta = deltas[(meter_id, method, day)]
+                for i, value in enumerate(sums):
+                    delta[i] += sign * value
+    deltas = {key: delta for key, delta in deltas.items() if any(delta)}
+    if not deltas:
+        return 0
+
+    # ── 3. Add to the daily sums ────────────────────────────────────────
+    with transaction.atomic():
+        # Create missing rows first so every row can be locked
+        ForecastAccuracy.objects.bulk_create(
+            [ForecastAccuracy(meter_id=m, method=method, date=day) for m, method, day in deltas],
+            ignore_conflicts=True,
+        )
+        rows = ForecastAccuracy.objects.select_for_update().filter(
+            meter_id__in={m for m, _, _ in deltas}, date__in={day for _, _, day in deltas},
+        )
+        changed = []
+        for row in rows:
+            delta = deltas.get((row.meter_id, row.method, row.date))
+            if delta is None:
+                continue
+            for field, value in zip(SUM_FIELDS, delta):
+                setattr(row, field, getattr(row, field) + value)
+            row.updated_at = now
+            changed.append(row)
+        ForecastAccuracy.objects.bulk_update(changed, SUM_FIELDS + ["updated_at"])
+
+    scored = sum(delta[0] for delta in deltas.values())
+    logger.debug("Forecast accuracy: %d points scored across %d meter-days", scored, len(changed))
+    return scored
+
+
+def accuracy_summary(totals: dict) -> dict:
+    """Metrics from summed ForecastAccuracy fields."""
+    points = totals.get("points") or 0
+    pct_points = totals.get("pct_points") or 0
+    actual = totals.get("actual_kwh") or 0
+    abs_error = totals.get("abs_error_kwh") or 0
+    return {
+        "points": points,
+        "mae_kwh": round(abs_error / points, 4) if points else None,
+        "rmse_kwh": round(max(totals.get("squared_error") or 0, 0) ** 0.5 / points ** 0.5, 4) if points else None,
+        "mape": round(100 * (totals.get("abs_pct_error") or 0) / pct_points, 2) if pct_points else None,
+        "wape": round(100 * abs_error / actual, 2) if actual > 0 else None,
+        "coverage": round((totals.get("covered") or 0) / points, 4) if points else None,
+    }
+
+
+def summed(rows, *group_by) -> list[dict]:
+    """ForecastAccuracy rows summed per group_by fields, with metrics."""
+    aggregates = {field: Sum(field) for field in SUM_FIELDS}
+    return [
+        {**{field: row[field] for field in group_by}, **accuracy_summary(row)}
+        for row in rows.values(*group_by).annotate(**aggregates).order_by(*group_by)
+    ]
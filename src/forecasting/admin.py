@@ -1,20 +1,64 @@
 from django.contrib import admin
 
-from .models import DemandForecast, ForecastPoint
-
-
-class ForecastPointInline(admin.TabularInline):
-    model = ForecastPoint
-    extra = 0
-    readonly_fields = ("timestamp", "predicted_kwh", "lower_bound_kwh", "upper_bound_kwh")
+from .models import (
+    DegreeDay,
+    DemandForecast,
+    ForecastAccuracy,
+    ForecastState,
+    RegionForecast,
+    RegionForecastRun,
+)
 
 
 @admin.register(DemandForecast)
 class DemandForecastAdmin(admin.ModelAdmin):
     list_display = (
-        "meter", "granularity", "forecast_start",
+        "meter", "method", "granularity", "forecast_start",
         "forecast_end", "total_predicted_kwh", "created_at",
     )
-    list_filter = ("granularity",)
+    list_filter = ("method", "granularity")
+    search_fields = ("meter__mpan",)
+    readonly_fields = ("step_seconds", "point_count", "total_predicted_kwh", "created_at")
+
+
+@admin.register(ForecastState)
+class ForecastStateAdmin(admin.ModelAdmin):
+    list_display = ("meter", "level", "trend", "last_reading_at", "observations", "updated_at")
+    search_fields = ("meter__mpan",)
+    readonly_fields = ("level", "trend", "variance", "last_reading_at", "observations", "updated_at")
+
+
+@admin.register(ForecastAccuracy)
+class ForecastAccuracyAdmin(admin.ModelAdmin):
+    list_display = ("meter", "method", "date", "points", "covered", "abs_error_kwh", "updated_at")
+    list_filter = ("method", "date")
     search_fields = ("meter__mpan",)
-    inlines = [ForecastPointInline]
+    readonly_fields = (
+        "points", "covered", "actual_kwh", "abs_error_kwh", "squared_error",
+        "pct_points", "abs_pct_error", "updated_at",
+    )
+
+
+class RegionForecastInline(admin.TabularInline):
+    model = RegionForecast
+    fields = ("outward_code", "fuel_type", "meter_count", "total_predicted_kwh")
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+
+@admin.register(RegionForecastRun)
+class RegionForecastRunAdmin(admin.ModelAdmin):
+    list_display = ("forecast_start", "method", "granularity", "meter_count", "region_count", "created_at")
+    list_filter = ("method", "granularity")
+    readonly_fields = (
+        "forecast_start", "forecast_end", "step_seconds", "meter_count", "region_count", "created_at",
+    )
+    inlines = [RegionForecastInline]
+
+
+@admin.register(DegreeDay)
+class DegreeDayAdmin(admin.ModelAdmin):
+    list_display = ("date", "mean_temperature_c", "heating_degree_days", "source", "updated_at")
+    date_hierarchy = "date"
+    search_fields = ("source",)
@@ -5,3 +5,6 @@ class ForecastingConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "forecasting"
 
+
+    def ready(self):
+        from . import signals  # noqa: F401
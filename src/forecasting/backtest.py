@@ -0,0 +1,256 @@
+"""
+Rolling-origin backtesting of the forecasters.
+
+synthetic_history(meters, days, end, seed)   → {meter_id: (timestamps, kWh)}
+database_history(sample, days, end, seed)    → the same for a random sample
+                                               of smart meters
+rolling_origins(end, horizon_days, count, spacing_days)
+                                             → forecast origins, oldest first
+backtest(history, configs, origins, horizon_days, granularity)
+                                             → one Score per Config
+report(scores, meta)                         → Markdown comparison
+
+At each origin every configuration forecasts from the readings before
+it only, exactly as generate_forecast() would at that time, and is scored
+against the readings in the horizon that follows:
+
+- MAPE over steps whose actual is at least MAPE_FLOOR_KWH per half-hour
+  (near-zero actuals make percentage errors meaningless),
+- RMSE in kWh per step,
+- coverage: the share of actuals inside [lower_bound, upper_bound].
+
+Hourly and daily steps are only scored when every half-hour in them was
+read. degree_day configurations read the DegreeDay table; synthetic
+history does not follow the weather, so compare them on database
+history. Runtime is the time spent forecasting (not scoring) with a
+configuration; memory is the tracemalloc peak of one forecast. Nothing
+here writes to the database.
+"""
+
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from . import series
+from .degree_days import forecast_degree_days
+from .profile import (
+    DAY_WEIGHTS,
+    EPOCH_WEEKDAY,
+    SECONDS_PER_DAY,
+    SECONDS_PER_SLOT,
+    STEP_MINUTES,
+    build_profile,
+    epoch_seconds,
+    project,
+)
+from .readings import readings_by_meter
+from .services import forecast_series
+from .smoothing import fit, project_state
+
+MAPE_FLOOR_KWH = 0.05
+
+
+@dataclass(frozen=True)
+class Config:
+    method: str = "profile"
+    lookback_days: int = 7
+    day_weights: tuple = tuple(DAY_WEIGHTS)
+
+    @property
+    def label(self) -> str:
+        label = f"{self.method} {self.lookback_days}d"
+        if self.method == "profile" and self.day_weights != tuple(DAY_WEIGHTS):
+            label += " w=" + ",".join(f"{w:g}" for w in self.day_weights)
+        return label
+
+
+@dataclass
+class Score:
+    config: Config
+    forecasts: int = 0
+    skipped: int = 0
+    points: int = 0
+    mape: float | None = None
+    rmse: float | None = None
+    coverage: float | None = None
+    seconds: float = 0.0
+    peak_kib: float = 0.0
+
+
+# ---------------------------------------------------------------------------
+# History
+# ---------------------------------------------------------------------------
+def synthetic_history(meters: int, days: int, end: datetime, seed: int = 0) -> dict:
+    """
+    Half-hourly readings for synthetic homes: a base load, morning and
+    evening peaks, busier weekends, a slow seasonal drift, noise, ~2%
+    missing readings and the odd multi-day outage.
+    """
+    rng = np.random.default_rng(seed)
+    end_ts = epoch_seconds(end) // SECONDS_PER_SLOT * SECONDS_PER_SLOT
+    ts = end_ts - np.arange(days * SECONDS_PER_DAY // SECONDS_PER_SLOT, 0, -1, dtype=np.int64) * SECONDS_PER_SLOT
+    hour = (ts % SECONDS_PER_DAY) / 3600
+    weekend = ((ts // SECONDS_PER_DAY + EPOCH_WEEKDAY) % 7) >= 5
+    season = np.cos(2 * np.pi * (ts / SECONDS_PER_DAY) / 365)
+
+    history = {}
+    for i in range(meters):
+        base = rng.uniform(0.1, 0.3)
+        morning = rng.uniform(0.1, 0.5) * np.exp(-((hour - rng.uniform(6.5, 8.5)) ** 2) / 2)
+        evening = rng.uniform(0.3, 1.2) * np.exp(-((hour - rng.uniform(17.5, 20)) ** 2) / 4)
+        load = (base + morning + evening) * (1 + rng.uniform(0, 0.3) * weekend) * (1 + 0.2 * season)
+        values = np.round(np.maximum(load * rng.lognormal(0, 0.25, len(ts)), 0), 4)
+
+        keep = rng.random(len(ts)) > 0.02
+        if rng.random() < 0.2:
+            outage = rng.integers(0, len(ts))
+            keep[outage:outage + rng.integers(48, 48 * 5)] = False
+        history[f"synthetic-{i:04d}"] = (ts[keep], values[keep])
+    return history
+
+
+def database_history(sample: int, days: int, end: datetime, seed: int = 0) -> dict:
+    """Readings for a random sample of smart meters over [end - days, end)."""
+    from customers.models import Meter
+
+    meter_ids = [str(pk) for pk in Meter.objects.filter(is_smart=True).values_list("pk", flat=True)]
+    rng = np.random.default_rng(seed)
+    chosen = rng.choice(meter_ids, size=min(sample, len(meter_ids)), replace=False).tolist() if meter_ids else []
+    return {
+        meter_id: (timestamps, values)
+        for meter_id, timestamps, values in readings_by_meter(chosen, end - timedelta(days=days), end)
+    }
+
+
+def rolling_origins(end: datetime, horizon_days: int, count: int, spacing_days: int = 1) -> list[datetime]:
+    """count origins spacing_days apart, the last leaving horizon_days before end."""
+    last = (end - timedelta(days=horizon_days)).replace(minute=0, second=0, microsecond=0)
+    return [last - timedelta(days=spacing_days * i) for i in reversed(range(count))]
+
+
+# ---------------------------------------------------------------------------
+# Evaluation
+# ---------------------------------------------------------------------------
+def forecast(config: Config, timestamps, values, origin: datetime, horizon_days: int, granularity: str):
+    """(predicted, lower, upper) kWh per step from origin, or None without readings."""
+    origin_ts = epoch_seconds(origin)
+    window = (timestamps >= origin_ts - config.lookback_days * SECONDS_PER_DAY) & (timestamps < origin_ts)
+    if not window.any():
+        return None
+    ts, vals = timestamps[window], values[window]
+
+    if config.method == "holt_winters":
+        predicted, std_dev = project_state(fit(ts, vals), origin, horizon_days, granularity)
+    elif config.method == "degree_day":
+        predicted, std_dev, _ = forecast_degree_days(
+            {"meter": (ts, vals)}, origin, horizon_days, config.lookback_days, granularity,
+        )["meter"]
+    else:
+        profile = build_profile(ts, vals, origin, config.day_weights)
+        _, predicted, std_dev = project(profile, origin, horizon_days, granularity)
+    return tuple(units / series.SCALE for units in forecast_series(predicted, std_dev))
+
+
+def actual_steps(timestamps, values, origin: datetime, n_steps: int, granularity: str):
+    """(actual kWh per step, fully observed mask) for the steps after origin."""
+    step = STEP_MINUTES[granularity] * 60
+    offset = timestamps - epoch_seconds(origin)
+    inside = (offset >= 0) & (offset < n_steps * step)
+    index = offset[inside] // step
+    totals = np.bincount(index, weights=values[inside], minlength=n_steps)
+    counts = np.bincount(index, minlength=n_steps)
+    return totals, counts == step // SECONDS_PER_SLOT
+
+
+def backtest(
+    history: dict,
+    configs: list[Config],
+    origins: list[datetime],
+    horizon_days: int,
+    granularity: str = "half_hourly",
+) -> list[Score]:
+    """Forecast every meter at every origin with every configuration and score it."""
+    floor = MAPE_FLOOR_KWH * STEP_MINUTES[granularity] / 30
+    scores = []
+    for config in configs:
+        score = Score(config)
+        abs_pct, squared, covered = [], [], []
+
+        for timestamps, values in history.values():
+            for origin in origins:
+                started = time.perf_counter()
+                result = forecast(config, timestamps, values, origin, horizon_days, granularity)
+                score.seconds += time.perf_counter() - started
+                if result is None:
+                    score.skipped += 1
+                    continue
+                predicted, lower, upper = result
+                actual, observed = actual_steps(timestamps, values, origin, len(predicted), granularity)
+                a, p = actual[observed], predicted[observed]
+                score.forecasts += 1
+                score.points += len(a)
+                squared.append((a - p) ** 2)
+                abs_pct.append(np.abs(a - p)[a >= floor] / a[a >= floor])
+                covered.append((a >= lower[observed]) & (a <= upper[observed]))
+
+        if score.points:
+            score.rmse = float(np.sqrt(np.concatenate(squared).mean()))
+            score.coverage = float(np.concatenate(covered).mean())
+            pct = np.concatenate(abs_pct)
+            score.mape = float(pct.mean() * 100) if len(pct) else None
+        score.peak_kib = _peak_kib(config, history, origins, horizon_days, granularity)
+        scores.append(score)
+    return scores
+
+
+def _peak_kib(config, history, origins, horizon_days, granularity) -> float:
+    """tracemalloc peak of one forecast (the first meter at the last origin)."""
+    if not history or not origins:
+        return 0.0
+    timestamps, values = next(iter(history.values()))
+    tracemalloc.start()
+    try:
+        forecast(config, timestamps, values, origins[-1], horizon_days, granularity)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+
+# ---------------------------------------------------------------------------
+# Report
+# ---------------------------------------------------------------------------
+def _fmt(value, pattern):
+    return "–" if value is None else pattern.format(value)
+
+
+def report(scores: list[Score], meta: dict) -> str:
+    """Markdown report: run settings, then one row per configuration."""
+    lines = ["# Forecast backtest", ""]
+    lines += [f"- **{key}**: {value}" for key, value in meta.items()]
+    lines += [
+        "",
+        "| Configuration | Forecasts | Points | MAPE | RMSE (kWh) | Coverage | Runtime | ms/forecast | Peak memory |",
+        "|---|---:|---:|---:|---:|---:|---:|---:|---:|",
+    ]
+    for s in scores:
+        per_forecast = s.seconds * 1000 / s.forecasts if s.forecasts else None
+        lines.append(
+            f"| {s.config.label} | {s.forecasts} | {s.points} | {_fmt(s.mape, '{:.1f}%')} | "
+            f"{_fmt(s.rmse, '{:.4f}')} | {_fmt(s.coverage, '{:.1%}')} | {s.seconds:.2f}s | "
+            f"{_fmt(per_forecast, '{:.2f}')} | {s.peak_kib:.0f} KiB |"
+        )
+
+    scored = [s for s in scores if s.rmse is not None]
+    if scored:
+        best = min(scored, key=lambda s: s.rmse)
+        lines += ["", f"Lowest RMSE: **{best.config.label}**."]
+        nearest = min(scored, key=lambda s: abs(s.coverage - 0.95))
+        lines.append(f"Coverage closest to the nominal 95%: **{nearest.config.label}** ({nearest.coverage:.1%}).")
+    skipped = sum(s.skipped for s in scores)
+    if skipped:
+        lines += ["", f"{skipped} meter/origin pairs had no readings in their lookback window and were skipped."]
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,202 @@
+"""
+Fleet batch forecasting.
+
+generate_forecasts_batch(meter_ids, days_ahead, lookback_days, granularity)
+  → forecasts a block of meters from a single readings query.
+
+Readings for the whole block are streamed in one query ordered by
+(meter, reading_at) and grouped by meter as they arrive. Each meter's
+arrays are handed to a process pool as soon as its last reading has been
+read, so profile building and projection (forecasting.profile) overlap
+with the scan. Every forecast for the block is then written with one
+bulk insert. Meters whose readings are unchanged since their latest
+forecast keep it and are left out of the scan (see forecasting.reuse).
+Forecasts are identical to generate_forecast().
+
+With method="degree_day" the block's arrays are kept instead and every
+meter's degree-day regression is fitted in one vectorised solve once the
+scan ends (see forecasting.degree_days). With method="holt_winters" there
+is no scan: the block's stored smoothing states (forecasting.online) are
+loaded in one query, fitted from the lookback window for meters without
+one, and projected. Only profile forecasts are reused.
+"""
+
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db import connections
+from django.utils import timezone
+
+from customers.models import Meter
+
+from .degree_days import forecast_degree_days
+from .models import DemandForecast
+from .online import bootstrap_states, load_states
+from .profile import STEP_MINUTES, build_profile, project
+from .readings import readings_by_meter
+from .reuse import input_watermark, prune_superseded, reusable_forecasts
+from .services import forecast_series
+from .smoothing import project_state
+
+logger = logging.getLogger(__name__)
+
+FORECAST_BLOCK_SIZE = 2000  # meters per batch task
+BATCH_METHODS = ("profile", "degree_day", "holt_winters")
+
+
+@dataclass
+class BatchForecastResult:
+    forecasts: list[DemandForecast] = field(default_factory=list)
+    reused: list[DemandForecast] = field(default_factory=list)
+    failures: dict[str, str] = field(default_factory=dict)  # meter_id → error
+    pruned: int = 0
+    profile_fallbacks: int = 0  # degree_day meters forecast by the profile model
+    seconds: float = 0.0
+
+    @property
+    def meters_per_second(self) -> float:
+        meters = len(self.forecasts) + len(self.reused)
+        return meters / self.seconds if self.seconds else 0.0
+
+
+def _forecast_arrays(timestamps, values, now, days_ahead, granularity):
+    """Pool worker: packed series for one meter (no Django needed)."""
+    _, predicted, std_dev = project(build_profile(timestamps, values, now), now, days_ahead, granularity)
+    return forecast_series(predicted, std_dev)
+
+
+class _profile_pool:
+    """
+    Context manager giving submit(timestamps, values, ...) → Future,
+    backed by a process pool.
+
+    Computes in-process when processes == 1 or when already inside a
+    daemonic process (e.g. a prefork Celery worker), which cannot fork.
+    """
+
+    def __init__(self, processes: int | None):
+        self.processes = processes or os.cpu_count() or 1
+        self.executor = None
+
+    def __enter__(self):
+        if self.processes > 1 and not multiprocessing.current_process().daemon:
+            connections.close_all()
+            self.executor = ProcessPoolExecutor(max_workers=self.processes)
+        return self.submit
+
+    def __exit__(self, *exc):
+        if self.executor is not None:
+            self.executor.shutdown()
+
+    def submit(self, *args):
+        if self.executor is not None:
+            return self.executor.submit(_forecast_arrays, *args)
+        future = Future()
+        future.set_result(_forecast_arrays(*args))
+        return future
+
+
+def generate_forecasts_batch(
+    meter_ids: list[str],
+    days_ahead: int = 7,
+    lookback_days: int = 7,
+    granularity: str = "half_hourly",
+    processes: int | None = None,
+    reuse: bool = True,
+    method: str = "profile",
+) -> BatchForecastResult:
+    """Forecast a block of meters with one of BATCH_METHODS and bulk-create the results."""
+    if method not in BATCH_METHODS:
+        raise ValueError(f"Batch forecasting does not support method {method!r}")
+    started = time.perf_counter()
+    meter_ids = [str(m) for m in meter_ids]
+    mpans = {str(pk): mpan for pk, mpan in Meter.objects.filter(pk__in=meter_ids).values_list("pk", "mpan")}
+    result = BatchForecastResult(failures={m: "Meter not found" for m in meter_ids if m not in mpans})
+
+    now = timezone.now().replace(minute=0, second=0, microsecond=0)
+    forecast_end = now + timedelta(days=days_ahead)
+
+    # ── 1. Forecasts whose inputs are unchanged ─────────────────────────
+    if reuse and method == "profile":
+        reused = reusable_forecasts(mpans, days_ahead, lookback_days, granularity, now)
+        result.reused = list(reused.values())
+        stale = [m for m in mpans if m not in reused]
+    else:
+        stale = list(mpans)
+
+    pending = {}
+    watermarks = {}
+    arrays = {}
+
+    # ── 1b. Holt-Winters: stored states instead of a readings scan ──────
+    if method == "holt_winters":
+        states = load_states(stale)
+        states.update(bootstrap_states(
+            [m for m in stale if m not in states], now - timedelta(days=lookback_days), now,
+        ))
+        for meter_id, state in states.items():
+            pending[meter_id] = Future()
+            pending[meter_id].set_result(forecast_series(*project_state(state, now, days_ahead, granularity)))
+            watermarks[meter_id] = {
+                "input_through": datetime.fromtimestamp(state.last_ts, tz=dt_timezone.utc),
+                "input_count": state.observations,
+            }
+    scan = [] if method == "holt_winters" else stale
+
+    # ── 2. One ordered scan, profiles computed in the pool as it goes ───
+    with _profile_pool(processes if method == "profile" else 1) as submit:
+        for meter_id, timestamps, values in readings_by_meter(scan, now - timedelta(days=lookback_days), now):
+            if method == "profile":
+                pending[meter_id] = submit(timestamps, values, now, days_ahead, granularity)
+            else:
+                arrays[meter_id] = (timestamps, values)
+            watermarks[meter_id] = input_watermark(timestamps, values)
+
+        # ── 2b. Degree-day regressions for the whole block at once ──────
+        if arrays:
+            for meter_id, (predicted, std_dev, fitted) in forecast_degree_days(
+                arrays, now, days_ahead, lookback_days, granularity,
+            ).items():
+                pending[meter_id] = Future()
+                pending[meter_id].set_result(forecast_series(predicted, std_dev))
+                result.profile_fallbacks += not fitted
+
+        # ── 3. Forecasts for the block ──────────────────────────────────
+        forecasts = []
+        for meter_id in stale:
+            if meter_id not in pending:
+                result.failures[meter_id] = (
+                    f"No readings found for meter {mpans[meter_id]} in the last {lookback_days} days"
+                )
+                continue
+            forecast = DemandForecast(
+                meter_id=meter_id,
+                method=method,
+                granularity=granularity,
+                forecast_start=now,
+                forecast_end=forecast_end,
+                lookback_days=lookback_days,
+                days_ahead=days_ahead,
+                step_seconds=STEP_MINUTES[granularity] * 60,
+                **watermarks[meter_id],
+            )
+            forecast.set_series(*pending.pop(meter_id).result())
+            forecasts.append(forecast)
+
+    # ── 4. Bulk write, then prune what they supersede ───────────────────
+    DemandForecast.objects.bulk_create(forecasts, batch_size=1000)
+    result.pruned = prune_superseded(forecasts)
+
+    result.forecasts = forecasts
+    result.seconds = time.perf_counter() - started
+    logger.info(
+        "Batch %s forecast %d/%d meters in %.2fs (%.1f meters/s, %d reused, %d failures, %d pruned)",
+        method, len(forecasts), len(meter_ids), result.seconds, result.meters_per_second,
+        len(result.reused), len(result.failures), result.pruned,
+    )
+    return result
@@ -0,0 +1,180 @@
+"""
+Weather-normalised forecasting from heating degree days.
+
+heating_degree_days(first_day, n_days)   → HDD per UTC day from the
+                                           DegreeDay table, or None
+daily_totals(timestamps, values, first_day, n_days)
+                                         → (kWh per day, complete mask)
+fit_degree_days(daily, complete, hdd)    → DegreeDayFit for many meters
+                                           in one vectorised solve
+forecast_degree_days(meters, now, days_ahead, lookback_days, granularity)
+                                         → {meter_id: (predicted, std_dev, fitted)}
+
+Each meter's daily kWh is regressed on the day's heating degree days,
+kWh = intercept + slope × HDD, by least squares over the complete days
+(48 readings) in its lookback window. The 2×2 normal equations are
+accumulated for all meters at once as matrix products over a meters ×
+days array, so a block of meters is fitted without a per-meter solve.
+
+A forecast day's total comes from the regression; it is spread over the
+day's half-hours by the meter's weighted profile (forecasting.profile)
+and summed into hourly or daily steps. Meters with fewer than
+MIN_FIT_DAYS complete days, too little spread in degree days to find a
+slope, or no degree days at all are forecast by the profile model
+unchanged.
+
+Degree days are loaded from local files (load_degree_days); days the
+table lacks, such as most of the forecast horizon, take the table's mean
+for that calendar month.
+"""
+
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+
+import numpy as np
+from django.db.models import Avg
+from django.db.models.functions import ExtractMonth
+
+from .models import DegreeDay
+from .profile import (
+    DAYS_PER_WEEK,
+    EPOCH_WEEKDAY,
+    SECONDS_PER_DAY,
+    SECONDS_PER_SLOT,
+    SLOTS_PER_DAY,
+    STEP_MINUTES,
+    build_profile,
+    epoch_seconds,
+    project,
+)
+
+HDD_BASE_C = 15.5  # UK convention
+MIN_FIT_DAYS = 14
+MIN_HDD_VARIANCE = 1.0  # HDD² across the fitted days; less cannot separate slope from intercept
+EPOCH_DATE = date(1970, 1, 1)
+
+
+@dataclass
+class DegreeDayFit:
+    intercept: np.ndarray     # kWh per day
+    slope: np.ndarray         # kWh per degree day, ≥ 0
+    residual_std: np.ndarray  # kWh per day
+    fitted: np.ndarray        # bool, False → use the profile model
+
+
+def heating_degree_days(first_day: int, n_days: int) -> np.ndarray | None:
+    """HDD for n_days UTC days from epoch day first_day; None if the table is empty."""
+    start = EPOCH_DATE + timedelta(days=first_day)
+    stored = dict(
+        DegreeDay.objects.filter(date__gte=start, date__lt=start + timedelta(days=n_days))
+        .values_list("date", "heating_degree_days")
+    )
+    days = [start + timedelta(days=i) for i in range(n_days)]
+    if len(stored) < n_days:
+        monthly = dict(
+            DegreeDay.objects.annotate(month=ExtractMonth("date"))
+            .values("month")
+            .annotate(hdd=Avg("heating_degree_days"))
+            .values_list("month", "hdd")
+        )
+        if not monthly:
+            return None
+        overall = sum(monthly.values()) / len(monthly)
+        for day in days:
+            stored.setdefault(day, monthly.get(day.month, overall))
+    return np.array([stored[day] for day in days], dtype=np.float64)
+
+
+def daily_totals(timestamps: np.ndarray, values: np.ndarray, first_day: int, n_days: int):
+    """kWh per UTC day from epoch day first_day, and which days have all 48 readings."""
+    day = timestamps // SECONDS_PER_DAY - first_day
+    inside = (day >= 0) & (day < n_days)
+    totals = np.bincount(day[inside], weights=values[inside], minlength=n_days)
+    counts = np.bincount(day[inside], minlength=n_days)
+    return totals, counts == SLOTS_PER_DAY
+
+
+def fit_degree_days(daily: np.ndarray, complete: np.ndarray, hdd: np.ndarray) -> DegreeDayFit:
+    """
+    Least-squares intercept and slope per row of daily (meters × days),
+    over each row's complete days. Negative slopes are clipped to zero
+    (flat in the weather) with the intercept refitted.
+    """
+    w = complete.astype(np.float64)
+    y = np.where(complete, daily, 0.0)
+
+    # ── 1. Normal equations for every meter at once ─────────────────────
+    n = w.sum(axis=1)
+    sx, sxx = w @ hdd, w @ (hdd * hdd)
+    sy, sxy = y.sum(axis=1), y @ hdd
+    safe_n = np.maximum(n, 1)
+    variance = sxx / safe_n - (sx / safe_n) ** 2
+    fitted = (n >= MIN_FIT_DAYS) & (variance >= MIN_HDD_VARIANCE)
+
+    # ── 2. Solve, keeping heating slopes non-negative ───────────────────
+    det = np.where(fitted, n * sxx - sx * sx, 1.0)
+    slope = np.where(fitted, np.maximum((n * sxy - sx * sy) / det, 0.0), 0.0)
+    intercept = (sy - slope * sx) / safe_n
+
+    # ── 3. Residual spread of a day's total ─────────────────────────────
+    residuals = (daily - intercept[:, None] - slope[:, None] * hdd) * w
+    residual_std = np.sqrt((residuals ** 2).sum(axis=1) / np.maximum(n - 2, 1))
+    return DegreeDayFit(intercept, slope, residual_std, fitted)
+
+
+def _project(profile, intercept, slope, residual_std, hdd, first_day, start, days_ahead, granularity):
+    """Predicted kWh and std dev per step: regression day totals shaped by the profile."""
+    _, shape, shape_std = project(profile, start, days_ahead, "half_hourly")
+    ts = epoch_seconds(start) + np.arange(len(shape), dtype=np.int64) * SECONDS_PER_SLOT
+    day = ts // SECONDS_PER_DAY
+    dow = (day + EPOCH_WEEKDAY) % DAYS_PER_WEEK
+
+    # The profile's total for each weekday, with the same fallback as project()
+    slot_means = np.where(profile.present, profile.mean, profile.global_mean)
+    profile_total = slot_means.sum(axis=1)[dow]
+    day_total = np.maximum(intercept + slope * hdd[day - first_day], 0.0)
+
+    has_shape = profile_total > 0
+    share = np.where(has_shape, shape / np.where(has_shape, profile_total, 1.0), 1.0 / SLOTS_PER_DAY)
+    ratio = np.where(has_shape, day_total / np.where(has_shape, profile_total, 1.0), 0.0)
+    predicted = day_total * share
+    variance = (shape_std * ratio) ** 2 + (residual_std * share) ** 2
+
+    per_step = STEP_MINUTES.get(granularity, 30) * 60 // SECONDS_PER_SLOT
+    predicted = predicted.reshape(-1, per_step).sum(axis=1)
+    std_dev = np.sqrt(variance.reshape(-1, per_step).sum(axis=1))
+    return predicted, std_dev
+
+
+def forecast_degree_days(meters: dict, now: datetime, days_ahead: int, lookback_days: int, granularity: str) -> dict:
+    """
+    Forecast meters given as {meter_id: (epoch seconds, kWh)} from their
+    lookback window before now. Returns {meter_id: (predicted, std_dev,
+    fitted)}; fitted is False where the profile model was used instead.
+    """
+    now_ts = epoch_seconds(now)
+    first_day = (now_ts - lookback_days * SECONDS_PER_DAY) // SECONDS_PER_DAY
+    lookback = now_ts // SECONDS_PER_DAY - first_day
+    horizon = -(-(now_ts + days_ahead * SECONDS_PER_DAY) // SECONDS_PER_DAY) - first_day
+    hdd = heating_degree_days(first_day, horizon)
+
+    meter_ids = list(meters)
+    if hdd is not None and meter_ids:
+        daily, complete = zip(*(daily_totals(*meters[m], first_day, lookback) for m in meter_ids))
+        fit = fit_degree_days(np.vstack(daily), np.vstack(complete), hdd[:lookback])
+    else:
+        fit = None
+
+    results = {}
+    for i, meter_id in enumerate(meter_ids):
+        profile = build_profile(*meters[meter_id], now)
+        if fit is not None and fit.fitted[i]:
+            predicted, std_dev = _project(
+                profile, fit.intercept[i], fit.slope[i], fit.residual_std[i],
+                hdd, first_day, now, days_ahead, granularity,
+            )
+            results[meter_id] = (predicted, std_dev, True)
+        else:
+            _, predicted, std_dev = project(profile, now, days_ahead, granularity)
+            results[meter_id] = (predicted, std_dev, False)
+    return results
@@ -0,0 +1,123 @@
+"""
+Management command to backtest forecasting configurations.
+
+Replays history for a sample of meters with rolling-origin evaluation
+(see forecasting.backtest) and writes a Markdown report comparing MAPE,
+RMSE, interval coverage, runtime and memory per configuration. Runs on
+synthetic data by default, so it needs no readings.
+
+Usage:
+    python manage.py backtest_forecasts
+    python manage.py backtest_forecasts --methods profile holt_winters --lookbacks 7 14 30
+    python manage.py backtest_forecasts --day-weights 1,1,1,1,1,1,1 --day-weights 1,1,1.2,1.4,1.6,1.8,2
+    python manage.py backtest_forecasts --source database --meters 200 --report backtest.md
+"""
+
+from datetime import datetime, timezone as dt_timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from forecasting.backtest import (
+    Config,
+    backtest,
+    database_history,
+    report,
+    rolling_origins,
+    synthetic_history,
+)
+from forecasting.models import DemandForecast
+from forecasting.profile import DAY_WEIGHTS
+
+
+def _weights(value: str) -> tuple:
+    try:
+        weights = tuple(float(w) for w in value.split(","))
+    except ValueError:
+        raise CommandError(f"Day weights must be comma-separated numbers, got {value!r}")
+    if not weights or any(w < 0 for w in weights):
+        raise CommandError(f"Day weights must be non-negative, got {value!r}")
+    return weights
+
+
+class Command(BaseCommand):
+    help = "Backtest forecast configurations with rolling origins and write a comparison report"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--source", choices=["synthetic", "database"], default="synthetic")
+        parser.add_argument("--meters", type=int, default=50, help="Meters to sample (default: 50)")
+        parser.add_argument(
+            "--methods",
+            nargs="+",
+            choices=[c for c, _ in DemandForecast.METHOD_CHOICES],
+            default=[c for c, _ in DemandForecast.METHOD_CHOICES],
+        )
+        parser.add_argument("--lookbacks", type=int, nargs="+", default=[7, 14, 30], help="Lookback days")
+        parser.add_argument(
+            "--day-weights",
+            type=_weights,
+            action="append",
+            help="Profile DAY_WEIGHTS to try, oldest → newest (repeatable; default: the current weights)",
+        )
+        parser.add_argument("--origins", type=int, default=8, help="Forecast origins per meter (default: 8)")
+        parser.add_argument("--spacing", type=int, default=1, help="Days between origins (default: 1)")
+        parser.add_argument("--horizon", type=int, default=7, help="Days forecast from each origin (default: 7)")
+        parser.add_argument(
+            "--granularity",
+            choices=[c for c, _ in DemandForecast.GRANULARITY_CHOICES],
+            default="half_hourly",
+        )
+        parser.add_argument(
+            "--end", type=datetime.fromisoformat, default=None,
+            help="End of the history, ISO format (default: now, or 2026-01-01 for synthetic data)",
+        )
+        parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+        parser.add_argument("--report", default="forecast_backtest.md", help="Report path (default: forecast_backtest.md)")
+
+    def handle(self, *args, **options):
+        horizon = options["horizon"]
+        lookbacks = options["lookbacks"]
+        if min(lookbacks) < 1 or horizon < 1 or options["origins"] < 1:
+            raise CommandError("Lookbacks, horizon and origins must be at least 1")
+
+        # ── 1. History long enough for the earliest origin ──────────────
+        days = max(lookbacks) + horizon + options["spacing"] * (options["origins"] - 1)
+        end = options["end"]
+        if options["source"] == "synthetic":
+            end = end or datetime(2026, 1, 1, tzinfo=dt_timezone.utc)
+            history = synthetic_history(options["meters"], days, end, options["seed"])
+        else:
+            end = end or timezone.now()
+            history = database_history(options["meters"], days, end, options["seed"])
+        if end.tzinfo is None:
+            raise CommandError("--end must include a UTC offset")
+        if not history:
+            raise CommandError("No readings to backtest")
+        origins = rolling_origins(end, horizon, options["origins"], options["spacing"])
+
+        # ── 2. Configurations ───────────────────────────────────────────
+        weight_sets = options["day_weights"] or [tuple(DAY_WEIGHTS)]
+        configs = []
+        for method in options["methods"]:
+            for lookback in lookbacks:
+                for weights in (weight_sets if method == "profile" else [tuple(DAY_WEIGHTS)]):
+                    configs.append(Config(method, lookback, weights))
+
+        self.stdout.write(
+            f"Backtesting {len(configs)} configurations on {len(history)} meters × {len(origins)} origins "
+            f"({options['source']}, {horizon}-day horizon, {options['granularity']})"
+        )
+
+        # ── 3. Evaluate and report ──────────────────────────────────────
+        scores = backtest(history, configs, origins, horizon, options["granularity"])
+        text = report(scores, {
+            "Source": f"{options['source']} ({len(history)} meters, seed {options['seed']})",
+            "Origins": f"{len(origins)}, every {options['spacing']} day(s), "
+                       f"{origins[0]:%Y-%m-%d %H:%M} → {origins[-1]:%Y-%m-%d %H:%M} UTC",
+            "Horizon": f"{horizon} days, {options['granularity']}",
+        })
+        with open(options["report"], "w") as out:
+            out.write(text)
+
+        self.stdout.write(text)
+        self.stdout.write(self.style.SUCCESS(f"Report written to {options['report']}"))
@@ -0,0 +1,106 @@
+"""
+Management command to forecast every smart meter in blocks.
+
+Each block is read in one ordered scan, profiled in a process pool and
+bulk-written; throughput is reported in meters per second. Meters whose
+readings are unchanged since their latest forecast keep it unless --force
+is given. With --regions the forecasts are then summed per postcode outward
+code and fuel type into a regional run (see forecasting.regions).
+
+Usage:
+    python manage.py forecast_fleet
+    python manage.py forecast_fleet --lookback-days 30 --block-size 5000 --processes 8
+    python manage.py forecast_fleet --force
+    python manage.py forecast_fleet --regions
+    python manage.py forecast_fleet --method degree_day --lookback-days 90
+    python manage.py forecast_fleet --method holt_winters
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from customers.models import Meter
+from forecasting.batch import BATCH_METHODS, FORECAST_BLOCK_SIZE, generate_forecasts_batch
+from forecasting.models import DemandForecast
+from forecasting.regions import build_region_forecasts
+
+
+class Command(BaseCommand):
+    help = "Generate forecasts for all smart meters in batched blocks"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days-ahead", type=int, default=7, help="Forecast horizon (default: 7)")
+        parser.add_argument("--lookback-days", type=int, default=7, help="Lookback window (default: 7)")
+        parser.add_argument(
+            "--granularity",
+            choices=[c for c, _ in DemandForecast.GRANULARITY_CHOICES],
+            default="half_hourly",
+        )
+        parser.add_argument(
+            "--method",
+            choices=BATCH_METHODS,
+            default="profile",
+            help="degree_day needs a lookback of at least a few weeks (default: profile)",
+        )
+        parser.add_argument(
+            "--block-size", type=int, default=FORECAST_BLOCK_SIZE,
+            help=f"Meters per block (default: {FORECAST_BLOCK_SIZE})",
+        )
+        parser.add_argument("--processes", type=int, default=None, help="Profile processes (default: CPU count)")
+        parser.add_argument("--force", action="store_true", help="Rebuild forecasts whose readings are unchanged")
+        parser.add_argument("--regions", action="store_true", help="Then materialise the regional forecasts")
+
+    def handle(self, *args, **options):
+        meter_ids = [str(pk) for pk in Meter.objects.filter(is_smart=True).order_by("pk").values_list("pk", flat=True)]
+        block_size = options["block_size"]
+        started = time.perf_counter()
+        forecasts = reused = failures = fallbacks = 0
+
+        for offset in range(0, len(meter_ids), block_size):
+            result = generate_forecasts_batch(
+                meter_ids[offset:offset + block_size],
+                days_ahead=options["days_ahead"],
+                lookback_days=options["lookback_days"],
+                granularity=options["granularity"],
+                processes=options["processes"],
+                reuse=not options["force"],
+                method=options["method"],
+            )
+            forecasts += len(result.forecasts)
+            reused += len(result.reused)
+            failures += len(result.failures)
+            fallbacks += result.profile_fallbacks
+            self.stdout.write(
+                f"  {min(offset + block_size, len(meter_ids))}/{len(meter_ids)} meters: "
+                f"{len(result.forecasts)} forecasts, {len(result.reused)} reused, {result.pruned} pruned "
+                f"in {result.seconds:.2f}s ({result.meters_per_second:.1f} meters/s)"
+            )
+            for meter_id, error in list(result.failures.items())[:5]:
+                self.stdout.write(self.style.WARNING(f"    {meter_id}: {error}"))
+
+        elapsed = time.perf_counter() - started
+        rate = (forecasts + reused) / elapsed if elapsed else 0.0
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Done: {forecasts} forecasts, {reused} reused, {failures} failures "
+                f"in {elapsed:.2f}s ({rate:.1f} meters/s)"
+            )
+        )
+        if options["method"] == "degree_day":
+            self.stdout.write(f"{fallbacks} meters had too little history and used the profile model")
+
+        if options["regions"]:
+            started = time.perf_counter()
+            run = build_region_forecasts(
+                method=options["method"],
+                granularity=options["granularity"],
+                days_ahead=options["days_ahead"],
+                lookback_days=options["lookback_days"],
+            )
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Regions: {run.meter_count} meters in {run.region_count} regions "
+                    f"in {time.perf_counter() - started:.2f}s (run {run.pk})"
+                )
+            )
@@ -0,0 +1,87 @@
+"""
+Management command to load daily temperatures / degree days from CSV files.
+
+Each file needs a date column and a mean_temperature_c or
+heating_degree_days column (or both). Heating degree days missing from a
+row are computed from its mean temperature against --base. Rows replace
+any already stored for the same date. Dates are UTC days, like readings.
+
+Usage:
+    python manage.py load_degree_days weather/2025.csv weather/2026.csv
+    python manage.py load_degree_days weather.csv --base 15.5
+"""
+
+import csv
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from forecasting.degree_days import HDD_BASE_C
+from forecasting.models import DegreeDay
+
+
+def _number(value: str):
+    value = (value or "").strip()
+    return float(value) if value else None
+
+
+class Command(BaseCommand):
+    help = "Load daily temperatures and heating degree days from local CSV files"
+
+    def add_arguments(self, parser):
+        parser.add_argument("csv_files", nargs="+", type=str, help="Paths to CSV files")
+        parser.add_argument(
+            "--base", type=float, default=HDD_BASE_C,
+            help=f"Base temperature for heating degree days, °C (default: {HDD_BASE_C})",
+        )
+
+    def handle(self, *args, **options):
+        rows = {}
+        errors = 0
+
+        for path in options["csv_files"]:
+            try:
+                fh = open(path, "r", encoding="utf-8-sig")
+            except FileNotFoundError:
+                raise CommandError(f"File not found: {path}")
+
+            with fh:
+                reader = csv.DictReader(fh)
+                columns = set(reader.fieldnames or [])
+                if "date" not in columns or not columns & {"mean_temperature_c", "heating_degree_days"}:
+                    raise CommandError(
+                        f"{path}: CSV must have a date column and mean_temperature_c or heating_degree_days"
+                    )
+
+                for i, row in enumerate(reader, start=2):
+                    try:
+                        day = parse_date((row.get("date") or "").strip())
+                        temperature = _number(row.get("mean_temperature_c"))
+                        hdd = _number(row.get("heating_degree_days"))
+                    except ValueError:
+                        day = None
+                    if day is None or (temperature is None and hdd is None) or (hdd is not None and hdd < 0):
+                        self.stderr.write(f"  {path} row {i}: invalid date or values")
+                        errors += 1
+                        continue
+
+                    if hdd is None:
+                        hdd = max(options["base"] - temperature, 0.0)
+                    rows[day] = DegreeDay(
+                        date=day,
+                        mean_temperature_c=temperature,
+                        heating_degree_days=round(hdd, 2),
+                        source=os.path.basename(path),
+                    )
+
+        DegreeDay.objects.bulk_create(
+            list(rows.values()),
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=["date"],
+            update_fields=["mean_temperature_c", "heating_degree_days", "source", "updated_at"],
+        )
+
+        span = f" ({min(rows)} → {max(rows)})" if rows else ""
+        self.stdout.write(self.style.SUCCESS(f"Done: {len(rows)} days loaded{span}, {errors} errors"))
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forecasting', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='demandforecast',
+            name='lower_series',
+            field=models.BinaryField(default=bytes),
+        ),
+        migrations.AddField(
+            model_name='demandforecast',
+            name='predicted_series',
+            field=models.BinaryField(default=bytes),
+        ),
+        migrations.AddField(
+            model_name='demandforecast',
+            name='step_seconds',
+            field=models.PositiveIntegerField(default=1800),
+        ),
+        migrations.AddField(
+            model_name='demandforecast',
+            name='upper_series',
+            field=models.BinaryField(default=bytes),
+        ),
+    ]
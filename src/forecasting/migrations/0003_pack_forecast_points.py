@@ -0,0 +1,81 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:26
+
+from datetime import timedelta
+from itertools import groupby
+
+import numpy as np
+from django.db import migrations
+
+SCALE = 10_000
+STEP_SECONDS = {"half_hourly": 1800, "hourly": 3600, "daily": 86400}
+BATCH_SIZE = 1000
+SERIES_FIELDS = ["step_seconds", "predicted_series", "lower_series", "upper_series"]
+
+
+def _units(values):
+    return np.array([int(v.scaleb(4)) for v in values], dtype="<i4").tobytes()
+
+
+def pack_points(apps, schema_editor):
+    """Pack each forecast's ForecastPoint rows into its series fields."""
+    DemandForecast = apps.get_model("forecasting", "DemandForecast")
+    ForecastPoint = apps.get_model("forecasting", "ForecastPoint")
+
+    granularity = dict(DemandForecast.objects.values_list("pk", "granularity"))
+    rows = (
+        ForecastPoint.objects.order_by("forecast_id", "timestamp")
+        .values_list("forecast_id", "predicted_kwh", "lower_bound_kwh", "upper_bound_kwh")
+        .iterator(chunk_size=20000)
+    )
+    batch = []
+    for forecast_id, points in groupby(rows, key=lambda row: row[0]):
+        _, predicted, lower, upper = zip(*points)
+        batch.append(DemandForecast(
+            pk=forecast_id,
+            step_seconds=STEP_SECONDS[granularity[forecast_id]],
+            predicted_series=_units(predicted),
+            lower_series=_units(lower),
+            upper_series=_units(upper),
+        ))
+        if len(batch) == BATCH_SIZE:
+            DemandForecast.objects.bulk_update(batch, SERIES_FIELDS)
+            batch = []
+    if batch:
+        DemandForecast.objects.bulk_update(batch, SERIES_FIELDS)
+
+
+def unpack_points(apps, schema_editor):
+    """Recreate ForecastPoint rows from the series fields."""
+    DemandForecast = apps.get_model("forecasting", "DemandForecast")
+    ForecastPoint = apps.get_model("forecasting", "ForecastPoint")
+
+    points = []
+    for forecast in DemandForecast.objects.iterator(chunk_size=BATCH_SIZE):
+        step = timedelta(seconds=forecast.step_seconds)
+        series = zip(*(
+            (np.frombuffer(bytes(data), dtype="<i4") / SCALE).round(4).tolist()
+            for data in (forecast.predicted_series, forecast.lower_series, forecast.upper_series)
+        ))
+        for i, (predicted, lower, upper) in enumerate(series):
+            points.append(ForecastPoint(
+                forecast_id=forecast.pk,
+                timestamp=forecast.forecast_start + i * step,
+                predicted_kwh=predicted,
+                lower_bound_kwh=lower,
+                upper_bound_kwh=upper,
+            ))
+        if len(points) >= 20000:
+            ForecastPoint.objects.bulk_create(points)
+            points = []
+    ForecastPoint.objects.bulk_create(points)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forecasting', '0002_forecast_series'),
+    ]
+
+    operations = [
+        migrations.RunPython(pack_points, unpack_points),
+    ]
@@ -0,0 +1,16 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:26
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forecasting', '0003_pack_forecast_points'),
+    ]
+
+    operations = [
+        migrations.DeleteModel(
+            name='ForecastPoint',
+        ),
+    ]
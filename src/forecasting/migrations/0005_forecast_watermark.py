@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:29
+
+from django.db import migrations, models
+
+
+def set_days_ahead(apps, schema_editor):
+    DemandForecast = apps.get_model("forecasting", "DemandForecast")
+    forecasts = [
+        DemandForecast(pk=pk, days_ahead=(end - start).days)
+        for pk, start, end in DemandForecast.objects.values_list("pk", "forecast_start", "forecast_end").iterator()
+    ]
+    DemandForecast.objects.bulk_update(forecasts, ["days_ahead"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0002_customer_user'),
+        ('forecasting', '0004_delete_forecastpoint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='demandforecast',
+            name='days_ahead',
+            field=models.PositiveIntegerField(default=7),
+        ),
+        migrations.AddField(
+            model_name='demandforecast',
+            name='input_count',
+            field=models.PositiveIntegerField(default=0, help_text='Readings used for the prediction'),
+        ),
+        migrations.AddField(
+            model_name='demandforecast',
+            name='input_mwh',
+            field=models.BigIntegerField(default=0, help_text='Sum of the readings used, in mWh'),
+        ),
+        migrations.AddField(
+            model_name='demandforecast',
+            name='input_through',
+            field=models.DateTimeField(blank=True, help_text='Last reading used for the prediction', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='demandforecast',
+            index=models.Index(fields=['meter', 'granularity', '-created_at'], name='forecast_latest_idx'),
+        ),
+        migrations.RunPython(set_days_ahead, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0002_customer_user'),
+        ('forecasting', '0005_forecast_watermark'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ForecastState',
+            fields=[
+                ('meter', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='forecast_state', serialize=False, to='customers.meter')),
+                ('level', models.FloatField()),
+                ('trend', models.FloatField()),
+                ('variance', models.FloatField()),
+                ('seasonal', models.BinaryField()),
+                ('last_reading_at', models.DateTimeField()),
+                ('observations', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='demandforecast',
+            name='method',
+            field=models.CharField(choices=[('profile', 'Weighted day-of-week profile'), ('holt_winters', 'Holt-Winters smoothing')], default='profile', max_length=15),
+        ),
+    ]
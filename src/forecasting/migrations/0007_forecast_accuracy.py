@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0002_customer_user'),
+        ('forecasting', '0006_forecast_state'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ForecastAccuracy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('method', models.CharField(choices=[('profile', 'Weighted day-of-week profile'), ('holt_winters', 'Holt-Winters smoothing')], max_length=15)),
+                ('date', models.DateField()),
+                ('points', models.IntegerField(default=0)),
+                ('covered', models.IntegerField(default=0, help_text='Actuals inside the forecast interval')),
+                ('actual_kwh', models.FloatField(default=0)),
+                ('abs_error_kwh', models.FloatField(default=0)),
+                ('squared_error', models.FloatField(default=0, help_text='Sum of squared errors, kWh²')),
+                ('pct_points', models.IntegerField(default=0, help_text='Points large enough for a percentage error')),
+                ('abs_pct_error', models.FloatField(default=0, help_text='Sum of |error| / actual over pct_points')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('meter', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='forecast_accuracy', to='customers.meter')),
+            ],
+            options={
+                'ordering': ['-date'],
+                'indexes': [models.Index(fields=['date', 'method'], name='forecasting_date_b964d8_idx')],
+                'constraints': [models.UniqueConstraint(fields=('meter', 'method', 'date'), name='unique_forecast_accuracy_day')],
+            },
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:39
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forecasting', '0007_forecast_accuracy'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RegionForecastRun',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('method', models.CharField(choices=[('profile', 'Weighted day-of-week profile'), ('holt_winters', 'Holt-Winters smoothing')], default='profile', max_length=15)),
+                ('granularity', models.CharField(choices=[('half_hourly', 'Half-hourly'), ('hourly', 'Hourly'), ('daily', 'Daily')], default='half_hourly', max_length=15)),
+                ('days_ahead', models.PositiveIntegerField(default=7)),
+                ('lookback_days', models.PositiveIntegerField(default=7)),
+                ('forecast_start', models.DateTimeField()),
+                ('forecast_end', models.DateTimeField()),
+                ('step_seconds', models.PositiveIntegerField(default=1800)),
+                ('meter_count', models.PositiveIntegerField(default=0)),
+                ('region_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['method', 'granularity', '-created_at'], name='region_run_latest_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='RegionForecast',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('outward_code', models.CharField(max_length=8)),
+                ('fuel_type', models.CharField(choices=[('electricity', 'Electricity'), ('gas', 'Gas')], max_length=15)),
+                ('meter_count', models.PositiveIntegerField(default=0)),
+                ('total_predicted_kwh', models.DecimalField(decimal_places=4, default=0, max_digits=16)),
+                ('predicted_series', models.BinaryField(default=bytes)),
+                ('lower_series', models.BinaryField(default=bytes)),
+                ('upper_series', models.BinaryField(default=bytes)),
+                ('meters_series', models.BinaryField(default=bytes)),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='regions', to='forecasting.regionforecastrun')),
+            ],
+            options={
+                'ordering': ['outward_code', 'fuel_type'],
+                'constraints': [models.UniqueConstraint(fields=('run', 'outward_code', 'fuel_type'), name='unique_region_forecast')],
+            },
+        ),
+    ]
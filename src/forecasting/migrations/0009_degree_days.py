@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forecasting', '0008_region_forecasts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DegreeDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('mean_temperature_c', models.FloatField(blank=True, null=True)),
+                ('heating_degree_days', models.FloatField()),
+                ('source', models.CharField(blank=True, help_text='File the row was loaded from', max_length=255)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['date'],
+            },
+        ),
+        migrations.AlterField(
+            model_name='demandforecast',
+            name='method',
+            field=models.CharField(choices=[('profile', 'Weighted day-of-week profile'), ('holt_winters', 'Holt-Winters smoothing'), ('degree_day', 'Degree-day regression')], default='profile', max_length=15),
+        ),
+        migrations.AlterField(
+            model_name='forecastaccuracy',
+            name='method',
+            field=models.CharField(choices=[('profile', 'Weighted day-of-week profile'), ('holt_winters', 'Holt-Winters smoothing'), ('degree_day', 'Degree-day regression')], max_length=15),
+        ),
+        migrations.AlterField(
+            model_name='regionforecastrun',
+            name='method',
+            field=models.CharField(choices=[('profile', 'Weighted day-of-week profile'), ('holt_winters', 'Holt-Winters smoothing'), ('degree_day', 'Degree-day regression')], default='profile', max_length=15),
+        ),
+    ]
@@ -1,53 +1,250 @@
 import uuid
+from datetime import timedelta
 
+import numpy as np
 from django.db import models
 
 from customers.models import Meter
 
+from . import series
+
 
 class DemandForecast(models.Model):
-    """Forecast run for a meter over a future period."""
+    """
+    Forecast run for a meter over a future period.
+
+    The forecast values are packed on the row (see forecasting.series):
+    one predicted/lower/upper value per step_seconds from forecast_start.
+    The input_* fields are the watermark of the readings it was built
+    from (see forecasting.reuse).
+    """
 
     GRANULARITY_CHOICES = [
         ("half_hourly", "Half-hourly"),
         ("hourly", "Hourly"),
         ("daily", "Daily"),
     ]
+    METHOD_CHOICES = [
+        ("profile", "Weighted day-of-week profile"),
+        ("holt_winters", "Holt-Winters smoothing"),
+        ("degree_day", "Degree-day regression"),
+    ]
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     meter = models.ForeignKey(
         Meter, on_delete=models.CASCADE, related_name="forecasts"
     )
     granularity = models.CharField(max_length=15, choices=GRANULARITY_CHOICES, default="half_hourly")
+    method = models.CharField(max_length=15, choices=METHOD_CHOICES, default="profile")
     forecast_start = models.DateTimeField()
     forecast_end = models.DateTimeField()
     lookback_days = models.PositiveIntegerField(
         default=7,
         help_text="Number of historical days used for the prediction",
     )
+    days_ahead = models.PositiveIntegerField(default=7)
+    input_through = models.DateTimeField(
+        null=True, blank=True,
+        help_text="Last reading used for the prediction",
+    )
+    input_count = models.PositiveIntegerField(default=0, help_text="Readings used for the prediction")
+    input_mwh = models.BigIntegerField(default=0, help_text="Sum of the readings used, in mWh")
     total_predicted_kwh = models.DecimalField(max_digits=12, decimal_places=4, default=0)
+    step_seconds = models.PositiveIntegerField(default=1800)
+    predicted_series = models.BinaryField(default=bytes)
+    lower_series = models.BinaryField(default=bytes)
+    upper_series = models.BinaryField(default=bytes)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["meter", "granularity", "-created_at"], name="forecast_latest_idx"),
+        ]
 
     def __str__(self):
         return f"Forecast {self.meter.mpan} | {self.forecast_start:%Y-%m-%d} → {self.forecast_end:%Y-%m-%d}"
 
+    def set_series(self, predicted: np.ndarray, lower: np.ndarray, upper: np.ndarray) -> None:
+        """Pack the series (in 0.0001 kWh units) and update the total."""
+        self.predicted_series = series.pack(predicted)
+        self.lower_series = series.pack(lower)
+        self.upper_series = series.pack(upper)
+        self.total_predicted_kwh = series.units_to_kwh(np.asarray(predicted, dtype=np.int64).sum())
+
+    @property
+    def point_count(self) -> int:
+        return len(self.predicted_series or b"") // series.DTYPE.itemsize
+
+    def series_units(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(predicted, lower, upper) as int32 arrays of 0.0001 kWh."""
+        return (
+            series.unpack(self.predicted_series),
+            series.unpack(self.lower_series),
+            series.unpack(self.upper_series),
+        )
+
+    def timestamps(self) -> list:
+        step = timedelta(seconds=self.step_seconds)
+        return [self.forecast_start + i * step for i in range(self.point_count)]
+
+    def points(self) -> list[dict]:
+        """The forecast as one dict per step (timestamp and Decimal kWh)."""
+        predicted, lower, upper = self.series_units()
+        return [
+            {
+                "timestamp": when,
+                "predicted_kwh": series.units_to_kwh(p),
+                "lower_bound_kwh": series.units_to_kwh(lo),
+                "upper_bound_kwh": series.units_to_kwh(hi),
+            }
+            for when, p, lo, hi in zip(self.timestamps(), predicted.tolist(), lower.tolist(), upper.tolist())
+        ]
+
+
+class ForecastState(models.Model):
+    """
+    Holt-Winters state for a meter (see forecasting.smoothing), advanced
+    as readings are ingested. The 336 weekly seasonal terms are packed as
+    little-endian float32.
+    """
+
+    meter = models.OneToOneField(
+        Meter, on_delete=models.CASCADE, primary_key=True, related_name="forecast_state"
+    )
+    level = models.FloatField()
+    trend = models.FloatField()
+    variance = models.FloatField()
+    seasonal = models.BinaryField()
+    last_reading_at = models.DateTimeField()
+    observations = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Smoothing state {self.meter.mpan} @ {self.last_reading_at:%Y-%m-%d %H:%M}"
 
-class ForecastPoint(models.Model):
-    """Individual predicted data point within a forecast."""
 
-    forecast = models.ForeignKey(
-        DemandForecast, on_delete=models.CASCADE, related_name="points"
+class ForecastAccuracy(models.Model):
+    """
+    Running error sums for one meter, forecasting method and UTC day,
+    added to as actual readings arrive (see forecasting.accuracy). Rolling
+    metrics are sums over a range of days.
+    """
+
+    meter = models.ForeignKey(
+        Meter, on_delete=models.CASCADE, related_name="forecast_accuracy"
     )
-    timestamp = models.DateTimeField()
-    predicted_kwh = models.DecimalField(max_digits=12, decimal_places=4)
-    lower_bound_kwh = models.DecimalField(max_digits=12, decimal_places=4)
-    upper_bound_kwh = models.DecimalField(max_digits=12, decimal_places=4)
+    method = models.CharField(max_length=15, choices=DemandForecast.METHOD_CHOICES)
+    date = models.DateField()
+    points = models.IntegerField(default=0)
+    covered = models.IntegerField(default=0, help_text="Actuals inside the forecast interval")
+    actual_kwh = models.FloatField(default=0)
+    abs_error_kwh = models.FloatField(default=0)
+    squared_error = models.FloatField(default=0, help_text="Sum of squared errors, kWh²")
+    pct_points = models.IntegerField(default=0, help_text="Points large enough for a percentage error")
+    abs_pct_error = models.FloatField(default=0, help_text="Sum of |error| / actual over pct_points")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-date"]
+        constraints = [
+            models.UniqueConstraint(fields=["meter", "method", "date"], name="unique_forecast_accuracy_day"),
+        ]
+        indexes = [
+            models.Index(fields=["date", "method"]),
+        ]
+
+    def __str__(self):
+        return f"Accuracy {self.meter.mpan} {self.method} {self.date}"
+
+
+class RegionForecastRun(models.Model):
+    """
+    One materialisation of the regional forecasts: every meter's latest
+    forecast with these parameters, summed per postcode outward code and
+    fuel type onto a common grid from forecast_start (see forecasting.regions).
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    method = models.CharField(max_length=15, choices=DemandForecast.METHOD_CHOICES, default="profile")
+    granularity = models.CharField(max_length=15, choices=DemandForecast.GRANULARITY_CHOICES, default="half_hourly")
+    days_ahead = models.PositiveIntegerField(default=7)
+    lookback_days = models.PositiveIntegerField(default=7)
+    forecast_start = models.DateTimeField()
+    forecast_end = models.DateTimeField()
+    step_seconds = models.PositiveIntegerField(default=1800)
+    meter_count = models.PositiveIntegerField(default=0)
+    region_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["method", "granularity", "-created_at"], name="region_run_latest_idx"),
+        ]
+
+    def __str__(self):
+        return f"Region forecast run {self.forecast_start:%Y-%m-%d %H:%M} ({self.region_count} regions)"
+
+
+class RegionForecast(models.Model):
+    """
+    Summed forecast for one outward code and fuel type in a run. Series are
+    packed as int64 0.0001 kWh (series.REGION_DTYPE); meters_series is the
+    number of meter forecasts covering each step.
+    """
+
+    run = models.ForeignKey(RegionForecastRun, on_delete=models.CASCADE, related_name="regions")
+    outward_code = models.CharField(max_length=8)
+    fuel_type = models.CharField(max_length=15, choices=Meter.FUEL_TYPES)
+    meter_count = models.PositiveIntegerField(default=0)
+    total_predicted_kwh = models.DecimalField(max_digits=16, decimal_places=4, default=0)
+    predicted_series = models.BinaryField(default=bytes)
+    lower_series = models.BinaryField(default=bytes)
+    upper_series = models.BinaryField(default=bytes)
+    meters_series = models.BinaryField(default=bytes)
+
+    class Meta:
+        ordering = ["outward_code", "fuel_type"]
+        constraints = [
+            models.UniqueConstraint(fields=["run", "outward_code", "fuel_type"], name="unique_region_forecast"),
+        ]
+
+    def __str__(self):
+        return f"Region forecast {self.outward_code} {self.fuel_type}"
+
+    def set_series(self, predicted: np.ndarray, lower: np.ndarray, upper: np.ndarray, meters: np.ndarray) -> None:
+        """Pack the series (in 0.0001 kWh units) and update the total."""
+        self.predicted_series = series.pack(predicted, series.REGION_DTYPE)
+        self.lower_series = series.pack(lower, series.REGION_DTYPE)
+        self.upper_series = series.pack(upper, series.REGION_DTYPE)
+        self.meters_series = series.pack(meters)
+        self.total_predicted_kwh = series.units_to_kwh(np.asarray(predicted, dtype=np.int64).sum())
+
+    def series_units(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """(predicted, lower, upper) as int64 arrays of 0.0001 kWh, and meters per step."""
+        return (
+            series.unpack(self.predicted_series, series.REGION_DTYPE),
+            series.unpack(self.lower_series, series.REGION_DTYPE),
+            series.unpack(self.upper_series, series.REGION_DTYPE),
+            series.unpack(self.meters_series),
+        )
+
+
+class DegreeDay(models.Model):
+    """
+    Daily mean outdoor temperature and heating degree days (UTC dates),
+    loaded from local files by the load_degree_days command.
+    """
+
+    date = models.DateField(unique=True)
+    mean_temperature_c = models.FloatField(null=True, blank=True)
+    heating_degree_days = models.FloatField()
+    source = models.CharField(max_length=255, blank=True, help_text="File the row was loaded from")
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
-        ordering = ["timestamp"]
+        ordering = ["date"]
 
     def __str__(self):
-        return f"{self.timestamp:%Y-%m-%d %H:%M} — {self.predicted_kwh} kWh"
+        return f"{self.date}: {self.heating_degree_days:.1f} HDD"
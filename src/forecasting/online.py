@@ -0,0 +1,99 @@
+"""
+Persisted Holt-Winters state per meter.
+
+load_states(meter_ids)                      → {meter_id: SmoothingState}
+bootstrap_states(meter_ids, since, until)   → fits and stores a state for
+                                              each meter that has none
+apply_readings(readings)                    → advances stored states by
+                                              newly ingested readings
+
+States are created once from history and from then on advanced one
+reading at a time by the readings_ingested receiver (forecasting.signals),
+so a Holt-Winters forecast needs no readings query. Readings at or before
+a meter's last applied reading (late arrivals and corrections) are not
+applied.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import datetime, timezone as dt_timezone
+
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ForecastState
+from .profile import epoch_seconds
+from .readings import readings_by_meter
+from .smoothing import SmoothingState, fit, update
+
+logger = logging.getLogger(__name__)
+
+SEASONAL_DTYPE = np.dtype("<f4")
+STATE_FIELDS = ["level", "trend", "variance", "seasonal", "last_reading_at", "observations", "updated_at"]
+
+
+def _from_row(row: ForecastState) -> SmoothingState:
+    return SmoothingState(
+        level=row.level,
+        trend=row.trend,
+        seasonal=np.frombuffer(bytes(row.seasonal), dtype=SEASONAL_DTYPE).astype(np.float64),
+        variance=row.variance,
+        last_ts=epoch_seconds(row.last_reading_at),
+        observations=row.observations,
+    )
+
+
+def _to_row(row: ForecastState, state: SmoothingState) -> ForecastState:
+    row.level = state.level
+    row.trend = state.trend
+    row.variance = state.variance
+    row.seasonal = state.seasonal.astype(SEASONAL_DTYPE).tobytes()
+    row.last_reading_at = datetime.fromtimestamp(state.last_ts, tz=dt_timezone.utc)
+    row.observations = state.observations
+    row.updated_at = timezone.now()
+    return row
+
+
+def load_states(meter_ids) -> dict:
+    return {str(row.meter_id): _from_row(row) for row in ForecastState.objects.filter(meter_id__in=list(meter_ids))}
+
+
+def bootstrap_states(meter_ids, since: datetime, until: datetime) -> dict:
+    """Fit states from readings in [since, until) for meters without one."""
+    meter_ids = [str(m) for m in meter_ids]
+    existing = set(
+        str(pk) for pk in ForecastState.objects.filter(meter_id__in=meter_ids).values_list("meter_id", flat=True)
+    )
+    states = {}
+    for meter_id, timestamps, values in readings_by_meter(
+        [m for m in meter_ids if m not in existing], since, until,
+    ):
+        states[meter_id] = fit(timestamps, values)
+
+    ForecastState.objects.bulk_create(
+        [_to_row(ForecastState(meter_id=meter_id), state) for meter_id, state in states.items()],
+        ignore_conflicts=True,
+    )
+    logger.info("Bootstrapped %d forecast states", len(states))
+    return states
+
+
+def apply_readings(readings) -> int:
+    """Advance the stored states of the readings' meters. Returns readings applied."""
+    by_meter = defaultdict(list)
+    for reading in readings:
+        by_meter[str(reading.meter_id)].append(reading)
+    if not by_meter:
+        return 0
+
+    applied = 0
+    with transaction.atomic():
+        rows = list(ForecastState.objects.select_for_update().filter(meter_id__in=list(by_meter)))
+        for row in rows:
+            state = _from_row(row)
+            for reading in sorted(by_meter[str(row.meter_id)], key=lambda r: r.reading_at):
+                applied += update(state, epoch_seconds(reading.reading_at), float(reading.value_kwh))
+            _to_row(row, state)
+        ForecastState.objects.bulk_update(rows, STATE_FIELDS)
+    return applied
@@ -0,0 +1,70 @@
+"""
+Meter readings as NumPy arrays for the forecasters.
+
+reading_arrays(readings)                  → (epoch seconds, kWh) for a queryset
+readings_by_meter(meter_ids, since, until)
+  → (meter_id, epoch seconds, kWh) per meter from one ordered scan
+readings_in_windows(windows)
+  → the same, each meter over its own [since, until), in one query
+"""
+
+from collections import defaultdict
+from datetime import datetime
+from functools import reduce
+from itertools import groupby
+from operator import or_
+
+import numpy as np
+from django.db.models import Q
+
+from metering.models import MeterReading
+
+from .profile import epoch_seconds
+
+READ_CHUNK_SIZE = 20000  # readings fetched per round-trip
+
+
+def reading_arrays(readings) -> tuple[np.ndarray, np.ndarray]:
+    """A readings queryset as (int64 epoch seconds, float64 kWh), oldest first."""
+    rows = readings.order_by("reading_at").values_list("reading_at", "value_kwh")
+    timestamps = np.fromiter((epoch_seconds(r) for r, _ in rows), dtype=np.int64)
+    values = np.fromiter((float(v) for _, v in rows), dtype=np.float64)
+    return timestamps, values
+
+
+def readings_by_meter(meter_ids, since: datetime, until: datetime):
+    """Yield (meter_id, epoch seconds, kWh) per meter, oldest first, from one ordered scan."""
+    return _by_meter(
+        MeterReading.objects.filter(meter_id__in=list(meter_ids), reading_at__gte=since, reading_at__lt=until)
+    )
+
+
+def readings_in_windows(windows: dict):
+    """
+    readings_by_meter with a window per meter: windows maps meter_id to
+    (since, until). Meters sharing a window share one condition.
+    """
+    by_window = defaultdict(list)
+    for meter_id, window in windows.items():
+        by_window[window].append(meter_id)
+    if not by_window:
+        return iter(())
+    return _by_meter(MeterReading.objects.filter(reduce(or_, (
+        Q(meter_id__in=meter_ids, reading_at__gte=since, reading_at__lt=until)
+        for (since, until), meter_ids in by_window.items()
+    ))))
+
+
+def _by_meter(readings):
+    rows = (
+        readings.order_by("meter_id", "reading_at")
+        .values_list("meter_id", "reading_at", "value_kwh")
+        .iterator(chunk_size=READ_CHUNK_SIZE)
+    )
+    for meter_id, group in groupby(rows, key=lambda row: row[0]):
+        group = list(group)
+        yield (
+            str(meter_id),
+            np.fromiter((epoch_seconds(r[1]) for r in group), dtype=np.int64, count=len(group)),
+            np.fromiter((float(r[2]) for r in group), dtype=np.float64, count=len(group)),
+        )
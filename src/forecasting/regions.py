@@ -0,0 +1,181 @@
+"""
+Regional demand forecasts for grid balancing.
+
+outward_code(postcode)      → "SW1A" for "SW1A 1AA"
+build_region_forecasts(method, granularity, days_ahead, lookback_days)
+                            → RegionForecastRun with one RegionForecast per
+                              postcode outward code and fuel type
+latest_run(method, granularity, at)
+                            → the newest run covering a time
+region_window(region, since, until)
+                            → the region's columns between two times
+prune_region_runs(before)   → deletes runs that ended before a time
+
+A run reads the latest stored forecast of every meter with the given
+parameters in one streamed query and adds it onto the run's grid, which
+starts on the current hour like generate_forecast(). Forecasts built
+earlier (e.g. kept by reuse) contribute to the steps they still cover;
+meters_series records how many meters cover each step.
+
+Intervals are combined in quadrature: treating meters' errors as
+independent, the region's upper (and lower) half-width is the square root
+of the sum of the meters' squared half-widths, not their sum. Lower bounds
+are clipped at zero. Errors shared between meters (e.g. weather) make this
+optimistic, so compare coverage in the backtest before relying on it.
+"""
+
+import logging
+from datetime import datetime, timedelta
+
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+
+from . import series
+from .models import DemandForecast, RegionForecast, RegionForecastRun
+from .profile import SECONDS_PER_DAY, STEP_MINUTES, epoch_seconds
+
+logger = logging.getLogger(__name__)
+
+FORECAST_CHUNK_SIZE = 2000  # forecasts fetched per round-trip
+RUN_RETENTION_DAYS = 14  # runs are kept this long after their window ends
+
+
+def outward_code(postcode: str) -> str:
+    """The outward code of a UK postcode (everything before the 3-character inward code)."""
+    compact = "".join(postcode.split()).upper()
+    return compact[:-3] if len(compact) > 4 else compact
+
+
+def build_region_forecasts(
+    method: str = "profile",
+    granularity: str = "half_hourly",
+    days_ahead: int = 7,
+    lookback_days: int = 7,
+    now: datetime | None = None,
+) -> RegionForecastRun:
+    """Sum the meters' latest forecasts per outward code and fuel type."""
+    start = (now or timezone.now()).replace(minute=0, second=0, microsecond=0)
+    end = start + timedelta(days=days_ahead)
+    step = STEP_MINUTES[granularity] * 60
+    n_steps = -(-days_ahead * SECONDS_PER_DAY // step)
+    start_ts = epoch_seconds(start)
+
+    # ── 1. Stream each meter's latest forecast onto the grid ────────────
+    # region → int64 [predicted, meters] and float64 [upper², lower²] per step
+    totals, squares = {}, {}
+    meters = {}
+    previous = None
+    skipped = 0
+    forecasts = (
+        DemandForecast.objects.filter(
+            method=method,
+            granularity=granularity,
+            days_ahead=days_ahead,
+            lookback_days=lookback_days,
+            forecast_start__lt=end,
+            forecast_end__gt=start,
+        )
+        .order_by("meter_id", "-created_at")
+        .values_list(
+            "meter_id", "meter__property__postcode", "meter__fuel_type", "forecast_start",
+            "step_seconds", "predicted_series", "lower_series", "upper_series",
+        )
+        .iterator(chunk_size=FORECAST_CHUNK_SIZE)
+    )
+    for meter_id, postcode, fuel_type, forecast_start, step_seconds, *packed in forecasts:
+        if meter_id == previous:
+            continue
+        previous = meter_id
+        offset = epoch_seconds(forecast_start) - start_ts
+        if step_seconds != step or offset % step:
+            skipped += 1
+            continue
+
+        predicted, lower, upper = (series.unpack(data).astype(np.int64) for data in packed)
+        first = offset // step
+        lo, hi = max(first, 0), min(first + len(predicted), n_steps)
+        if lo >= hi:
+            continue
+        part = slice(lo - first, hi - first)
+
+        region = (outward_code(postcode), fuel_type)
+        if region not in totals:
+            totals[region] = np.zeros((2, n_steps), dtype=np.int64)
+            squares[region] = np.zeros((2, n_steps))
+            meters[region] = 0
+        totals[region][0, lo:hi] += predicted[part]
+        totals[region][1, lo:hi] += 1
+        squares[region][0, lo:hi] += (upper[part] - predicted[part]).astype(np.float64) ** 2
+        squares[region][1, lo:hi] += (predicted[part] - lower[part]).astype(np.float64) ** 2
+        meters[region] += 1
+
+    # ── 2. Combine intervals and materialise the run ────────────────────
+    run = RegionForecastRun(
+        method=method,
+        granularity=granularity,
+        days_ahead=days_ahead,
+        lookback_days=lookback_days,
+        forecast_start=start,
+        forecast_end=end,
+        step_seconds=step,
+        meter_count=sum(meters.values()),
+        region_count=len(totals),
+    )
+    regions = []
+    for (code, fuel_type), (predicted, covering) in totals.items():
+        upper_width, lower_width = np.rint(np.sqrt(squares[(code, fuel_type)])).astype(np.int64)
+        region = RegionForecast(run=run, outward_code=code, fuel_type=fuel_type, meter_count=meters[(code, fuel_type)])
+        region.set_series(predicted, np.maximum(predicted - lower_width, 0), predicted + upper_width, covering)
+        regions.append(region)
+
+    with transaction.atomic():
+        run.save()
+        RegionForecast.objects.bulk_create(regions, batch_size=500)
+
+    logger.info(
+        "Region forecasts: %d meters in %d regions (%d forecasts off the run's grid skipped)",
+        run.meter_count, run.region_count, skipped,
+    )
+    return run
+
+
+def latest_run(method: str = "profile", granularity: str = "half_hourly", at: datetime | None = None):
+    """The newest run with these parameters whose window covers at (default: now), or None."""
+    at = at or timezone.now()
+    return (
+        RegionForecastRun.objects.filter(
+            method=method, granularity=granularity, forecast_start__lte=at, forecast_end__gt=at,
+        )
+        .order_by("-created_at")
+        .first()
+    )
+
+
+def region_window(region: RegionForecast, since: datetime | None = None, until: datetime | None = None) -> dict:
+    """The region's timestamps and kWh columns for steps starting in [since, until)."""
+    run = region.run
+    predicted, lower, upper, covering = region.series_units()
+    start_ts = epoch_seconds(run.forecast_start)
+    n_steps = len(predicted)
+
+    def step_at(when):
+        # First step starting at or after when
+        return min(max(-(-(epoch_seconds(when) - start_ts) // run.step_seconds), 0), n_steps)
+
+    first = 0 if since is None else step_at(since)
+    last = n_steps if until is None else max(step_at(until), first)
+    step = timedelta(seconds=run.step_seconds)
+    return {
+        "timestamps": [run.forecast_start + i * step for i in range(first, last)],
+        "predicted_kwh": (predicted[first:last] / series.SCALE).tolist(),
+        "lower_bound_kwh": (lower[first:last] / series.SCALE).tolist(),
+        "upper_bound_kwh": (upper[first:last] / series.SCALE).tolist(),
+        "meters": covering[first:last].tolist(),
+    }
+
+
+def prune_region_runs(before: datetime | None = None) -> int:
+    """Delete runs whose window ended before before (default: RUN_RETENTION_DAYS ago)."""
+    before = before or timezone.now() - timedelta(days=RUN_RETENTION_DAYS)
+    return RegionForecastRun.objects.filter(forecast_end__lt=before).delete()[0]
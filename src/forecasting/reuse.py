@@ -0,0 +1,119 @@
+"""
+Skip-if-unchanged forecast reuse.
+
+Every forecast records the parameters it was built with and a watermark of
+its inputs: the last reading_at, the number of readings and their sum in
+mWh over its lookback window.
+
+input_watermark(timestamps, values)   → watermark fields for a new forecast
+reusable_forecasts(meter_ids, ..., now)
+                                      → {meter_id: DemandForecast} still valid
+prune_superseded(forecasts)           → deletes the other forecasts with
+                                        the same meter and parameters
+                                        whose window ended over
+                                        SUPERSEDED_RETENTION_DAYS ago
+
+A meter's latest profile forecast is reused while it still covers at least
+MIN_HORIZON_FRACTION of the requested days ahead from now and the meter
+has no new or corrected readings since it was built:
+the watermark recomputed from the previous window start up to now must be
+identical to the stored one. Any reading that arrived after the forecast
+was built raises the count; a correction changes the count or the sum.
+
+Superseded forecasts are kept until SUPERSEDED_RETENTION_DAYS after their
+window ends: forecasting.accuracy scores late and corrected readings
+against the forecast that covered them, which a newer forecast (starting
+when it was built) does not.
+"""
+
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import numpy as np
+from django.db.models import Count, Max, Sum
+from django.utils import timezone
+
+from billing.fixedpoint import MWH_PER_KWH, reading_mwh
+from metering.models import MeterReading
+
+from .models import DemandForecast
+
+MIN_HORIZON_FRACTION = 0.95  # of days_ahead a reused forecast must still cover
+SUPERSEDED_RETENTION_DAYS = 14  # superseded forecasts are kept this long after their window ends
+
+
+def input_watermark(timestamps: np.ndarray, values: np.ndarray) -> dict:
+    """Watermark fields for readings given as epoch seconds and kWh."""
+    return {
+        "input_through": datetime.fromtimestamp(int(timestamps.max()), tz=dt_timezone.utc),
+        "input_count": len(timestamps),
+        "input_mwh": int(np.rint(values * MWH_PER_KWH).astype(np.int64).sum()),
+    }
+
+
+def reusable_forecasts(
+    meter_ids,
+    days_ahead: int,
+    lookback_days: int,
+    granularity: str,
+    now: datetime,
+) -> dict:
+    """The latest forecast per meter whose inputs and parameters are unchanged."""
+    latest = {}
+    for forecast in (
+        DemandForecast.objects.filter(
+            meter_id__in=list(meter_ids),
+            days_ahead=days_ahead,
+            lookback_days=lookback_days,
+            granularity=granularity,
+            method="profile",
+            forecast_end__gte=now + timedelta(days=days_ahead) * MIN_HORIZON_FRACTION,
+            input_count__gt=0,
+        )
+        .select_related("meter")
+        .order_by("meter_id", "-created_at")
+    ):
+        latest.setdefault(str(forecast.meter_id), forecast)
+
+    # Forecasts from the same run share a window, so usually one query
+    by_window = defaultdict(list)
+    for forecast in latest.values():
+        by_window[forecast.forecast_start - timedelta(days=lookback_days)].append(forecast)
+
+    reusable = {}
+    for since, forecasts in by_window.items():
+        current = {
+            str(row["meter_id"]): (row["through"], row["count"], row["mwh"])
+            for row in MeterReading.objects.filter(
+                meter_id__in=[f.meter_id for f in forecasts], reading_at__gte=since, reading_at__lt=now,
+            )
+            .values("meter_id")
+            .annotate(through=Max("reading_at"), count=Count("pk"), mwh=Sum(reading_mwh()))
+            .order_by()
+        }
+        for forecast in forecasts:
+            meter_id = str(forecast.meter_id)
+            if current.get(meter_id) == (forecast.input_through, forecast.input_count, forecast.input_mwh):
+                reusable[meter_id] = forecast
+    return reusable
+
+
+def prune_superseded(forecasts: list[DemandForecast]) -> int:
+    """Delete the other forecasts for the same meters and parameters past their retention."""
+    by_parameters = defaultdict(list)
+    for forecast in forecasts:
+        key = (forecast.method, forecast.days_ahead, forecast.lookback_days, forecast.granularity)
+        by_parameters[key].append(forecast)
+
+    before = timezone.now() - timedelta(days=SUPERSEDED_RETENTION_DAYS)
+    deleted = 0
+    for (method, days_ahead, lookback_days, granularity), group in by_parameters.items():
+        deleted += DemandForecast.objects.filter(
+            meter_id__in=[f.meter_id for f in group],
+            method=method,
+            days_ahead=days_ahead,
+            lookback_days=lookback_days,
+            granularity=granularity,
+            forecast_end__lt=before,
+        ).exclude(pk__in=[f.pk for f in group]).delete()[0]
+    return deleted
@@ -1,27 +1,64 @@
 from rest_framework import serializers
 
-from .models import DemandForecast, ForecastPoint
+from customers.models import Meter
 
+from . import series
+from .models import DemandForecast, RegionForecast, RegionForecastRun
+from .regions import region_window
 
-class ForecastPointSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = ForecastPoint
-        fields = ["timestamp", "predicted_kwh", "lower_bound_kwh", "upper_bound_kwh"]
+
+class ForecastPointSerializer(serializers.Serializer):
+    timestamp = serializers.DateTimeField()
+    predicted_kwh = serializers.DecimalField(max_digits=12, decimal_places=4)
+    lower_bound_kwh = serializers.DecimalField(max_digits=12, decimal_places=4)
+    upper_bound_kwh = serializers.DecimalField(max_digits=12, decimal_places=4)
 
 
 class DemandForecastSerializer(serializers.ModelSerializer):
-    points = ForecastPointSerializer(many=True, read_only=True)
+    """
+    A forecast with its values as columns: one list per series, one entry
+    per step_seconds from forecast_start.
+    """
+
+    series = serializers.SerializerMethodField()
     meter_mpan = serializers.CharField(source="meter.mpan", read_only=True)
 
     class Meta:
         model = DemandForecast
         fields = [
-            "id", "meter", "meter_mpan", "granularity",
-            "forecast_start", "forecast_end", "lookback_days",
-            "total_predicted_kwh", "created_at", "points",
+            "id", "meter", "meter_mpan", "method", "granularity",
+            "forecast_start", "forecast_end", "lookback_days", "days_ahead", "step_seconds",
+            "input_through", "input_count", "total_predicted_kwh", "created_at", "series",
         ]
         read_only_fields = ["id", "created_at"]
 
+    def get_series(self, obj):
+        predicted, lower, upper = obj.series_units()
+        return {
+            "predicted_kwh": (predicted / series.SCALE).tolist(),
+            "lower_bound_kwh": (lower / series.SCALE).tolist(),
+            "upper_bound_kwh": (upper / series.SCALE).tolist(),
+        }
+
+
+class DemandForecastPointsSerializer(serializers.ModelSerializer):
+    """A forecast with one object per point (?layout=points)."""
+
+    points = serializers.SerializerMethodField()
+    meter_mpan = serializers.CharField(source="meter.mpan", read_only=True)
+
+    class Meta:
+        model = DemandForecast
+        fields = [
+            "id", "meter", "meter_mpan", "method", "granularity",
+            "forecast_start", "forecast_end", "lookback_days", "days_ahead",
+            "input_through", "input_count", "total_predicted_kwh", "created_at", "points",
+        ]
+        read_only_fields = ["id", "created_at"]
+
+    def get_points(self, obj):
+        return ForecastPointSerializer(obj.points(), many=True).data
+
 
 class DemandForecastListSerializer(serializers.ModelSerializer):
     meter_mpan = serializers.CharField(source="meter.mpan", read_only=True)
@@ -29,7 +66,7 @@ class DemandForecastListSerializer(serializers.ModelSerializer):
     class Meta:
         model = DemandForecast
         fields = [
-            "id", "meter_mpan", "granularity",
+            "id", "meter_mpan", "method", "granularity",
             "forecast_start", "forecast_end",
             "total_predicted_kwh", "created_at",
         ]
@@ -43,3 +80,64 @@ class GenerateForecastSerializer(serializers.Serializer):
         choices=["half_hourly", "hourly", "daily"],
         default="half_hourly",
     )
+    method = serializers.ChoiceField(
+        choices=[c for c, _ in DemandForecast.METHOD_CHOICES],
+        default="profile",
+        help_text="holt_winters forecasts from the meter's stored smoothing state",
+    )
+    force = serializers.BooleanField(
+        default=False,
+        help_text="Rebuild even if the latest forecast's readings are unchanged",
+    )
+
+
+class ForecastAccuracyQuerySerializer(serializers.Serializer):
+    days = serializers.IntegerField(default=30, min_value=1, max_value=365)
+    method = serializers.ChoiceField(
+        choices=[c for c, _ in DemandForecast.METHOD_CHOICES],
+        required=False,
+    )
+    meter = serializers.UUIDField(required=False)
+
+
+class RegionForecastRunSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = RegionForecastRun
+        fields = [
+            "id", "method", "granularity", "days_ahead", "lookback_days", "forecast_start",
+            "forecast_end", "step_seconds", "meter_count", "region_count", "created_at",
+        ]
+
+
+class RegionForecastSerializer(serializers.ModelSerializer):
+    """A region's forecast as columns, limited to the since/until in the context."""
+
+    series = serializers.SerializerMethodField()
+
+    class Meta:
+        model = RegionForecast
+        fields = ["outward_code", "fuel_type", "meter_count", "total_predicted_kwh", "series"]
+
+    def get_series(self, obj):
+        return region_window(obj, self.context.get("since"), self.context.get("until"))
+
+
+class RegionForecastQuerySerializer(serializers.Serializer):
+    method = serializers.ChoiceField(choices=[c for c, _ in DemandForecast.METHOD_CHOICES], default="profile")
+    granularity = serializers.ChoiceField(
+        choices=[c for c, _ in DemandForecast.GRANULARITY_CHOICES],
+        default="half_hourly",
+    )
+    run = serializers.UUIDField(required=False, help_text="A specific run (default: the latest covering since)")
+    outward_code = serializers.CharField(required=False, max_length=8)
+    fuel_type = serializers.ChoiceField(choices=[c for c, _ in Meter.FUEL_TYPES], required=False)
+    since = serializers.DateTimeField(required=False)
+    until = serializers.DateTimeField(required=False)
+
+    def validate_outward_code(self, value):
+        return value.strip().upper()
+
+    def validate(self, attrs):
+        if "since" in attrs and "until" in attrs and attrs["until"] <= attrs["since"]:
+            raise serializers.ValidationError("until must be after since")
+        return attrs
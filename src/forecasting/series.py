@@ -0,0 +1,46 @@
+"""
+Packed forecast series.
+
+A forecast's predicted, lower and upper vectors are stored on the
+DemandForecast row as little-endian int32 arrays of 0.0001 kWh (the
+4 decimal places the API has always served), one value per step from
+forecast_start. That caps a single step at about 214,748 kWh, so regional
+totals (forecasting.regions) are packed as int64 (REGION_DTYPE) instead.
+
+to_units(kwh)          → int64 array of 0.0001 kWh, rounded as round(x, 4)
+pack(units, dtype)     → bytes for a BinaryField
+unpack(data, dtype)    → int32 (or dtype) array
+units_to_kwh(units)    → Decimal kWh, 4 places
+"""
+
+from decimal import Decimal
+
+import numpy as np
+
+SCALE = 10_000  # units per kWh
+DTYPE = np.dtype("<i4")
+MAX_UNITS = np.iinfo(DTYPE).max
+REGION_DTYPE = np.dtype("<i8")
+
+
+def to_units(kwh: np.ndarray) -> np.ndarray:
+    # round(x, 4) rounds the exact binary value; np.rint(x * SCALE) would
+    # round the product, which differs by a unit on near-ties
+    rounded = np.array([round(x, 4) for x in np.asarray(kwh, dtype=np.float64).tolist()])
+    return np.rint(rounded * SCALE).astype(np.int64)
+
+
+def pack(units: np.ndarray, dtype: np.dtype = DTYPE) -> bytes:
+    units = np.asarray(units)
+    limit = np.iinfo(dtype).max
+    if units.size and (units.min() < 0 or units.max() > limit):
+        raise ValueError(f"Forecast values must be between 0 and {limit / SCALE} kWh per step")
+    return units.astype(dtype).tobytes()
+
+
+def unpack(data, dtype: np.dtype = DTYPE) -> np.ndarray:
+    return np.frombuffer(bytes(data or b""), dtype=dtype)
+
+
+def units_to_kwh(units) -> Decimal:
+    return Decimal(int(units)).scaleb(-4).quantize(Decimal("0.0001"))
@@ -1,26 +1,41 @@
 """
 Demand forecasting engine.
 
-Uses a weighted moving average with day-of-week seasonality
-to predict future energy consumption from historical readings.
+Two methods:
+
+- profile (default): a weighted moving average with day-of-week
+  seasonality over the lookback window's readings, computed on NumPy
+  arrays (see forecasting.profile).
+- holt_winters: projected from the meter's stored Holt-Winters state
+  (see forecasting.smoothing and forecasting.online), with no readings
+  query once the state exists.
+- degree_day: daily totals regressed on heating degree days, shaped by
+  the profile (see forecasting.degree_days); the profile model is used
+  for meters with too little history.
 """
 
 import logging
-from collections import defaultdict
-from datetime import datetime, timedelta
-from decimal import Decimal
+from datetime import datetime, timedelta, timezone as dt_timezone
 
+import numpy as np
 from django.utils import timezone
 
 from customers.models import Meter
 from metering.models import MeterReading
 
-from .models import DemandForecast, ForecastPoint
+from . import series
+from .degree_days import forecast_degree_days
+from .models import DemandForecast
+from .online import bootstrap_states, load_states
+from .profile import DAY_WEIGHTS, STEP_MINUTES, build_profile, epoch_seconds, project  # noqa: F401
+from .readings import reading_arrays
+from .reuse import input_watermark, prune_superseded, reusable_forecasts
+from .smoothing import project_state
 
 logger = logging.getLogger(__name__)
 
-# More recent days get higher weight
-DAY_WEIGHTS = [1.0, 1.0, 1.2, 1.4, 1.6, 1.8, 2.0]  # oldest → newest
+CONFIDENCE_Z = 1.96
+MIN_MARGIN_RATIO = 0.2
 
 
 def generate_forecast(
@@ -28,10 +43,24 @@ def generate_forecast(
     days_ahead: int = 7,
     lookback_days: int = 7,
     granularity: str = "half_hourly",
+    reuse: bool = True,
+    method: str = "profile",
 ) -> DemandForecast:
     """
     Generate a demand forecast for a meter.
 
+    When reuse is set and the meter's latest profile forecast with the
+    same parameters was built from the same readings (see
+    forecasting.reuse), that forecast is returned instead, with .reused
+    set. A new forecast replaces the earlier ones with the same
+    parameters.
+
+    With method="holt_winters" steps 1–3 are replaced by the meter's
+    stored smoothing state, fitted from the lookback window the first
+    time. With method="degree_day" step 4 scales each day to the
+    degree-day regression's total; such forecasts are never reused, as
+    they also depend on the degree-day table.
+
     Algorithm:
     1. Fetch historical readings for the lookback period
     2. Build an average consumption profile per half-hour slot, grouped by day-of-week
@@ -44,127 +73,105 @@ def generate_forecast(
     now = timezone.now().replace(minute=0, second=0, microsecond=0)
     lookback_start = now - timedelta(days=lookback_days)
 
+    if method == "holt_winters":
+        return _generate_holt_winters(meter, now, days_ahead, lookback_days, granularity)
+
+    if reuse and method == "profile":
+        previous = reusable_forecasts([meter.pk], days_ahead, lookback_days, granularity, now).get(str(meter.pk))
+        if previous is not None:
+            previous.reused = True
+            logger.info("Forecast %s for %s reused: no new readings", previous.pk, meter.mpan)
+            return previous
+
     # ── 1. Fetch historical readings ────────────────────────────────────
-    readings = list(
+    timestamps, values = reading_arrays(
         MeterReading.objects.filter(
             meter=meter,
             reading_at__gte=lookback_start,
             reading_at__lt=now,
-        ).order_by("reading_at")
+        )
     )
 
-    if not readings:
+    if not len(timestamps):
         raise ValueError(f"No readings found for meter {meter.mpan} in the last {lookback_days} days")
 
-    # ── 2. Build consumption profile ────────────────────────────────────
-    # Key: (day_of_week, hour, half_hour_slot) → list of (value, weight)
-    profile = defaultdict(list)
-
-    for reading in readings:
-        rt = reading.reading_at
-        dow = rt.weekday()  # 0=Monday
-        slot = (rt.hour, 0 if rt.minute < 30 else 30)
-
-        # Weight based on how recent the day is
-        days_ago = (now.date() - rt.date()).days
-        if 0 <= days_ago < len(DAY_WEIGHTS):
-            weight = DAY_WEIGHTS[-(days_ago + 1)]
-        else:
-            weight = DAY_WEIGHTS[0]
-
-        profile[(dow, slot[0], slot[1])].append(
-            (float(reading.value_kwh), weight)
-        )
-
-    # ── 3. Compute weighted averages ────────────────────────────────────
-    avg_profile = {}
-    for key, entries in profile.items():
-        total_weighted = sum(v * w for v, w in entries)
-        total_weight = sum(w for _, w in entries)
-        avg = total_weighted / total_weight if total_weight > 0 else 0
-        # Standard deviation for confidence
-        variance = sum(w * (v - avg) ** 2 for v, w in entries) / total_weight if total_weight > 0 else 0
-        std_dev = variance ** 0.5
-        avg_profile[key] = (avg, std_dev)
-
-    # ── 4. Project forward ──────────────────────────────────────────────
     forecast_start = now
     forecast_end = now + timedelta(days=days_ahead)
-
-    # Determine step based on granularity
-    if granularity == "daily":
-        step_minutes = 1440
-    elif granularity == "hourly":
-        step_minutes = 60
+    if method == "degree_day":
+        # ── 2–4. Profile-shaped degree-day regression ───────────────────
+        predicted, std_dev, _ = forecast_degree_days(
+            {str(meter.pk): (timestamps, values)}, now, days_ahead, lookback_days, granularity,
+        )[str(meter.pk)]
     else:
-        step_minutes = 30
-
-    points = []
-    total_predicted = Decimal("0")
-    current = forecast_start
-
-    # Fallback: overall average if no matching day-of-week slot
-    all_values = [avg for avg, _ in avg_profile.values()]
-    global_avg = sum(all_values) / len(all_values) if all_values else 0.1
-
-    while current < forecast_end:
-        dow = current.weekday()
-
-        if granularity == "daily":
-            # Sum all slots for this day of week
-            day_total = 0
-            day_std = 0
-            slots_found = 0
-            for h in range(24):
-                for m in (0, 30):
-                    key = (dow, h, m)
-                    if key in avg_profile:
-                        avg, std = avg_profile[key]
-                        day_total += avg
-                        day_std += std
-                        slots_found += 1
-            if slots_found == 0:
-                day_total = global_avg * 48
-                day_std = day_total * 0.2
-            predicted = day_total
-            std_dev = day_std
-        else:
-            slot = (current.hour, 0 if current.minute < 30 else 30)
-            key = (dow, slot[0], slot[1])
-            if key in avg_profile:
-                predicted, std_dev = avg_profile[key]
-            else:
-                predicted = global_avg
-                std_dev = global_avg * 0.2
-
-        predicted_dec = Decimal(str(round(max(predicted, 0), 4)))
-        margin = Decimal(str(round(max(std_dev * 1.96, predicted * 0.2), 4)))  # 95% CI or 20%
-
-        points.append(ForecastPoint(
-            timestamp=current,
-            predicted_kwh=predicted_dec,
-            lower_bound_kwh=max(predicted_dec - margin, Decimal("0")),
-            upper_bound_kwh=predicted_dec + margin,
-        ))
-        total_predicted += predicted_dec
-        current += timedelta(minutes=step_minutes)
+        # ── 2–3. Weighted consumption profile ───────────────────────────
+        profile = build_profile(timestamps, values, now)
+
+        # ── 4. Project forward ──────────────────────────────────────────
+        _, predicted, std_dev = project(profile, forecast_start, days_ahead, granularity)
 
     # ── 5. Save ─────────────────────────────────────────────────────────
-    forecast = DemandForecast.objects.create(
+    forecast = DemandForecast(
         meter=meter,
+        method=method,
         granularity=granularity,
         forecast_start=forecast_start,
         forecast_end=forecast_end,
         lookback_days=lookback_days,
-        total_predicted_kwh=total_predicted,
+        days_ahead=days_ahead,
+        step_seconds=STEP_MINUTES[granularity] * 60,
+        **input_watermark(timestamps, values),
     )
-
-    for pt in points:
-        pt.forecast = forecast
-    ForecastPoint.objects.bulk_create(points)
+    forecast.set_series(*forecast_series(predicted, std_dev))
+    forecast.save()
+    forecast.reused = False
+    prune_superseded([forecast])
 
     logger.info(
         "Forecast %s for %s: %d points, %.2f kWh total",
-        forecast.pk, meter.mpan, len(points), total_predicted,
+        forecast.pk, meter.mpan, forecast.point_count, forecast.total_predicted_kwh,
     )
     return forecast
+
+
+def _generate_holt_winters(meter, now, days_ahead: int, lookback_days: int, granularity: str) -> DemandForecast:
+    # ── 1. Stored state (fitted from the lookback window the first time) ─
+    state = load_states([meter.pk]).get(str(meter.pk))
+    if state is None:
+        state = bootstrap_states([meter.pk], now - timedelta(days=lookback_days), now).get(str(meter.pk))
+    if state is None:
+        raise ValueError(f"No readings found for meter {meter.mpan} in the last {lookback_days} days")
+
+    # ── 2. Project forward and save ─────────────────────────────────────
+    predicted, std_dev = project_state(state, now, days_ahead, granularity)
+    forecast = DemandForecast(
+        meter=meter,
+        method="holt_winters",
+        granularity=granularity,
+        forecast_start=now,
+        forecast_end=now + timedelta(days=days_ahead),
+        lookback_days=lookback_days,
+        days_ahead=days_ahead,
+        step_seconds=STEP_MINUTES[granularity] * 60,
+        input_through=datetime.fromtimestamp(state.last_ts, tz=dt_timezone.utc),
+        input_count=state.observations,
+    )
+    forecast.set_series(*forecast_series(predicted, std_dev))
+    forecast.save()
+    forecast.reused = False
+    prune_superseded([forecast])
+
+    logger.info(
+        "Holt-Winters forecast %s for %s: %d points, %.2f kWh total",
+        forecast.pk, meter.mpan, forecast.point_count, forecast.total_predicted_kwh,
+    )
+    return forecast
+
+
+def forecast_series(predicted: np.ndarray, std_dev: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    (predicted, lower, upper) in 0.0001 kWh units, with a 95% interval
+    (or ±20%, whichever is wider) clipped at zero.
+    """
+    margins = series.to_units(np.maximum(std_dev * CONFIDENCE_Z, predicted * MIN_MARGIN_RATIO))
+    predicted = series.to_units(np.maximum(predicted, 0))
+    return predicted, np.maximum(predicted - margins, 0), predicted + margins
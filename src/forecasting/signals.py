@@ -0,0 +1,21 @@
+"""
+Signal handlers for forecasting.
+"""
+
+from django.dispatch import receiver
+
+from metering.signals import readings_ingested
+
+
+@receiver(readings_ingested)
+def advance_forecast_states(sender, readings, replaced=(), **kwargs):
+    from .online import apply_readings
+
+    apply_readings(readings)
+
+
+@receiver(readings_ingested)
+def record_forecast_accuracy(sender, readings, replaced=(), **kwargs):
+    from .accuracy import record_accuracy
+
+    record_accuracy(readings, replaced)
@@ -0,0 +1,140 @@
+"""
+Holt-Winters exponential smoothing over half-hourly readings.
+
+fit(timestamps, values)                       → SmoothingState from history
+update(state, timestamp, value)               → state advanced by one
+                                                reading, in O(1)
+project_state(state, start, days_ahead, granularity)
+                                              → (predicted, std_dev)
+
+Additive damped-trend Holt-Winters with one weekly season of 336
+half-hour slots (UTC weekday × half-hour, as forecasting.profile), which
+carries the daily shape and its weekday/weekend variation together.
+Missing half-hours are treated as unobserved: the level and trend are
+carried forward over the gap in closed form, so an update stays O(1)
+however long the gap.
+
+The one-step error variance is tracked as an exponentially weighted
+mean; the h-step standard deviation widens as sqrt(1 + (h - 1) α²).
+
+Readings are passed as int64 epoch seconds and float64 kWh, like
+forecasting.profile. Nothing here touches the database.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+
+import numpy as np
+
+from .profile import (
+    DAYS_PER_WEEK,
+    EPOCH_WEEKDAY,
+    PROFILE_SLOTS,
+    SECONDS_PER_DAY,
+    SECONDS_PER_SLOT,
+    SLOTS_PER_DAY,
+    STEP_MINUTES,
+    epoch_seconds,
+)
+
+ALPHA = 0.1      # level
+BETA = 0.01      # trend
+GAMMA = 0.2      # seasonal
+PHI = 0.98       # trend damping per half-hour
+ERROR_DECAY = 0.02  # weight of the latest squared error in the variance
+
+
+@dataclass
+class SmoothingState:
+    level: float
+    trend: float
+    seasonal: np.ndarray  # 336 additive seasonal terms, kWh
+    variance: float       # one-step squared error, kWh²
+    last_ts: int          # epoch seconds of the last reading applied
+    observations: int
+
+
+def season_slot(ts):
+    """Position of epoch-second timestamps in the weekly season."""
+    days = ts // SECONDS_PER_DAY
+    return (days + EPOCH_WEEKDAY) % DAYS_PER_WEEK * SLOTS_PER_DAY + (ts % SECONDS_PER_DAY) // SECONDS_PER_SLOT
+
+
+def _damped_sum(steps):
+    """φ + φ² + … + φ^steps."""
+    return PHI * (1 - PHI ** steps) / (1 - PHI)
+
+
+def fit(timestamps: np.ndarray, values: np.ndarray) -> SmoothingState:
+    """
+    Initial state from history (oldest first): the weekly slot means
+    seed the season and the level, then every reading is applied.
+    """
+    ts = np.asarray(timestamps, dtype=np.int64)
+    values = np.asarray(values, dtype=np.float64)
+    slot = season_slot(ts)
+
+    count = np.bincount(slot, minlength=PROFILE_SLOTS)
+    sums = np.bincount(slot, weights=values, minlength=PROFILE_SLOTS)
+    mean = float(values.mean())
+    seasonal = np.zeros(PROFILE_SLOTS)
+    np.divide(sums, count, out=seasonal, where=count > 0)
+    seasonal = np.where(count > 0, seasonal - mean, 0.0)
+
+    state = SmoothingState(
+        level=mean,
+        trend=0.0,
+        seasonal=seasonal,
+        variance=float(values.var()),
+        last_ts=int(ts[0]) - SECONDS_PER_SLOT,
+        observations=0,
+    )
+    for when, value in zip(ts.tolist(), values.tolist()):
+        update(state, when, value)
+    return state
+
+
+def update(state: SmoothingState, timestamp: int, value: float) -> bool:
+    """Apply one reading; readings at or before the last one are ignored."""
+    steps = (timestamp - state.last_ts) // SECONDS_PER_SLOT
+    if steps < 1:
+        return False
+
+    # Carry level and trend over any missing half-hours
+    level = state.level + _damped_sum(steps) * state.trend
+    trend = state.trend * PHI ** steps
+    slot = int(season_slot(timestamp))
+    error = value - (level + state.seasonal[slot])
+
+    # Error-correction form of the additive Holt-Winters recursions
+    state.level = level + ALPHA * error
+    state.trend = trend + ALPHA * BETA * error
+    state.seasonal[slot] += GAMMA * (1 - ALPHA) * error
+    state.variance += ERROR_DECAY * (error * error - state.variance)
+    state.last_ts = timestamp
+    state.observations += 1
+    return True
+
+
+def project_state(
+    state: SmoothingState,
+    start: datetime,
+    days_ahead: int,
+    granularity: str = "half_hourly",
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Predicted kWh and std dev per step from start for days_ahead days.
+    Hourly and daily steps sum their half-hours; their variances add.
+    """
+    step = STEP_MINUTES.get(granularity, 30) * 60
+    per_step = step // SECONDS_PER_SLOT
+    n_steps = -(-days_ahead * SECONDS_PER_DAY // step)
+    ts = epoch_seconds(start) + np.arange(n_steps * per_step, dtype=np.int64) * SECONDS_PER_SLOT
+
+    h = np.maximum((ts - state.last_ts) // SECONDS_PER_SLOT, 1)
+    predicted = state.level + _damped_sum(h) * state.trend + state.seasonal[season_slot(ts)]
+    variance = state.variance * (1 + (h - 1) * ALPHA ** 2)
+
+    predicted = predicted.reshape(n_steps, per_step).sum(axis=1)
+    std_dev = np.sqrt(variance.reshape(n_steps, per_step).sum(axis=1))
+    return predicted, std_dev
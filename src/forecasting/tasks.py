@@ -15,6 +15,7 @@ def generate_forecast_task(
     days_ahead: int = 7,
     lookback_days: int = 7,
     granularity: str = "half_hourly",
+    method: str = "profile",
 ):
     """Generate a forecast for a single meter."""
     from forecasting.services import generate_forecast
@@ -24,8 +25,38 @@ def generate_forecast_task(
         days_ahead=days_ahead,
         lookback_days=lookback_days,
         granularity=granularity,
+        method=method,
     )
-    return {"forecast_id": str(forecast.pk), "points": forecast.points.count()}
+    return {"forecast_id": str(forecast.pk), "points": forecast.point_count, "reused": forecast.reused}
+
+
+@shared_task
+def generate_forecasts_batch_task(
+    meter_ids: list[str],
+    days_ahead: int = 7,
+    lookback_days: int = 7,
+    granularity: str = "half_hourly",
+    method: str = "profile",
+):
+    """Generate forecasts for a block of meters from one readings scan."""
+    from forecasting.batch import generate_forecasts_batch
+
+    result = generate_forecasts_batch(
+        meter_ids,
+        days_ahead=days_ahead,
+        lookback_days=lookback_days,
+        granularity=granularity,
+        method=method,
+    )
+    return {
+        "forecasts": len(result.forecasts),
+        "reused": len(result.reused),
+        "pruned": result.pruned,
+        "profile_fallbacks": result.profile_fallbacks,
+        "failures": result.failures,
+        "seconds": round(result.seconds, 2),
+        "meters_per_second": round(result.meters_per_second, 1),
+    }
 
 
 @shared_task
@@ -33,17 +64,46 @@ def generate_all_forecasts_task(
     days_ahead: int = 7,
     lookback_days: int = 7,
     granularity: str = "half_hourly",
+    method: str = "profile",
 ):
-    """Generate forecasts for all smart meters."""
+    """Generate forecasts for all smart meters, one batch task per block."""
     from customers.models import Meter
+    from forecasting.batch import BATCH_METHODS, FORECAST_BLOCK_SIZE
+
+    if method not in BATCH_METHODS:
+        raise ValueError(f"Batch forecasting does not support method {method!r}")
 
-    meters = Meter.objects.filter(is_smart=True)
-    dispatched = 0
-    for meter in meters:
-        generate_forecast_task.delay(
-            str(meter.pk), days_ahead, lookback_days, granularity,
+    meter_ids = [str(pk) for pk in Meter.objects.filter(is_smart=True).order_by("pk").values_list("pk", flat=True)]
+    blocks = 0
+    for offset in range(0, len(meter_ids), FORECAST_BLOCK_SIZE):
+        generate_forecasts_batch_task.delay(
+            meter_ids[offset:offset + FORECAST_BLOCK_SIZE], days_ahead, lookback_days, granularity, method,
         )
-        dispatched += 1
+        blocks += 1
 
-    logger.info("Dispatched %d forecast tasks", dispatched)
-    return {"dispatched": dispatched}
+    logger.info("Dispatched %d forecast blocks for %d meters", blocks, len(meter_ids))
+    return {"meters": len(meter_ids), "blocks": blocks}
+
+
+@shared_task
+def generate_region_forecasts_task(
+    days_ahead: int = 7,
+    lookback_days: int = 7,
+    granularity: str = "half_hourly",
+    method: str = "profile",
+):
+    """Materialise a regional forecast run from the meters' latest forecasts and prune old runs."""
+    from forecasting.regions import build_region_forecasts, prune_region_runs
+
+    run = build_region_forecasts(
+        method=method,
+        granularity=granularity,
+        days_ahead=days_ahead,
+        lookback_days=lookback_days,
+    )
+    return {
+        "run_id": str(run.pk),
+        "meters": run.meter_count,
+        "regions": run.region_count,
+        "pruned_runs": prune_region_runs(),
+    }
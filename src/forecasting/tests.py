@@ -0,0 +1,168 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from customers.models import Customer, Meter, Property
+from metering.ingestion import save_readings
+from metering.models import MeterReading
+
+from . import series
+from .management.commands.benchmark_forecast import legacy_forecast
+from .models import DemandForecast, ForecastAccuracy
+from .services import generate_forecast
+from .tasks import generate_all_forecasts_task, generate_forecasts_batch_task
+
+LOCMEM_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+# Monday 30 March 2026 09:00 UTC: the lookback spans the clocks going forward on the 29th
+NOW = datetime(2026, 3, 30, 9, tzinfo=dt_timezone.utc)
+
+
+def make_meter():
+    customer = Customer.objects.create(
+        account_number="GG-TEST-1", first_name="Test", last_name="Customer", email="test1@example.com",
+    )
+    prop = Property.objects.create(
+        customer=customer, address_line_1="1 Test Street", city="London", postcode="SW1A 1AA",
+    )
+    return Meter.objects.create(
+        property=prop, mpan="19000000001", serial_number="S1", fuel_type="electricity", is_smart=True,
+    )
+
+
+def fixed_readings(meter, days: int):
+    """
+    Half-hourly readings for the days before NOW: busier evenings and
+    weekends, a constant 03:00 slot (so its interval is the 20% minimum),
+    a missed afternoon and one missing slot.
+    """
+    readings = []
+    at = NOW - timedelta(days=days)
+    i = 0
+    while at < NOW:
+        i += 1
+        if at.date() == (NOW - timedelta(days=3)).date() and 12 <= at.hour < 17:
+            at += timedelta(minutes=30)
+            continue  # the missed afternoon
+        if (at.weekday(), at.hour, at.minute) == (2, 10, 30):
+            at += timedelta(minutes=30)
+            continue  # never read on Wednesdays at 10:30: that step falls back to the global average
+        if at.hour == 3 and at.minute == 0:
+            value = Decimal("0.2500")
+        else:
+            base = 3000 + 5000 * (17 <= at.hour < 21) + 2000 * (at.weekday() >= 5)
+            value = Decimal(base + i * 7919 % 4001).scaleb(-4)
+        readings.append(MeterReading(meter=meter, reading_at=at, value_kwh=value))
+        at += timedelta(minutes=30)
+    return MeterReading.objects.bulk_create(readings)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class VectorisedForecastTests(TestCase):
+    """generate_forecast gives exactly the points of the original per-reading algorithm."""
+
+    def assertMatchesLegacy(self, lookback_days, granularity, days_ahead=7):
+        meter = make_meter()
+        readings = fixed_readings(meter, lookback_days)
+        with mock.patch("django.utils.timezone.now", return_value=NOW + timedelta(minutes=20)):
+            forecast = generate_forecast(
+                meter.pk, days_ahead=days_ahead, lookback_days=lookback_days, granularity=granularity, reuse=False,
+            )
+
+        expected = legacy_forecast(
+            [(r.reading_at, r.value_kwh) for r in readings], NOW, days_ahead, granularity,
+        )
+        actual = [
+            (when, *(series.units_to_kwh(u) for u in units))
+            for when, *units in zip(forecast.timestamps(), *(s.tolist() for s in forecast.series_units()))
+        ]
+        self.assertEqual(actual, expected)
+        return expected
+
+    def test_half_hourly(self):
+        points = self.assertMatchesLegacy(7, "half_hourly")
+        # The constant slot's interval is the 20% minimum margin
+        predicted, lower, upper = next(p[1:] for p in points if p[0].hour == 3 and p[0].minute == 0)
+        self.assertEqual((predicted, upper - predicted), (Decimal("0.2500"), Decimal("0.0500")))
+
+    def test_hourly_over_two_weeks(self):
+        self.assertMatchesLegacy(14, "hourly")
+
+    def test_daily(self):
+        self.assertMatchesLegacy(14, "daily", days_ahead=10)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class FleetForecastTaskTests(TestCase):
+    def setUp(self):
+        self.meter = make_meter()
+        fixed_readings(self.meter, 14)
+        now = mock.patch("django.utils.timezone.now", return_value=NOW + timedelta(minutes=20))
+        now.start()
+        self.addCleanup(now.stop)
+
+    def run_fleet(self, method):
+        with mock.patch.object(generate_forecasts_batch_task, "delay") as delay:
+            dispatched = generate_all_forecasts_task(lookback_days=14, method=method)
+        self.assertEqual(dispatched, {"meters": 1, "blocks": 1})
+        return [generate_forecasts_batch_task(*call.args) for call in delay.call_args_list]
+
+    def test_every_method_forecasts_the_fleet(self):
+        for method, _ in DemandForecast.METHOD_CHOICES:
+            with self.subTest(method=method):
+                (result,) = self.run_fleet(method)
+                self.assertEqual((result["forecasts"], result["failures"]), (1, {}))
+                self.assertTrue(DemandForecast.objects.filter(meter=self.meter, method=method).exists())
+
+    def test_holt_winters_batch_matches_generate_forecast(self):
+        self.run_fleet("holt_winters")
+        batch = DemandForecast.objects.get(meter=self.meter, method="holt_winters")
+        single = generate_forecast(self.meter.pk, lookback_days=14, method="holt_winters")
+        self.assertEqual(
+            [bytes(s) for s in (batch.predicted_series, batch.lower_series, batch.upper_series)],
+            [bytes(s) for s in (single.predicted_series, single.lower_series, single.upper_series)],
+        )
+        self.assertEqual((batch.input_through, batch.input_count), (single.input_through, single.input_count))
+
+    def test_unknown_method_is_rejected_before_dispatch(self):
+        with mock.patch.object(generate_forecasts_batch_task, "delay") as delay:
+            with self.assertRaises(ValueError):
+                generate_all_forecasts_task(method="arima")
+        delay.assert_not_called()
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ForecastAccuracyTests(TestCase):
+    def setUp(self):
+        self.meter = make_meter()
+        fixed_readings(self.meter, 14)
+
+    def at(self, minutes):
+        return mock.patch("django.utils.timezone.now", return_value=NOW + timedelta(minutes=minutes))
+
+    def ingest(self, minutes, value_kwh):
+        with self.at(minutes):
+            save_readings([MeterReading(meter=self.meter, reading_at=NOW + timedelta(minutes=30), value_kwh=value_kwh)])
+
+    def forecast(self, minutes, lookback_days):
+        with self.at(minutes):
+            forecast = generate_forecast(self.meter.pk, lookback_days=lookback_days, reuse=False)
+        predicted = dict(zip(forecast.timestamps(), forecast.series_units()[0].tolist()))
+        return series.units_to_kwh(predicted[NOW + timedelta(minutes=30)])
+
+    def test_correction_backs_out_against_the_forecast_it_was_scored_with(self):
+        scored_with = self.forecast(20, lookback_days=7)
+        self.ingest(40, Decimal("1.0000"))
+        # Starts at 09:00, so it covers the 09:30 reading ingested before it was built
+        newer = self.forecast(50, lookback_days=14)
+        self.assertNotEqual(newer, scored_with)
+        self.ingest(70, Decimal("2.0000"))
+
+        # The 1.0 is taken out against the forecast it was scored with; the
+        # correction is scored against the newest forecast when it arrived
+        row = ForecastAccuracy.objects.get(meter=self.meter, method="profile")
+        self.assertEqual(row.points, 1)
+        self.assertAlmostEqual(row.actual_kwh, 2.0)
+        self.assertAlmostEqual(row.abs_error_kwh, abs(2 - float(newer)))
+        self.assertAlmostEqual(row.squared_error, (2 - float(newer)) ** 2)
@@ -1,12 +1,14 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import DemandForecastViewSet, GenerateForecastView
+from .views import DemandForecastViewSet, ForecastAccuracyView, GenerateForecastView, RegionForecastView
 
 router = DefaultRouter()
 router.register("", DemandForecastViewSet, basename="forecast")
 
 urlpatterns = [
+    path("accuracy/", ForecastAccuracyView.as_view(), name="forecast-accuracy"),
+    path("regions/", RegionForecastView.as_view(), name="region-forecasts"),
     path("generate/", GenerateForecastView.as_view(), name="generate-forecast"),
     path("", include(router.urls)),
 ]
@@ -1,23 +1,44 @@
+from datetime import timedelta
+
+from django.utils import timezone
 from rest_framework import status, viewsets
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from .models import DemandForecast
+from .accuracy import summed
+from .models import DemandForecast, ForecastAccuracy, RegionForecastRun
+from .regions import latest_run
 from .serializers import (
     DemandForecastListSerializer,
+    DemandForecastPointsSerializer,
     DemandForecastSerializer,
+    ForecastAccuracyQuerySerializer,
     GenerateForecastSerializer,
+    RegionForecastQuerySerializer,
+    RegionForecastRunSerializer,
+    RegionForecastSerializer,
 )
 from .services import generate_forecast
 
+SERIES_FIELDS = ("predicted_series", "lower_series", "upper_series")
+
+
+def detail_serializer_class(request):
+    """Columnar by default; one object per point with ?layout=points."""
+    if request.query_params.get("layout") == "points":
+        return DemandForecastPointsSerializer
+    return DemandForecastSerializer
+
 
 class DemandForecastViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
         user = self.request.user
-        qs = DemandForecast.objects.select_related("meter").prefetch_related("points").all()
+        qs = DemandForecast.objects.select_related("meter").all()
+        if self.action == "list":
+            qs = qs.defer(*SERIES_FIELDS)
         if user.is_staff:
             return qs
         return qs.filter(meter__property__customer__user=user)
@@ -25,7 +46,7 @@ class DemandForecastViewSet(viewsets.ReadOnlyModelViewSet):
     def get_serializer_class(self):
         if self.action == "list":
             return DemandForecastListSerializer
-        return DemandForecastSerializer
+        return detail_serializer_class(self.request)
 
 
 class GenerateForecastView(APIView):
@@ -41,6 +62,8 @@ class GenerateForecastView(APIView):
                 days_ahead=serializer.validated_data["days_ahead"],
                 lookback_days=serializer.validated_data["lookback_days"],
                 granularity=serializer.validated_data["granularity"],
+                reuse=not serializer.validated_data["force"],
+                method=serializer.validated_data["method"],
             )
         except Exception as exc:
             return Response(
@@ -49,6 +72,76 @@ class GenerateForecastView(APIView):
             )
 
         return Response(
-            DemandForecastSerializer(forecast).data,
-            status=status.HTTP_201_CREATED,
+            detail_serializer_class(request)(forecast).data,
+            status=status.HTTP_200_OK if forecast.reused else status.HTTP_201_CREATED,
         )
+
+
+class ForecastAccuracyView(APIView):
+    """
+    Forecast accuracy over the last ?days=30 days of actuals, per method
+    and per day, from the daily sums kept up to date at ingestion.
+
+    Staff see the fleet (or one ?meter=<id>); customers see their own
+    meters. Filter by ?method=.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        query = ForecastAccuracyQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+
+        until = timezone.now().date()
+        since = until - timedelta(days=params["days"] - 1)
+        rows = ForecastAccuracy.objects.filter(date__gte=since, date__lte=until)
+        if not request.user.is_staff:
+            rows = rows.filter(meter__property__customer__user=request.user)
+        if "meter" in params:
+            rows = rows.filter(meter_id=params["meter"])
+        if "method" in params:
+            rows = rows.filter(method=params["method"])
+
+        return Response({
+            "since": since,
+            "until": until,
+            "methods": summed(rows, "method"),
+            "daily": summed(rows, "date", "method"),
+        })
+
+
+class RegionForecastView(APIView):
+    """
+    Summed demand forecasts per postcode outward code and fuel type, from
+    the latest materialised run covering ?since= (default: now), or ?run=.
+
+    Filter by ?outward_code=, ?fuel_type=, and limit the steps returned
+    with ?since= and ?until=. Staff only.
+    """
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        query = RegionForecastQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+
+        if "run" in params:
+            run = RegionForecastRun.objects.filter(pk=params["run"]).first()
+        else:
+            run = latest_run(params["method"], params["granularity"], params.get("since"))
+        if run is None:
+            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        regions = run.regions.all()
+        if "outward_code" in params:
+            regions = regions.filter(outward_code=params["outward_code"])
+        if "fuel_type" in params:
+            regions = regions.filter(fuel_type=params["fuel_type"])
+
+        context = {"since": params.get("since"), "until": params.get("until")}
+        return Response({
+            "run": RegionForecastRunSerializer(run).data,
+            "regions": RegionForecastSerializer(regions, many=True, context=context).data,
+        })
@@ -0,0 +1,61 @@
+"""
+Shared write path for meter reading ingestion.
+
+Every ingestion path saves readings through save_readings() so that
+downstream consumers (accruals, re-billing, forecasting, anomalies) hear
+about new data via the readings_ingested signal.
+
+A reading for a meter and timestamp that is already stored is a
+correction (e.g. an estimate replaced by an actual): the stored reading is
+deleted and passed to receivers as `replaced`. Within one call the last
+reading given for a meter and timestamp wins, so receivers never see the
+same usage twice.
+"""
+
+import logging
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Q
+
+from .models import MeterReading
+from .signals import readings_ingested
+
+logger = logging.getLogger(__name__)
+
+
+def save_readings(readings: list[MeterReading], batch_size: int = 1000) -> int:
+    """Bulk-create readings in batches and announce each batch. Returns the count saved."""
+    readings = list({(r.meter_id, r.reading_at): r for r in readings}.values())
+    created = 0
+    for start in range(0, len(readings), batch_size):
+        batch = readings[start : start + batch_size]
+        with transaction.atomic():
+            replaced = _superseded_readings(batch)
+            if replaced:
+                MeterReading.objects.filter(pk__in=[r.pk for r in replaced]).delete()
+            MeterReading.objects.bulk_create(batch)
+        created += len(batch)
+
+        for receiver, response in readings_ingested.send_robust(
+            sender=MeterReading, readings=batch, replaced=replaced,
+        ):
+            if isinstance(response, Exception):
+                logger.error(
+                    "readings_ingested receiver %s failed: %s", receiver.__qualname__, response,
+                    exc_info=(type(response), response, response.__traceback__),
+                )
+    return created
+
+
+def _superseded_readings(batch: list[MeterReading]) -> list[MeterReading]:
+    """Stored readings at the same (meter, reading_at) as a reading in the batch."""
+    times = defaultdict(set)
+    for r in batch:
+        times[r.meter_id].add(r.reading_at)
+    if not times:
+        return []
+    exact = Q()
+    for meter_id, meter_times in times.items():
+        exact |= Q(meter_id=meter_id, reading_at__in=meter_times)
+    return list(MeterReading.objects.filter(exact).order_by())
@@ -13,6 +13,7 @@ from django.core.management.base import BaseCommand, CommandError
 from django.utils.dateparse import parse_datetime
 
 from customers.models import Meter
+from metering.ingestion import save_readings
 from metering.models import MeterReading
 
 
@@ -89,11 +90,7 @@ class Command(BaseCommand):
             )
 
         # Bulk create
-        created = 0
-        for start in range(0, len(to_create), batch_size):
-            batch = to_create[start : start + batch_size]
-            MeterReading.objects.bulk_create(batch, ignore_conflicts=True)
-            created += len(batch)
+        created = save_readings(to_create, batch_size=batch_size)
 
         self.stdout.write(
             self.style.SUCCESS(f"Done: {created} readings imported, {errors} errors")
@@ -0,0 +1,13 @@
+"""
+Signals sent by the metering app.
+
+readings_ingested
+    Sent after a batch of MeterReadings has been written by an ingestion
+    path (CSV upload, import command). Receivers get ``readings``: the list
+    of MeterReading instances just created, and ``replaced``: the stored
+    readings they superseded (already deleted).
+"""
+
+from django.dispatch import Signal
+
+readings_ingested = Signal()
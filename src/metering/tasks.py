@@ -23,6 +23,7 @@ def process_readings_upload(self, file_id):
     Expected CSV columns: mpan, reading_at, value_kwh, reading_type
     """
     from customers.models import Meter
+    from metering.ingestion import save_readings
     from metering.models import MeterReading, UploadedFile
 
     try:
@@ -98,12 +99,7 @@ def process_readings_upload(self, file_id):
         )
 
     # Bulk create in batches
-    batch_size = 1000
-    created_count = 0
-    for start in range(0, len(readings_to_create), batch_size):
-        batch = readings_to_create[start : start + batch_size]
-        MeterReading.objects.bulk_create(batch, ignore_conflicts=True)
-        created_count += len(batch)
+    created_count = save_readings(readings_to_create, batch_size=1000)
 
     # Finalise
     upload.rows_total = rows_total
@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.test import TestCase, override_settings
+
+from customers.models import Customer, Meter, Property
+
+from .ingestion import save_readings
+from .models import MeterReading
+from .signals import readings_ingested
+
+LOCMEM_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+START = datetime(2025, 1, 10, tzinfo=dt_timezone.utc)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class SaveReadingsTests(TestCase):
+    def setUp(self):
+        customer = Customer.objects.create(
+            account_number="GG-TEST-1", first_name="Test", last_name="Customer", email="test1@example.com",
+        )
+        prop = Property.objects.create(
+            customer=customer, address_line_1="1 Test Street", city="London", postcode="SW1A 1AA",
+        )
+        self.meter = Meter.objects.create(
+            property=prop, mpan="19000000001", serial_number="S1", fuel_type="electricity",
+        )
+
+        self.batches = []
+        readings_ingested.connect(self.receive, sender=MeterReading)
+        self.addCleanup(readings_ingested.disconnect, self.receive, sender=MeterReading)
+
+    def receive(self, sender, readings, replaced, **kwargs):
+        self.batches.append((list(readings), list(replaced)))
+
+    def reading(self, half_hours, value_kwh):
+        at = START + timedelta(minutes=30 * half_hours)
+        return MeterReading(meter=self.meter, reading_at=at, value_kwh=Decimal(value_kwh))
+
+    def test_last_of_duplicates_in_a_batch_wins(self):
+        saved = save_readings([self.reading(0, "1.0000"), self.reading(1, "2.0000"), self.reading(0, "3.0000")])
+
+        self.assertEqual(saved, 2)
+        stored = dict(MeterReading.objects.values_list("reading_at", "value_kwh"))
+        self.assertEqual(stored, {START: Decimal("3.0000"), START + timedelta(minutes=30): Decimal("2.0000")})
+        (readings, replaced), = self.batches
+        self.assertEqual(sorted(r.value_kwh for r in readings), [Decimal("2.0000"), Decimal("3.0000")])
+        self.assertEqual(replaced, [])
+
+    def test_corrections_replace_only_the_readings_they_match(self):
+        save_readings([self.reading(i, "1.0000") for i in range(4)])
+        save_readings([self.reading(0, "5.0000"), self.reading(3, "6.0000")])
+
+        readings, replaced = self.batches[-1]
+        self.assertEqual(sorted(r.reading_at for r in replaced), [START, START + timedelta(minutes=90)])
+        self.assertEqual(MeterReading.objects.count(), 4)
+        self.assertEqual(
+            sorted(MeterReading.objects.values_list("value_kwh", flat=True)),
+            [Decimal("1.0000"), Decimal("1.0000"), Decimal("5.0000"), Decimal("6.0000")],
+        )
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Recommendation
+from .models import Recommendation, TariffComparison
 
 
 @admin.register(Recommendation)
@@ -11,3 +11,16 @@ class RecommendationAdmin(admin.ModelAdmin):
     )
     list_filter = ("category", "priority", "is_dismissed")
     search_fields = ("title", "customer__account_number")
+
+
+@admin.register(TariffComparison)
+class TariffComparisonAdmin(admin.ModelAdmin):
+    list_display = (
+        "customer", "current_tariff", "best_tariff", "annual_kwh",
+        "current_annual_cost_pence", "best_annual_cost_pence",
+        "annual_saving_pence", "computed_at",
+    )
+    list_filter = ("current_tariff", "best_tariff")
+    search_fields = ("customer__account_number",)
+    list_select_related = ("customer", "current_tariff", "best_tariff")
+    readonly_fields = [f.name for f in TariffComparison._meta.fields]
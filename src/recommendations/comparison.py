@@ -0,0 +1,233 @@
+"""
+Tariff comparison across the customer book.
+
+refresh_tariff_comparisons(customer_ids=None)
+  → prices every customer's annualised usage on every active tariff of
+    their fuel and stores the cheapest alternative per customer.
+compare_tariffs(customer_ids, until)
+  → the same comparison for one chunk, without saving it.
+
+Each customer's usage is reduced to a 48-slot half-hourly profile (kWh per
+UTC half hour over the lookback window, scaled to a year), and each tariff
+to a 48-slot unit-rate vector plus a standing charge. The annual cost of
+every customer on every tariff is then a single matrix product per chunk:
+
+    cost (customers × tariffs) = profiles (customers × 48) @ rates (48 × tariffs)
+                                 + 365 × standing (tariffs)
+
+Readings are half-hourly and start on the half hour, so a slot's rate is
+exactly the band billing would match the reading to. Flat tariffs price
+every slot at their first band, as billing does.
+"""
+
+import logging
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import numpy as np
+from django.db.models import Max, Min, Sum
+from django.db.models.functions import ExtractHour, ExtractMinute
+from django.utils import timezone
+
+from billing.fixedpoint import MWH_PER_KWH, reading_mwh
+from customers.models import Customer
+from metering.models import MeterReading
+from tariffs.assignments import resolve_assignments
+from tariffs.lookup import SLOTS_PER_DAY, get_compiled_tariffs
+from tariffs.models import Tariff
+
+from .models import TariffComparison
+
+logger = logging.getLogger(__name__)
+
+LOOKBACK_DAYS = 365
+DAYS_PER_YEAR = 365
+COMPARISON_CHUNK_SIZE = 1000
+
+
+@dataclass
+class TariffMatrix:
+    """Active tariffs of one fuel as price vectors, one column per tariff."""
+
+    tariffs: list            # CompiledTariff, in column order
+    rates: np.ndarray        # 48 × T, pence per kWh
+    standing: np.ndarray     # T, pence per year
+
+    @property
+    def columns(self) -> dict:
+        return {t.tariff_id: i for i, t in enumerate(self.tariffs)}
+
+
+def _price_vector(compiled) -> np.ndarray:
+    """Unit rate per half-hour slot, as billing would charge it."""
+    if compiled.is_time_of_use:
+        return compiled.half_hour_rates()
+    rate = float(compiled.bands[0].rate_pence_per_kwh) if compiled.bands else 0.0
+    return np.full(SLOTS_PER_DAY, rate)
+
+
+def tariff_matrices() -> dict:
+    """{fuel_type: TariffMatrix} for every active tariff with rate bands."""
+    compiled = get_compiled_tariffs(list(Tariff.objects.filter(is_active=True).order_by("code")))
+    by_fuel = defaultdict(list)
+    for tariff in sorted(compiled.values(), key=lambda t: t.code):
+        if tariff.bands:
+            by_fuel[tariff.fuel_type].append(tariff)
+
+    return {
+        fuel: TariffMatrix(
+            tariffs=tariffs,
+            rates=np.column_stack([_price_vector(t) for t in tariffs]),
+            standing=np.array([float(t.standing_charge_pence) * DAYS_PER_YEAR for t in tariffs]),
+        )
+        for fuel, tariffs in by_fuel.items()
+    }
+
+
+def usage_profiles(customer_ids, since: datetime, until: datetime) -> tuple[dict, dict]:
+    """
+    Half-hourly kWh profiles for many customers in one grouped query.
+
+    Returns ({customer_id: 48-slot kWh array}, {customer_id: days covered}),
+    where days covered runs from the customer's first to last reading in
+    the window.
+    """
+    rows = (
+        MeterReading.objects.filter(
+            meter__property__customer_id__in=list(customer_ids),
+            reading_at__gte=since,
+            reading_at__lt=until,
+        )
+        .annotate(
+            hour=ExtractHour("reading_at", tzinfo=dt_timezone.utc),
+            minute=ExtractMinute("reading_at", tzinfo=dt_timezone.utc),
+        )
+        .values("meter__property__customer_id", "hour", "minute")
+        .annotate(mwh=Sum(reading_mwh()), first=Min("reading_at"), last=Max("reading_at"))
+        .order_by()
+    )
+
+    profiles = {}
+    spans = {}
+    for row in rows:
+        cid = str(row["meter__property__customer_id"])
+        if cid not in profiles:
+            profiles[cid] = np.zeros(SLOTS_PER_DAY, dtype=np.int64)
+            spans[cid] = [row["first"], row["last"]]
+        profiles[cid][row["hour"] * 2 + row["minute"] // 30] += row["mwh"] or 0
+        spans[cid][0] = min(spans[cid][0], row["first"])
+        spans[cid][1] = max(spans[cid][1], row["last"])
+
+    days = {cid: (last.date() - first.date()).days + 1 for cid, (first, last) in spans.items()}
+    kwh = {cid: profile / MWH_PER_KWH for cid, profile in profiles.items()}
+    return kwh, days
+
+
+def compare_tariffs(customer_ids, until: datetime | None = None, matrices: dict | None = None) -> list:
+    """
+    Unsaved TariffComparison rows for a chunk of customers.
+
+    Customers with no readings in the lookback window, no current tariff,
+    or no active tariff of their current tariff's fuel are left out.
+    """
+    customer_ids = [str(cid) for cid in customer_ids]
+    until = until or timezone.now()
+    since = until - timedelta(days=LOOKBACK_DAYS)
+    matrices = matrices if matrices is not None else tariff_matrices()
+
+    # ── 1. Usage profiles and current tariffs ───────────────────────────
+    profiles, days = usage_profiles(customer_ids, since, until)
+    today = timezone.localdate(until)
+    assignments = resolve_assignments(profiles, today, today)
+    compiled_current = get_compiled_tariffs({a.tariff for a in assignments.values()})
+
+    # ── 2. One matrix product per fuel ──────────────────────────────────
+    by_fuel = defaultdict(list)
+    for cid, assignment in assignments.items():
+        fuel = compiled_current[assignment.tariff_id].fuel_type
+        if fuel in matrices:
+            by_fuel[fuel].append(cid)
+
+    comparisons = []
+    for fuel, cids in by_fuel.items():
+        matrix = matrices[fuel]
+        scale = np.array([DAYS_PER_YEAR / days[cid] for cid in cids])
+        annual_kwh = np.vstack([profiles[cid] for cid in cids]) * scale[:, None]
+        costs = annual_kwh @ matrix.rates + matrix.standing
+
+        # A current tariff that is no longer active is priced on its own
+        retired = {}
+        for cid in cids:
+            tariff_id = assignments[cid].tariff_id
+            if tariff_id not in matrix.columns and tariff_id not in retired:
+                current = compiled_current[tariff_id]
+                retired[tariff_id] = (_price_vector(current), float(current.standing_charge_pence) * DAYS_PER_YEAR)
+
+        # ── 3. Best alternative per customer ────────────────────────────
+        best = costs.argmin(axis=1)
+        for row, cid in enumerate(cids):
+            tariff_id = assignments[cid].tariff_id
+            column = matrix.columns.get(tariff_id)
+            if column is not None:
+                current_cost = costs[row, column]
+            else:
+                rates, standing = retired[tariff_id]
+                current_cost = annual_kwh[row] @ rates + standing
+            best_cost = costs[row, best[row]]
+            best_tariff = matrix.tariffs[best[row]]
+
+            comparisons.append(TariffComparison(
+                customer_id=cid,
+                current_tariff_id=tariff_id,
+                best_tariff_id=best_tariff.tariff_id,
+                annual_kwh=round(float(annual_kwh[row].sum()), 2),
+                current_annual_cost_pence=max(round(current_cost), 0),
+                best_annual_cost_pence=max(round(best_cost), 0),
+                annual_saving_pence=max(round(current_cost - best_cost), 0),
+                costs=[
+                    {"tariff": str(t.tariff_id), "code": t.code, "name": t.name,
+                     "annual_cost_pence": round(costs[row, i])}
+                    for i, t in sorted(enumerate(matrix.tariffs), key=lambda c: costs[row, c[0]])
+                ],
+                window_start=since.date(),
+                window_end=until.date(),
+                days_observed=days[cid],
+            ))
+    return comparisons
+
+
+def refresh_tariff_comparisons(customer_ids=None, chunk_size: int = COMPARISON_CHUNK_SIZE) -> dict:
+    """
+    Recompute and store tariff comparisons for the whole book (or the
+    given customers), chunk by chunk.
+    """
+    if customer_ids is None:
+        customer_ids = Customer.objects.order_by("pk").values_list("pk", flat=True)
+    customer_ids = [str(cid) for cid in customer_ids]
+
+    until = timezone.now()
+    matrices = tariff_matrices()
+    stored = 0
+    for offset in range(0, len(customer_ids), chunk_size):
+        chunk = customer_ids[offset:offset + chunk_size]
+        comparisons = compare_tariffs(chunk, until=until, matrices=matrices)
+        for comparison in comparisons:
+            comparison.computed_at = until
+
+        TariffComparison.objects.bulk_create(
+            comparisons,
+            update_conflicts=True,
+            unique_fields=["customer"],
+            update_fields=[
+                "current_tariff", "best_tariff", "annual_kwh", "current_annual_cost_pence",
+                "best_annual_cost_pence", "annual_saving_pence", "costs",
+                "window_start", "window_end", "days_observed", "computed_at",
+            ],
+        )
+        compared = {c.customer_id for c in comparisons}
+        TariffComparison.objects.filter(customer_id__in=[c for c in chunk if c not in compared]).delete()
+        stored += len(comparisons)
+
+    logger.info("Tariff comparisons refreshed: %d of %d customers", stored, len(customer_ids))
+    return {"customers": len(customer_ids), "compared": stored}
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0002_customer_user'),
+        ('recommendations', '0001_initial'),
+        ('tariffs', '0002_tariff_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TariffComparison',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('annual_kwh', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('current_annual_cost_pence', models.PositiveIntegerField()),
+                ('best_annual_cost_pence', models.PositiveIntegerField()),
+                ('annual_saving_pence', models.PositiveIntegerField(default=0, help_text="Current annual cost minus the cheapest tariff's")),
+                ('costs', models.JSONField(default=list, help_text='Annual cost on each active tariff, cheapest first')),
+                ('window_start', models.DateField()),
+                ('window_end', models.DateField()),
+                ('days_observed', models.PositiveIntegerField()),
+                ('computed_at', models.DateTimeField()),
+                ('best_tariff', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='tariffs.tariff')),
+                ('current_tariff', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='tariffs.tariff')),
+                ('customer', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='tariff_comparison', to='customers.customer')),
+            ],
+            options={
+                'ordering': ['-annual_saving_pence'],
+            },
+        ),
+    ]
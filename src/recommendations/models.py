@@ -46,3 +46,45 @@ class Recommendation(models.Model):
     @property
     def estimated_saving_pounds(self):
         return self.estimated_saving_pence / 100
+
+
+class TariffComparison(models.Model):
+    """
+    A customer's annualised usage priced on every active tariff of their
+    fuel, refreshed in bulk by recommendations.comparison.
+    """
+
+    customer = models.OneToOneField(
+        Customer, on_delete=models.CASCADE, related_name="tariff_comparison"
+    )
+    current_tariff = models.ForeignKey(
+        "tariffs.Tariff", on_delete=models.CASCADE, related_name="+"
+    )
+    best_tariff = models.ForeignKey(
+        "tariffs.Tariff", on_delete=models.CASCADE, related_name="+"
+    )
+    annual_kwh = models.DecimalField(max_digits=12, decimal_places=2)
+    current_annual_cost_pence = models.PositiveIntegerField()
+    best_annual_cost_pence = models.PositiveIntegerField()
+    annual_saving_pence = models.PositiveIntegerField(
+        default=0,
+        help_text="Current annual cost minus the cheapest tariff's",
+    )
+    costs = models.JSONField(
+        default=list,
+        help_text="Annual cost on each active tariff, cheapest first",
+    )
+    window_start = models.DateField()
+    window_end = models.DateField()
+    days_observed = models.PositiveIntegerField()
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ["-annual_saving_pence"]
+
+    def __str__(self):
+        return f"{self.customer.account_number}: save {self.annual_saving_pence}p/yr"
+
+    @property
+    def is_on_best_tariff(self):
+        return self.current_tariff_id == self.best_tariff_id
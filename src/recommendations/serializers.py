@@ -1,6 +1,6 @@
 from rest_framework import serializers
 
-from .models import Recommendation
+from .models import Recommendation, TariffComparison
 
 
 class RecommendationSerializer(serializers.ModelSerializer):
@@ -22,3 +22,25 @@ class RecommendationSerializer(serializers.ModelSerializer):
 
 class GenerateRecommendationsSerializer(serializers.Serializer):
     customer_id = serializers.UUIDField()
+
+
+class TariffComparisonSerializer(serializers.ModelSerializer):
+    customer_account = serializers.CharField(source="customer.account_number", read_only=True)
+    current_tariff_code = serializers.CharField(source="current_tariff.code", read_only=True)
+    best_tariff_code = serializers.CharField(source="best_tariff.code", read_only=True)
+    best_tariff_name = serializers.CharField(source="best_tariff.name", read_only=True)
+    annual_saving_pounds = serializers.SerializerMethodField()
+
+    class Meta:
+        model = TariffComparison
+        fields = [
+            "customer", "customer_account", "current_tariff", "current_tariff_code",
+            "best_tariff", "best_tariff_code", "best_tariff_name", "is_on_best_tariff",
+            "annual_kwh", "current_annual_cost_pence", "best_annual_cost_pence",
+            "annual_saving_pence", "annual_saving_pounds", "costs",
+            "window_start", "window_end", "days_observed", "computed_at",
+        ]
+        read_only_fields = fields
+
+    def get_annual_saving_pounds(self, obj):
+        return f"{obj.annual_saving_pence / 100:.2f}"
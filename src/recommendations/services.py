@@ -12,9 +12,9 @@ from django.db.models import Avg, Sum
 
 from customers.models import Customer
 from metering.models import MeterReading
-from tariffs.models import CustomerTariff, RateBand, Tariff
 
-from .models import Recommendation
+from .comparison import refresh_tariff_comparisons
+from .models import Recommendation, TariffComparison
 
 logger = logging.getLogger(__name__)
 
@@ -24,7 +24,7 @@ def generate_recommendations(customer_id: str) -> list[Recommendation]:
     Analyse a customer's usage and tariff, then generate recommendations.
 
     Checks:
-    1. High off-peak usage → suggest time-of-use tariff
+    1. A cheaper active tariff for their usage → suggest switching
     2. High peak usage → suggest peak shifting
     3. Overall high usage → general reduction tips
     4. No smart meter → suggest smart meter upgrade
@@ -63,59 +63,41 @@ def generate_recommendations(customer_id: str) -> list[Recommendation]:
         reading_at__hour__lt=20,
     ).aggregate(total=Sum("value_kwh"))["total"] or Decimal("0")
 
-    # Check off-peak usage (00:00–07:00)
-    offpeak_kwh = readings.filter(
-        reading_at__hour__lt=7,
-    ).aggregate(total=Sum("value_kwh"))["total"] or Decimal("0")
-
     peak_ratio = float(peak_kwh / total_kwh) if total_kwh > 0 else 0
-    offpeak_ratio = float(offpeak_kwh / total_kwh) if total_kwh > 0 else 0
 
-    # ── 2. Get current tariff ───────────────────────────────────────────
-    assignment = (
-        CustomerTariff.objects.filter(customer=customer)
-        .select_related("tariff")
-        .order_by("-effective_from")
+    # ── 2. Tariff comparison ────────────────────────────────────────────
+    comparison = (
+        TariffComparison.objects.filter(customer=customer)
+        .select_related("current_tariff", "best_tariff")
         .first()
     )
-    current_tariff = assignment.tariff if assignment else None
+    if comparison is None:
+        refresh_tariff_comparisons([customer.pk])
+        comparison = (
+            TariffComparison.objects.filter(customer=customer)
+            .select_related("current_tariff", "best_tariff")
+            .first()
+        )
 
     # ── 3. Generate recommendations ─────────────────────────────────────
 
-    # High off-peak usage on a flat tariff → suggest time-of-use
-    if current_tariff and current_tariff.tariff_type != "time_of_use" and offpeak_ratio > 0.2:
-        tou_tariffs = Tariff.objects.filter(
-            tariff_type="time_of_use",
-            fuel_type=current_tariff.fuel_type,
-            is_active=True,
-        ).first()
-
-        if tou_tariffs:
-            # Estimate savings: off-peak kWh × (current rate - off-peak rate)
-            current_rate = RateBand.objects.filter(tariff=current_tariff).first()
-            offpeak_rate = RateBand.objects.filter(
-                tariff=tou_tariffs, label__icontains="off"
-            ).first()
-
-            if current_rate and offpeak_rate:
-                monthly_saving = float(offpeak_kwh) * float(
-                    current_rate.rate_pence_per_kwh - offpeak_rate.rate_pence_per_kwh
-                )
-                annual_saving = max(int(monthly_saving * 12), 0)
-
-                recommendations.append(Recommendation(
-                    customer=customer,
-                    category="tariff_switch",
-                    priority="high",
-                    title=f"Switch to {tou_tariffs.name}",
-                    description=(
-                        f"You use {offpeak_ratio:.0%} of your energy during off-peak hours. "
-                        f"Switching to {tou_tariffs.name} could save you approximately "
-                        f"£{annual_saving / 100:.2f}/year with its lower off-peak rate of "
-                        f"{offpeak_rate.rate_pence_per_kwh}p/kWh."
-                    ),
-                    estimated_saving_pence=annual_saving,
-                ))
+    # A cheaper tariff for this customer's usage → suggest switching
+    if comparison and not comparison.is_on_best_tariff and comparison.annual_saving_pence > 0:
+        best = comparison.best_tariff
+        recommendations.append(Recommendation(
+            customer=customer,
+            category="tariff_switch",
+            priority="high",
+            title=f"Switch to {best.name}",
+            description=(
+                f"Based on your last {comparison.days_observed} days of usage, switching from "
+                f"{comparison.current_tariff.name} to {best.name} could save you approximately "
+                f"£{comparison.annual_saving_pence / 100:.2f}/year "
+                f"(£{comparison.best_annual_cost_pence / 100:.2f} instead of "
+                f"£{comparison.current_annual_cost_pence / 100:.2f})."
+            ),
+            estimated_saving_pence=comparison.annual_saving_pence,
+        ))
 
     # High peak usage → suggest peak shifting
     if peak_ratio > 0.3:
@@ -8,9 +8,17 @@ def generate_recommendations_task(customer_id: str):
     return {"count": len(recs)}
 
 
+@shared_task
+def refresh_tariff_comparisons_task():
+    from recommendations.comparison import refresh_tariff_comparisons
+    return refresh_tariff_comparisons()
+
+
 @shared_task
 def generate_all_recommendations_task():
     from customers.models import Customer
+    from recommendations.comparison import refresh_tariff_comparisons
+    refresh_tariff_comparisons()
     dispatched = 0
     for c in Customer.objects.all():
         generate_recommendations_task.delay(str(c.pk))
@@ -1,12 +1,13 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import GenerateRecommendationsView, RecommendationViewSet
+from .views import GenerateRecommendationsView, RecommendationViewSet, TariffComparisonView
 
 router = DefaultRouter()
 router.register("", RecommendationViewSet, basename="recommendation")
 
 urlpatterns = [
     path("generate/", GenerateRecommendationsView.as_view(), name="generate-recommendations"),
+    path("tariff-comparison/", TariffComparisonView.as_view(), name="tariff-comparison"),
     path("", include(router.urls)),
 ]
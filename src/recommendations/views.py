@@ -1,13 +1,15 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from .models import Recommendation
+from .models import Recommendation, TariffComparison
 from .serializers import (
     GenerateRecommendationsSerializer,
     RecommendationSerializer,
+    TariffComparisonSerializer,
 )
 from .services import generate_recommendations
 
@@ -53,3 +55,26 @@ class GenerateRecommendationsView(APIView):
             RecommendationSerializer(recs, many=True).data,
             status=status.HTTP_201_CREATED,
         )
+
+
+class TariffComparisonView(APIView):
+    """
+    A customer's annual cost on every active tariff of their fuel, and the
+    cheapest alternative. Refreshed nightly for the whole book.
+
+    Customers see their own comparison; staff pass ?customer=<id>.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        comparisons = TariffComparison.objects.select_related("customer", "current_tariff", "best_tariff")
+        try:
+            if request.user.is_staff:
+                comparison = comparisons.get(customer_id=request.query_params.get("customer"))
+            else:
+                comparison = comparisons.get(customer__user=request.user)
+        except (TariffComparison.DoesNotExist, ValueError, DjangoValidationError):
+            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        return Response(TariffComparisonSerializer(comparison).data)
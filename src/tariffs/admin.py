@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import CustomerTariff, RateBand, Tariff
+from .models import CustomerTariff, RateBand, Tariff, TariffUsage, UsageSnapshot
 
 
 class RateBandInline(admin.TabularInline):
@@ -27,3 +27,18 @@ class CustomerTariffAdmin(admin.ModelAdmin):
     list_display = ("customer", "tariff", "effective_from", "effective_to")
     list_filter = ("effective_from",)
     raw_id_fields = ("customer", "tariff")
+
+
+class TariffUsageInline(admin.TabularInline):
+    model = TariffUsage
+    extra = 0
+    fields = ("tariff", "tariff_version", "band_ids")
+    readonly_fields = fields
+    can_delete = False
+
+
+@admin.register(UsageSnapshot)
+class UsageSnapshotAdmin(admin.ModelAdmin):
+    list_display = ("period_start", "period_end", "customers", "built_at")
+    readonly_fields = ("period_start", "period_end", "customers", "built_at")
+    inlines = [TariffUsageInline]
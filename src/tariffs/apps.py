@@ -5,3 +5,5 @@ class TariffsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "tariffs"
 
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,111 @@
+"""
+Bulk CustomerTariff resolution.
+
+assignments_overlapping(customer_ids, range_start, range_end)
+  → {customer_id: [CustomerTariff, newest first]} in one query.
+select_assignment(assignments, period_start, period_end)
+  → the assignment billing uses for a period.
+resolve_assignments(customer_ids, period_start, period_end, resolver=None)
+  → {customer_id: CustomerTariff} for every customer with one.
+
+AssignmentResolver caches each customer's assignments over the widest
+date range loaded so far, so a job that resolves the same customers for
+several periods (backfills, rebilling, accrual reconciliation) queries
+them once. Create one per run; it never sees later changes.
+
+Lookups are served by the (customer, -effective_from) index on
+CustomerTariff and return the tariff joined in, so compiling the
+resolved tariffs costs no further Tariff query.
+"""
+
+from collections import defaultdict
+from datetime import date
+
+from django.db.models import Q
+
+from .models import CustomerTariff
+
+
+def assignments_overlapping(customer_ids, range_start: date, range_end: date) -> dict:
+    """All assignments overlapping a date range, newest first, per customer."""
+    by_customer = defaultdict(list)
+    rows = (
+        CustomerTariff.objects.filter(
+            customer_id__in=[str(cid) for cid in customer_ids],
+            effective_from__lte=range_end,
+        )
+        .filter(Q(effective_to__isnull=True) | Q(effective_to__gte=range_start))
+        .select_related("tariff")
+        .order_by("customer_id", "-effective_from")
+    )
+    for assignment in rows:
+        by_customer[str(assignment.customer_id)].append(assignment)
+    return by_customer
+
+
+def select_assignment(assignments, period_start: date, period_end: date):
+    """
+    Pick the assignment generate_bill would use for a period.
+
+    assignments must be newest first. An open-ended assignment starting on
+    or before the period end wins; otherwise the latest assignment
+    overlapping the period is used.
+    """
+    overlapping = None
+    for assignment in assignments:
+        if assignment.effective_from > period_end:
+            continue
+        if assignment.effective_to is None:
+            return assignment
+        if overlapping is None and assignment.effective_to >= period_start:
+            overlapping = assignment
+    return overlapping
+
+
+class AssignmentResolver:
+    """Per-run cache of customers' tariff assignments."""
+
+    def __init__(self):
+        self._assignments = {}  # customer_id → [CustomerTariff, newest first]
+        self._ranges = {}       # customer_id → (range_start, range_end) loaded
+
+    def overlapping(self, customer_ids, range_start: date, range_end: date) -> dict:
+        """As assignments_overlapping(), querying only customers not yet loaded for the range."""
+        customer_ids = [str(cid) for cid in customer_ids]
+        missing = defaultdict(list)
+        for cid in customer_ids:
+            loaded = self._ranges.get(cid)
+            if loaded is None or not (loaded[0] <= range_start and range_end <= loaded[1]):
+                lo, hi = (range_start, range_end) if loaded is None else (
+                    min(loaded[0], range_start), max(loaded[1], range_end)
+                )
+                missing[(lo, hi)].append(cid)
+
+        for (lo, hi), cids in missing.items():
+            fetched = assignments_overlapping(cids, lo, hi)
+            for cid in cids:
+                self._assignments[cid] = fetched.get(cid, [])
+                self._ranges[cid] = (lo, hi)
+
+        result = {}
+        for cid in customer_ids:
+            assignments = [
+                a for a in self._assignments[cid]
+                if a.effective_from <= range_end and (a.effective_to is None or a.effective_to >= range_start)
+            ]
+            if assignments:
+                result[cid] = assignments
+        return result
+
+    def resolve(self, customer_ids, period_start: date, period_end: date) -> dict:
+        resolved = {}
+        for cid, assignments in self.overlapping(customer_ids, period_start, period_end).items():
+            assignment = select_assignment(assignments, period_start, period_end)
+            if assignment is not None:
+                resolved[cid] = assignment
+        return resolved
+
+
+def resolve_assignments(customer_ids, period_start: date, period_end: date, resolver=None) -> dict:
+    """The active CustomerTariff per customer for a period, in at most one query."""
+    return (resolver or AssignmentResolver()).resolve(customer_ids, period_start, period_end)
@@ -0,0 +1,204 @@
+"""
+Tariff catalogue cache.
+
+Two tiers: an in-process LRU in front of the shared (Redis) CACHES
+backend. It holds the serialized tariff API responses and, through
+tariffs.lookup, compiled tariffs.
+
+catalogue_response(key, build)  → cached serialized response for the
+                                  current catalogue generation
+invalidate_catalogue()          → bump the generation (tariffs.signals
+                                  calls this on Tariff/RateBand changes)
+cache_stats()                   → hit/miss counters per cache
+
+Catalogue entries are keyed by a generation number kept in the shared
+cache, so an invalidation in any process retires every cached response
+everywhere. Other processes check the generation at most every
+GENERATION_CHECK_SECONDS, so they may serve the previous catalogue for
+that long. Compiled tariffs need no invalidation: they are keyed by
+Tariff.version, which tariffs.lookup always reads from the database.
+
+Hit and miss counts are kept per process and added to shared counters
+every STATS_FLUSH_EVERY lookups.
+"""
+
+import logging
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+CATALOGUE_PREFIX = "tariffs:catalogue"
+GENERATION_KEY = f"{CATALOGUE_PREFIX}:generation"
+STATS_PREFIX = "tariffs:cache-stats"
+CATALOGUE_TIMEOUT = 60 * 60
+GENERATION_CHECK_SECONDS = 2
+STATS_FLUSH_EVERY = 100
+
+EVENTS = ("local_hit", "shared_hit", "miss")
+
+
+class _Stats:
+    """Per-process hit/miss counters, periodically added to the shared cache."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.process = Counter()
+        self._unflushed = Counter()
+
+    def record(self, name: str, event: str, count: int = 1) -> None:
+        with self._lock:
+            self.process[f"{name}.{event}"] += count
+            self._unflushed[f"{name}.{event}"] += count
+            if sum(self._unflushed.values()) < STATS_FLUSH_EVERY:
+                return
+            pending, self._unflushed = self._unflushed, Counter()
+        self._flush(pending)
+
+    def _flush(self, pending: Counter) -> None:
+        try:
+            for key, count in pending.items():
+                shared_key = f"{STATS_PREFIX}:{key}"
+                if not cache.add(shared_key, count, timeout=None):
+                    cache.incr(shared_key, count)
+        except Exception as exc:
+            logger.warning("Tariff cache stats not recorded: %s", exc)
+
+    def shared(self, names) -> Counter:
+        keys = {f"{STATS_PREFIX}:{name}.{event}": f"{name}.{event}" for name in names for event in EVENTS}
+        try:
+            values = cache.get_many(list(keys))
+        except Exception as exc:
+            logger.warning("Tariff cache stats unavailable: %s", exc)
+            values = {}
+        with self._lock:
+            totals = Counter(self._unflushed)
+        for key, count in values.items():
+            totals[keys[key]] += count
+        return totals
+
+
+stats = _Stats()
+
+
+class TieredCache:
+    """In-process LRU in front of the shared cache, counting hits and misses."""
+
+    def __init__(self, name: str, size: int, timeout: int):
+        self.name = name
+        self.size = size
+        self.timeout = timeout
+        self._local: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys) -> dict:
+        """Cached values for whichever keys are cached, in either tier."""
+        found = {}
+        with self._lock:
+            for key in keys:
+                if key in self._local:
+                    self._local.move_to_end(key)
+                    found[key] = self._local[key]
+        missing = [key for key in keys if key not in found]
+        if found:
+            stats.record(self.name, "local_hit", len(found))
+
+        if missing:
+            try:
+                shared = cache.get_many(missing)
+            except Exception as exc:
+                logger.warning("Tariff cache %s unavailable: %s", self.name, exc)
+                shared = {}
+            self._local_set_many(shared)
+            found.update(shared)
+            if shared:
+                stats.record(self.name, "shared_hit", len(shared))
+            if len(missing) > len(shared):
+                stats.record(self.name, "miss", len(missing) - len(shared))
+        return found
+
+    def set_many(self, values: dict) -> None:
+        self._local_set_many(values)
+        try:
+            cache.set_many(values, self.timeout)
+        except Exception as exc:
+            logger.warning("Tariff cache %s unavailable: %s", self.name, exc)
+
+    def get_or_build(self, key: str, build):
+        found = self.get_many([key])
+        if key in found:
+            return found[key]
+        value = build()
+        self.set_many({key: value})
+        return value
+
+    def clear_local(self) -> None:
+        with self._lock:
+            self._local.clear()
+
+    def _local_set_many(self, values: dict) -> None:
+        with self._lock:
+            for key, value in values.items():
+                self._local[key] = value
+                self._local.move_to_end(key)
+            while len(self._local) > self.size:
+                self._local.popitem(last=False)
+
+
+entries = TieredCache("catalogue", size=128, timeout=CATALOGUE_TIMEOUT)
+
+# ---------------------------------------------------------------------------
+# Generations
+# ---------------------------------------------------------------------------
+_generation = {"value": None, "checked_at": 0.0}
+
+
+def _current_generation() -> int:
+    now = time.monotonic()
+    if _generation["value"] is not None and now - _generation["checked_at"] < GENERATION_CHECK_SECONDS:
+        return _generation["value"]
+    try:
+        value = cache.get_or_set(GENERATION_KEY, 1, timeout=None)
+    except Exception as exc:
+        logger.warning("Tariff catalogue generation unavailable: %s", exc)
+        value = _generation["value"] or 1
+    if value != _generation["value"]:
+        entries.clear_local()
+    _generation.update(value=value, checked_at=now)
+    return value
+
+
+def invalidate_catalogue() -> None:
+    """Retire every cached catalogue entry, in this process and all others."""
+    try:
+        if not cache.add(GENERATION_KEY, 2, timeout=None):
+            cache.incr(GENERATION_KEY)
+    except Exception as exc:
+        logger.warning("Tariff catalogue generation not bumped: %s", exc)
+    entries.clear_local()
+    _generation.update(value=None, checked_at=0.0)
+
+
+def catalogue_response(key: str, build):
+    """The serialized response cached under key, building it on a miss."""
+    return entries.get_or_build(f"{CATALOGUE_PREFIX}:{_current_generation()}:{key}", build)
+
+
+def cache_stats() -> dict:
+    """Hit/miss counters for this process and across all processes."""
+    names = ("catalogue", "compiled")
+    process = dict(stats.process)
+    total = stats.shared(names)
+    result = {}
+    for name in names:
+        counts = {event: total.get(f"{name}.{event}", 0) for event in EVENTS}
+        lookups = sum(counts.values())
+        result[name] = {
+            **counts,
+            "hit_ratio": round((lookups - counts["miss"]) / lookups, 4) if lookups else None,
+            "process": {event: process.get(f"{name}.{event}", 0) for event in EVENTS},
+        }
+    return result
@@ -0,0 +1,236 @@
+"""
+Compiled rate-band lookup tables.
+
+A tariff is compiled once into a minute-of-day table that maps straight to
+a band index, so matching a reading to its band is a single array lookup
+instead of a scan over the RateBand list with midnight-wrap handling.
+
+get_compiled_tariff(tariff)  → CompiledTariff
+get_compiled_tariffs(ids)    → {tariff_id: CompiledTariff}
+
+Compiled tariffs are cached in-process and in the default (Redis) cache
+(see tariffs.catalogue), keyed by tariff id and Tariff.version, which
+tariffs.signals bumps whenever the tariff or one of its rate bands changes.
+
+Band membership is evaluated on the UTC wall-clock time of a reading, which
+is what billing has always matched on (readings come back from the database
+as UTC datetimes).
+"""
+
+import logging
+from dataclasses import dataclass
+from functools import cached_property
+from datetime import datetime, time as dtime, timezone as dt_timezone
+from decimal import Decimal
+
+import numpy as np
+
+from .catalogue import TieredCache
+from .models import RateBand, Tariff
+
+logger = logging.getLogger(__name__)
+
+MINUTES_PER_DAY = 1440
+SLOTS_PER_DAY = 48
+NO_BAND = 255  # only used when a tariff has no rate bands at all
+
+CACHE_PREFIX = "tariffs:compiled"
+CACHE_TIMEOUT = 60 * 60 * 24
+LOCAL_CACHE_SIZE = 256
+
+
+@dataclass(frozen=True)
+class CompiledBand:
+    id: int
+    label: str
+    rate_pence_per_kwh: Decimal
+
+
+class CompiledTariff:
+    """Immutable, picklable snapshot of a tariff and its band lookup table."""
+
+    def __init__(
+        self,
+        tariff_id,
+        version: int,
+        name: str,
+        code: str,
+        fuel_type: str,
+        tariff_type: str,
+        standing_charge_pence: Decimal,
+        bands: tuple[CompiledBand, ...],
+        minute_bands: bytes,
+    ):
+        self.tariff_id = tariff_id
+        self.version = version
+        self.name = name
+        self.code = code
+        self.fuel_type = fuel_type
+        self.tariff_type = tariff_type
+        self.standing_charge_pence = standing_charge_pence
+        self.bands = bands
+        self.minute_bands = minute_bands
+        self._table = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_table"] = None
+        return state
+
+    def __repr__(self):
+        return f"<CompiledTariff {self.code} v{self.version} ({len(self.bands)} bands)>"
+
+    @property
+    def is_time_of_use(self) -> bool:
+        """True when readings must be split across bands (mirrors billing)."""
+        return self.tariff_type == "time_of_use" and len(self.bands) > 1
+
+    @cached_property
+    def rates_micropence(self) -> tuple[int, ...]:
+        """Band unit rates as integer micro-pence per kWh (see billing.fixedpoint)."""
+        return tuple(int(b.rate_pence_per_kwh.scaleb(6)) for b in self.bands)
+
+    @cached_property
+    def standing_charge_micropence(self) -> int:
+        return int(Decimal(self.standing_charge_pence).scaleb(6))
+
+    @property
+    def table(self) -> np.ndarray:
+        """Minute-of-day → band index, as a read-only uint8 array."""
+        if self._table is None:
+            self._table = np.frombuffer(self.minute_bands, dtype=np.uint8)
+        return self._table
+
+    def band_index(self, when: datetime | dtime) -> int:
+        """Band index for a single timestamp or time of day."""
+        if isinstance(when, datetime):
+            if when.tzinfo is not None:
+                when = when.astimezone(dt_timezone.utc)
+            when = when.time()
+        return self.minute_bands[when.hour * 60 + when.minute]
+
+    def band_for(self, when: datetime | dtime) -> CompiledBand | None:
+        idx = self.band_index(when)
+        return None if idx == NO_BAND else self.bands[idx]
+
+    def band_indices(self, timestamps: np.ndarray) -> np.ndarray:
+        """
+        Vectorised band lookup.
+
+        Accepts int64 epoch seconds or a datetime64 array (naive values are
+        taken as UTC) and returns an array of band indices.
+        """
+        ts = np.asarray(timestamps)
+        if ts.dtype.kind == "M":
+            ts = ts.astype("datetime64[s]").astype(np.int64)
+        minutes = (ts // 60) % MINUTES_PER_DAY
+        return self.table[minutes]
+
+    def half_hour_bands(self) -> np.ndarray:
+        """Band index at the start of each of the 48 half-hour slots."""
+        return self.table[::30].copy()
+
+    def half_hour_rates(self) -> np.ndarray:
+        """Unit rate (pence/kWh) at the start of each half-hour slot."""
+        rates = np.array([float(b.rate_pence_per_kwh) for b in self.bands] or [0.0])
+        idx = self.half_hour_bands()
+        idx[idx == NO_BAND] = 0
+        return rates[idx]
+
+
+def compile_tariff(tariff: Tariff, rate_bands: list[RateBand]) -> CompiledTariff:
+    """Build the minute-of-day table for a tariff from its ordered rate bands."""
+    table = bytearray(MINUTES_PER_DAY)
+    for minute in range(MINUTES_PER_DAY):
+        table[minute] = _scan_rate_bands(dtime(minute // 60, minute % 60), rate_bands)
+
+    return CompiledTariff(
+        tariff_id=tariff.pk,
+        version=tariff.version,
+        name=tariff.name,
+        code=tariff.code,
+        fuel_type=tariff.fuel_type,
+        tariff_type=tariff.tariff_type,
+        standing_charge_pence=tariff.standing_charge_pence,
+        bands=tuple(
+            CompiledBand(id=rb.id, label=rb.label, rate_pence_per_kwh=rb.rate_pence_per_kwh)
+            for rb in rate_bands
+        ),
+        minute_bands=bytes(table),
+    )
+
+
+def _scan_rate_bands(reading_time: dtime, rate_bands: list[RateBand]) -> int:
+    """Index of the band a time of day falls in (first match wins)."""
+    for idx, rb in enumerate(rate_bands):
+        if rb.start_time is None:
+            return idx  # Flat-rate fallback
+
+        end_time = rb.end_time or dtime.max
+        # Handle overnight bands (e.g. 20:00 → 00:00)
+        if rb.start_time <= end_time:
+            if rb.start_time <= reading_time < end_time:
+                return idx
+        else:
+            # Wraps midnight
+            if reading_time >= rb.start_time or reading_time < end_time:
+                return idx
+
+    # Fallback to first band
+    return 0 if rate_bands else NO_BAND
+
+
+# ---------------------------------------------------------------------------
+# Caching
+# ---------------------------------------------------------------------------
+compiled_cache = TieredCache("compiled", size=LOCAL_CACHE_SIZE, timeout=CACHE_TIMEOUT)
+
+
+def _cache_key(tariff_id, version: int) -> str:
+    return f"{CACHE_PREFIX}:{tariff_id}:{version}"
+
+
+def get_compiled_tariff(tariff) -> CompiledTariff:
+    """Compiled lookup for a Tariff instance or primary key."""
+    compiled = get_compiled_tariffs([tariff])
+    if not compiled:
+        raise Tariff.DoesNotExist(f"Tariff {tariff} not found")
+    return next(iter(compiled.values()))
+
+
+def get_compiled_tariffs(tariffs) -> dict:
+    """
+    Compiled lookups for many tariffs at once.
+
+    Accepts Tariff instances and/or primary keys. Versions are read from
+    the database (one small values_list query), never from a cache or an
+    instance that may predate a change, so a change is seen at once, even
+    inside the transaction that made it; at most one more query for the
+    tariff rows and one RateBand query for whatever is not already cached.
+    """
+    instances = {t.pk: t for t in tariffs if isinstance(t, Tariff)}
+    ids = {Tariff._meta.pk.to_python(t) for t in tariffs if not isinstance(t, Tariff)} | set(instances)
+    versions = dict(Tariff.objects.filter(pk__in=ids).order_by().values_list("pk", "version"))
+    # An instance loaded before its current version is compiled from fresh rows
+    instances = {pk: t for pk, t in instances.items() if versions.get(pk) == t.version}
+
+    keys = {_cache_key(tariff_id, version): tariff_id for tariff_id, version in versions.items()}
+    result = {keys[key]: compiled for key, compiled in compiled_cache.get_many(list(keys)).items()}
+
+    missing = set(versions) - set(result)
+    if missing:
+        need_rows = missing - set(instances)
+        if need_rows:
+            instances.update(Tariff.objects.in_bulk(need_rows))
+        bands_by_tariff = {tariff_id: [] for tariff_id in missing if tariff_id in instances}
+        for rb in RateBand.objects.filter(tariff_id__in=bands_by_tariff).order_by("start_time", "id"):
+            bands_by_tariff[rb.tariff_id].append(rb)
+
+        fresh = {}
+        for tariff_id, rate_bands in bands_by_tariff.items():
+            compiled = compile_tariff(instances[tariff_id], rate_bands)
+            fresh[_cache_key(tariff_id, compiled.version)] = compiled
+            result[tariff_id] = compiled
+        compiled_cache.set_many(fresh)
+
+    return result
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tariffs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tariff',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False, help_text='Bumped whenever the tariff or its rate bands change'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:16
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tariffs', '0002_tariff_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UsageSnapshot',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('period_start', models.DateField()),
+                ('period_end', models.DateField()),
+                ('customers', models.PositiveIntegerField(default=0)),
+                ('built_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['-period_start'],
+                'constraints': [models.UniqueConstraint(fields=('period_start', 'period_end'), name='unique_usage_snapshot_period')],
+            },
+        ),
+        migrations.CreateModel(
+            name='TariffUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tariff_version', models.PositiveIntegerField()),
+                ('band_ids', models.JSONField(default=list)),
+                ('customer_ids', models.JSONField(default=list)),
+                ('band_mwh', models.BinaryField()),
+                ('tariff', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='usage_snapshots', to='tariffs.tariff')),
+                ('snapshot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tariff_usage', to='tariffs.usagesnapshot')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('snapshot', 'tariff'), name='unique_tariff_usage')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0002_customer_user'),
+        ('tariffs', '0003_usage_snapshot'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customertariff',
+            index=models.Index(fields=['customer', '-effective_from', 'effective_to'], name='customertariff_resolve_idx'),
+        ),
+    ]
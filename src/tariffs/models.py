@@ -31,6 +31,11 @@ class Tariff(models.Model):
     is_active = models.BooleanField(default=True)
     valid_from = models.DateField()
     valid_to = models.DateField(null=True, blank=True)
+    version = models.PositiveIntegerField(
+        default=1,
+        editable=False,
+        help_text="Bumped whenever the tariff or its rate bands change",
+    )
 
     class Meta:
         ordering = ["-valid_from"]
@@ -76,6 +81,62 @@ class CustomerTariff(models.Model):
 
     class Meta:
         ordering = ["-effective_from"]
+        indexes = [
+            models.Index(
+                fields=["customer", "-effective_from", "effective_to"],
+                name="customertariff_resolve_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.customer.account_number} → {self.tariff.code} (from {self.effective_from})"
+
+
+class UsageSnapshot(models.Model):
+    """
+    Per-customer band usage for a reference billing period, precomputed so
+    price changes can be simulated without touching readings (see
+    tariffs.simulation).
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    period_start = models.DateField()
+    period_end = models.DateField()
+    customers = models.PositiveIntegerField(default=0)
+    built_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-period_start"]
+        constraints = [
+            models.UniqueConstraint(fields=["period_start", "period_end"], name="unique_usage_snapshot_period"),
+        ]
+
+    def __str__(self):
+        return f"Usage {self.period_start}–{self.period_end} ({self.customers} customers)"
+
+
+class TariffUsage(models.Model):
+    """
+    The usage of every customer billed on one tariff in a snapshot, as a
+    customers × bands matrix of mWh (int64, row-major), in the band order
+    of the compiled tariff.
+    """
+
+    snapshot = models.ForeignKey(
+        UsageSnapshot, on_delete=models.CASCADE, related_name="tariff_usage"
+    )
+    tariff = models.ForeignKey(
+        Tariff, on_delete=models.CASCADE, related_name="usage_snapshots"
+    )
+    tariff_version = models.PositiveIntegerField()
+    band_ids = models.JSONField(default=list)
+    customer_ids = models.JSONField(default=list)
+    band_mwh = models.BinaryField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["snapshot", "tariff"], name="unique_tariff_usage"),
+        ]
+
+    def __str__(self):
+        return f"{self.tariff.code}: {len(self.customer_ids)} customers"
@@ -1,6 +1,6 @@
 from rest_framework import serializers
 
-from .models import CustomerTariff, RateBand, Tariff
+from .models import CustomerTariff, RateBand, Tariff, TariffUsage, UsageSnapshot
 
 
 class RateBandSerializer(serializers.ModelSerializer):
@@ -48,3 +48,65 @@ class CustomerTariffSerializer(serializers.ModelSerializer):
             "effective_from", "effective_to",
         ]
         read_only_fields = ["id"]
+
+
+class TariffUsageSerializer(serializers.ModelSerializer):
+    tariff_code = serializers.CharField(source="tariff.code", read_only=True)
+    customers = serializers.SerializerMethodField()
+
+    class Meta:
+        model = TariffUsage
+        fields = ["tariff", "tariff_code", "tariff_version", "band_ids", "customers"]
+        read_only_fields = fields
+
+    def get_customers(self, obj):
+        return len(obj.customer_ids)
+
+
+class UsageSnapshotSerializer(serializers.ModelSerializer):
+    tariff_usage = TariffUsageSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = UsageSnapshot
+        fields = ["id", "period_start", "period_end", "customers", "built_at", "tariff_usage"]
+        read_only_fields = fields
+
+
+class BuildUsageSnapshotSerializer(serializers.Serializer):
+    period_start = serializers.DateField()
+    period_end = serializers.DateField()
+
+    def validate(self, data):
+        if data["period_end"] < data["period_start"]:
+            raise serializers.ValidationError("period_end must be on or after period_start")
+        return data
+
+
+class TariffChangeSerializer(serializers.Serializer):
+    tariff = serializers.PrimaryKeyRelatedField(queryset=Tariff.objects.all())
+    rates = serializers.DictField(
+        child=serializers.DecimalField(max_digits=8, decimal_places=4, min_value=0),
+        required=False,
+        default=dict,
+        help_text="Proposed unit rate per rate band id, in pence/kWh",
+    )
+    standing_charge_pence = serializers.DecimalField(
+        max_digits=8, decimal_places=4, min_value=0, required=False, allow_null=True, default=None,
+    )
+
+
+class SimulatePriceChangeSerializer(serializers.Serializer):
+    changes = TariffChangeSerializer(many=True, allow_empty=False)
+    snapshot = serializers.PrimaryKeyRelatedField(
+        queryset=UsageSnapshot.objects.all(),
+        required=False,
+        allow_null=True,
+        default=None,
+        help_text="Defaults to the latest snapshot",
+    )
+
+    def validate_changes(self, changes):
+        tariffs = [change["tariff"].pk for change in changes]
+        if len(set(tariffs)) != len(tariffs):
+            raise serializers.ValidationError("Each tariff may only be changed once")
+        return changes
@@ -0,0 +1,46 @@
+"""
+Signal handlers keeping Tariff.version in step with its rate bands, and
+the tariff catalogue cache in step with both.
+
+The version is part of the compiled lookup cache key (see tariffs.lookup),
+so bumping it is all that is needed to invalidate a compiled tariff.
+Cached catalogue responses are retired once the change commits.
+"""
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .catalogue import invalidate_catalogue
+from .models import RateBand, Tariff
+
+
+@receiver(pre_save, sender=Tariff)
+def bump_tariff_version(sender, instance, **kwargs):
+    # Incremented in the database: the instance may predate a rate band bump
+    if not instance._state.adding:
+        instance.version = F("version") + 1
+
+
+@receiver(post_save, sender=Tariff)
+def refresh_tariff_version(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        return
+    if update_fields is not None and "version" not in update_fields:
+        Tariff.objects.filter(pk=instance.pk).update(version=F("version") + 1)
+    instance.refresh_from_db(fields=["version"])
+
+
+@receiver(post_save, sender=RateBand)
+@receiver(post_delete, sender=RateBand)
+def bump_version_on_band_change(sender, instance, **kwargs):
+    Tariff.objects.filter(pk=instance.tariff_id).update(version=F("version") + 1)
+
+
+@receiver(post_save, sender=Tariff)
+@receiver(post_delete, sender=Tariff)
+@receiver(post_save, sender=RateBand)
+@receiver(post_delete, sender=RateBand)
+def invalidate_catalogue_on_change(sender, instance, **kwargs):
+    transaction.on_commit(invalidate_catalogue)
@@ -0,0 +1,242 @@
+"""
+Portfolio price-change simulator.
+
+build_usage_snapshot(period_start, period_end)
+  → UsageSnapshot holding every customer's band usage for a reference
+    billing period, grouped by the tariff they were billed on.
+simulate_price_change(changes, snapshot)
+  → revenue and bill-change distribution if the proposed band rates and
+    standing charges had applied to that period.
+
+Revenue figures cover the tariffs being changed; the bill-change
+distribution and the paying more/less counts cover the whole book in the
+snapshot, with customers on other tariffs counted at a change of zero.
+
+The snapshot is built with the batch billing engine (billing.batch), so a
+customer's band usage is exactly what their bill for the period was
+priced on. Each tariff's usage is stored as a customers × bands mWh
+matrix; simulating a change is then two matrix-vector products per
+tariff, at today's and at the proposed rates, over the whole book at once.
+No Bill is ever written.
+
+Costs are computed in floating-point pence, so simulated bills can differ
+from real ones by the per-line rounding to 0.01 p.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import date, timedelta
+
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+
+from billing.batch import calculate_bills
+from billing.fixedpoint import MWH_PER_KWH, kwh_to_mwh
+from customers.models import Customer
+
+from .lookup import get_compiled_tariffs
+from .models import TariffUsage, UsageSnapshot
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_CHUNK_SIZE = 500
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def reference_period(today: date | None = None) -> tuple[date, date]:
+    """The last complete calendar month."""
+    today = today or timezone.localdate()
+    period_end = today.replace(day=1) - timedelta(days=1)
+    return period_end.replace(day=1), period_end
+
+
+def _period_days(period_start: date, period_end: date) -> int:
+    return max((period_end - period_start).days, 1)  # as billing charges standing
+
+
+# ---------------------------------------------------------------------------
+# Snapshots
+# ---------------------------------------------------------------------------
+def build_usage_snapshot(
+    period_start: date,
+    period_end: date,
+    chunk_size: int = SNAPSHOT_CHUNK_SIZE,
+) -> UsageSnapshot:
+    """Compute (or rebuild) the usage snapshot for a period."""
+    customer_ids = [str(pk) for pk in Customer.objects.order_by("pk").values_list("pk", flat=True)]
+
+    # ── 1. Band usage per customer, chunk by chunk ──────────────────────
+    rows = defaultdict(list)  # tariff_id → [(customer_id, [mWh per band])]
+    for offset in range(0, len(customer_ids), chunk_size):
+        calculations, _ = calculate_bills(customer_ids[offset:offset + chunk_size], period_start, period_end)
+        for calc in calculations:
+            rows[calc.tariff_id].append((calc.customer_id, [kwh_to_mwh(kwh) for kwh in calc.band_kwh]))
+
+    # ── 2. One matrix per tariff ─────────────────────────────────────────
+    compiled = get_compiled_tariffs(list(rows))
+    with transaction.atomic():
+        snapshot, _ = UsageSnapshot.objects.update_or_create(
+            period_start=period_start,
+            period_end=period_end,
+            defaults={"customers": sum(len(r) for r in rows.values())},
+        )
+        snapshot.tariff_usage.all().delete()
+        TariffUsage.objects.bulk_create([
+            TariffUsage(
+                snapshot=snapshot,
+                tariff_id=tariff_id,
+                tariff_version=compiled[tariff_id].version,
+                band_ids=[band.id for band in compiled[tariff_id].bands],
+                customer_ids=[cid for cid, _ in tariff_rows],
+                band_mwh=np.array([usage for _, usage in tariff_rows], dtype=np.int64).tobytes(),
+            )
+            for tariff_id, tariff_rows in rows.items()
+        ])
+
+    logger.info(
+        "Usage snapshot %s–%s built: %d customers on %d tariffs",
+        period_start, period_end, snapshot.customers, len(rows),
+    )
+    return snapshot
+
+
+def usage_matrix(usage: TariffUsage) -> np.ndarray:
+    """The snapshot's customers × bands usage for a tariff, in kWh."""
+    mwh = np.frombuffer(bytes(usage.band_mwh), dtype=np.int64)
+    return mwh.reshape(len(usage.customer_ids), -1) / MWH_PER_KWH
+
+
+# ---------------------------------------------------------------------------
+# Simulation
+# ---------------------------------------------------------------------------
+def simulate_price_change(changes: list[dict], snapshot: UsageSnapshot | None = None) -> dict:
+    """
+    Apply proposed prices to a snapshot's usage.
+
+    changes is a list of {"tariff": id, "rates": {band_id: pence/kWh},
+    "standing_charge_pence": pence/day or None}; bands and standing charges
+    left out keep today's price. Raises ValueError if there is no snapshot,
+    a tariff is listed twice, a band does not belong to its tariff, a rate
+    is given for any band but the first of a flat tariff (billing charges
+    all its usage at the first band's rate), or a tariff's bands have
+    changed since the snapshot was built. A tariff edited since then without its
+    bands changing (its version moved on) is simulated with a warning in
+    the result, since band times may have moved usage between bands.
+    """
+    snapshot = snapshot or UsageSnapshot.objects.order_by("-period_start", "-built_at").first()
+    if snapshot is None:
+        raise ValueError("No usage snapshot has been built yet")
+    days = _period_days(snapshot.period_start, snapshot.period_end)
+    if len({str(c["tariff"]) for c in changes}) != len(changes):
+        raise ValueError("Each tariff may only be changed once")
+
+    usage_by_tariff = {
+        str(u.tariff_id): u
+        for u in TariffUsage.objects.filter(snapshot=snapshot, tariff_id__in=[c["tariff"] for c in changes])
+    }
+    compiled = get_compiled_tariffs([c["tariff"] for c in changes])
+    compiled = {str(tariff_id): tariff for tariff_id, tariff in compiled.items()}
+
+    current_bills = []
+    proposed_bills = []
+    tariffs = []
+    warnings = []
+    for change in changes:
+        tariff_id = str(change["tariff"])
+        tariff = compiled.get(tariff_id)
+        if tariff is None:
+            raise ValueError(f"Tariff {tariff_id} not found")
+        usage = usage_by_tariff.get(tariff_id)
+        if usage is None:
+            continue  # nobody was billed on it in the reference period
+        band_ids = [band.id for band in tariff.bands]
+        if usage.band_ids != band_ids:
+            raise ValueError(
+                f"Rate bands of {tariff.code} have changed since the snapshot was built; rebuild it"
+            )
+        if usage.tariff_version != tariff.version:
+            warnings.append(
+                f"{tariff.code} has been edited since the snapshot was built (version "
+                f"{usage.tariff_version} → {tariff.version}); rebuild the snapshot if its band times changed"
+            )
+            logger.warning("Simulating %s against snapshot %s: %s", tariff.code, snapshot.pk, warnings[-1])
+
+        # ── 1. Price vectors, today's and proposed ──────────────────────
+        current_rates = np.array([float(band.rate_pence_per_kwh) for band in tariff.bands])
+        proposed_rates = current_rates.copy()
+        for band_id, rate in change.get("rates", {}).items():
+            try:
+                index = band_ids.index(int(band_id))
+            except ValueError:
+                raise ValueError(f"Rate band {band_id} does not belong to {tariff.code}")
+            if index and not tariff.is_time_of_use:
+                raise ValueError(
+                    f"{tariff.code} is not time-of-use: all usage is charged at its first band's rate"
+                )
+            proposed_rates[index] = float(rate)
+        current_standing = float(tariff.standing_charge_pence)
+        proposed_standing = change.get("standing_charge_pence")
+        proposed_standing = current_standing if proposed_standing is None else float(proposed_standing)
+        if not tariff.is_time_of_use:
+            # billing charges all usage at the first band's rate
+            current_rates[1:] = proposed_rates[1:] = 0.0
+
+        # ── 2. Bills for every customer on the tariff ───────────────────
+        kwh = usage_matrix(usage)
+        current = kwh @ current_rates + days * current_standing
+        proposed = kwh @ proposed_rates + days * proposed_standing
+        current_bills.append(current)
+        proposed_bills.append(proposed)
+        tariffs.append({
+            "tariff": tariff_id,
+            "code": tariff.code,
+            "customers": len(usage.customer_ids),
+            "current_revenue_pence": _pence(current.sum()),
+            "proposed_revenue_pence": _pence(proposed.sum()),
+            "revenue_delta_pence": _pence((proposed - current).sum()),
+        })
+
+    current = np.concatenate(current_bills) if current_bills else np.zeros(0)
+    proposed = np.concatenate(proposed_bills) if proposed_bills else np.zeros(0)
+    delta = proposed - current
+    revenue_delta = delta.sum()
+
+    # ── 3. Distribution of bill changes across the book ─────────────────
+    with np.errstate(divide="ignore", invalid="ignore"):
+        percent = np.where(current > 0, delta / current * 100, np.nan)
+    percent = percent[~np.isnan(percent)]
+    unchanged = np.zeros(max(snapshot.customers - len(delta), 0))
+    book_delta = np.concatenate([delta, unchanged])
+    book_percent = np.concatenate([percent, unchanged])
+
+    return {
+        "snapshot": str(snapshot.pk),
+        "period_start": snapshot.period_start,
+        "period_end": snapshot.period_end,
+        "customers": len(book_delta),
+        "customers_on_changed_tariffs": len(delta),
+        "current_revenue_pence": _pence(current.sum()),
+        "proposed_revenue_pence": _pence(proposed.sum()),
+        "revenue_delta_pence": _pence(revenue_delta),
+        "annualised_revenue_delta_pence": _pence(revenue_delta * 365 / days),
+        "customers_paying_more": int((delta > 0.005).sum()),
+        "customers_paying_less": int((delta < -0.005).sum()),
+        "bill_change_pence": _distribution(book_delta),
+        "bill_change_percent": _distribution(book_percent),
+        "tariffs": tariffs,
+        "warnings": warnings,
+    }
+
+
+def _pence(value) -> float:
+    return round(float(value), 2)
+
+
+def _distribution(values: np.ndarray) -> dict:
+    if not len(values):
+        return {}
+    result = {"mean": _pence(values.mean()), "min": _pence(values.min()), "max": _pence(values.max())}
+    for p, value in zip(PERCENTILES, np.percentile(values, PERCENTILES)):
+        result[f"p{p}"] = _pence(value)
+    return result
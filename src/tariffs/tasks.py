@@ -1,2 +1,20 @@
-# Celery tasks for tariffs
+"""
+Celery tasks for tariffs.
+"""
 
+from datetime import date
+
+from celery import shared_task
+
+
+@shared_task
+def build_usage_snapshot_task(period_start: str | None = None, period_end: str | None = None):
+    """Build the price-simulation usage snapshot (default: last complete month)."""
+    from tariffs.simulation import build_usage_snapshot, reference_period
+
+    if period_start and period_end:
+        start, end = date.fromisoformat(period_start), date.fromisoformat(period_end)
+    else:
+        start, end = reference_period()
+    snapshot = build_usage_snapshot(start, end)
+    return {"snapshot": str(snapshot.pk), "customers": snapshot.customers}
@@ -0,0 +1,120 @@
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.test import TestCase, override_settings
+
+from customers.models import Customer, Meter, Property
+from metering.models import MeterReading
+
+from .lookup import get_compiled_tariff, get_compiled_tariffs
+from .models import CustomerTariff, RateBand, Tariff
+from .serializers import SimulatePriceChangeSerializer
+from .simulation import build_usage_snapshot, simulate_price_change
+
+LOCMEM_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CompiledTariffTests(TestCase):
+    def setUp(self):
+        self.tariff = Tariff.objects.create(
+            name="Flat", code="FLAT-TEST", fuel_type="electricity",
+            standing_charge_pence=Decimal("45.0000"), valid_from=date(2024, 1, 1),
+        )
+        self.band = RateBand.objects.create(tariff=self.tariff, label="Standard", rate_pence_per_kwh=Decimal("24.5000"))
+
+    def test_band_change_is_seen_at_once_by_id(self):
+        self.assertEqual(get_compiled_tariff(self.tariff.pk).bands[0].rate_pence_per_kwh, Decimal("24.5000"))
+
+        # Still inside the test's transaction: no on_commit invalidation has run
+        self.band.rate_pence_per_kwh = Decimal("30.0000")
+        self.band.save()
+
+        self.assertEqual(get_compiled_tariff(self.tariff.pk).bands[0].rate_pence_per_kwh, Decimal("30.0000"))
+        self.assertEqual(
+            get_compiled_tariffs([str(self.tariff.pk)])[self.tariff.pk].bands[0].rate_pence_per_kwh,
+            Decimal("30.0000"),
+        )
+
+    def test_missing_tariff_raises(self):
+        pk = self.tariff.pk
+        self.tariff.delete()
+        with self.assertRaises(Tariff.DoesNotExist):
+            get_compiled_tariff(pk)
+
+    def test_saving_a_stale_instance_bumps_past_a_band_change(self):
+        stale = Tariff.objects.get(pk=self.tariff.pk)
+        self.band.rate_pence_per_kwh = Decimal("30.0000")
+        self.band.save()
+        band_version = Tariff.objects.get(pk=self.tariff.pk).version
+
+        stale.standing_charge_pence = Decimal("50.0000")
+        stale.save()
+
+        self.assertEqual(stale.version, band_version + 1)
+        self.assertEqual(Tariff.objects.get(pk=self.tariff.pk).version, band_version + 1)
+        compiled = get_compiled_tariff(stale)
+        self.assertEqual(compiled.standing_charge_pence, Decimal("50.0000"))
+        self.assertEqual(compiled.bands[0].rate_pence_per_kwh, Decimal("30.0000"))
+
+    def test_stale_instance_is_compiled_from_current_rows(self):
+        stale = Tariff.objects.get(pk=self.tariff.pk)
+        get_compiled_tariff(stale)
+        self.band.rate_pence_per_kwh = Decimal("30.0000")
+        self.band.save()
+
+        self.assertEqual(get_compiled_tariff(stale).bands[0].rate_pence_per_kwh, Decimal("30.0000"))
+
+    def test_update_fields_save_still_bumps_the_version(self):
+        version = Tariff.objects.get(pk=self.tariff.pk).version
+        self.tariff.name = "Renamed"
+        self.tariff.save(update_fields=["name"])
+        self.assertEqual(self.tariff.version, version + 1)
+        self.assertEqual(get_compiled_tariff(self.tariff.pk).name, "Renamed")
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class SimulatePriceChangeTests(TestCase):
+    def setUp(self):
+        # A flat tariff with a second band: billing charges everything at the first
+        self.tariff = Tariff.objects.create(
+            name="Flat", code="FLAT-TEST", fuel_type="electricity", tariff_type="variable",
+            standing_charge_pence=Decimal("45.0000"), valid_from=date(2024, 1, 1),
+        )
+        self.bands = [
+            RateBand.objects.create(tariff=self.tariff, label=label, rate_pence_per_kwh=Decimal(rate))
+            for label, rate in (("Standard", "24.5000"), ("Spare", "10.0000"))
+        ]
+        customer = Customer.objects.create(
+            account_number="GG-TEST-1", first_name="Test", last_name="Customer", email="test1@example.com",
+        )
+        prop = Property.objects.create(
+            customer=customer, address_line_1="1 Test Street", city="London", postcode="SW1A 1AA",
+        )
+        meter = Meter.objects.create(property=prop, mpan="19000000001", serial_number="S1", fuel_type="electricity")
+        CustomerTariff.objects.create(customer=customer, tariff=self.tariff, effective_from=date(2024, 1, 1))
+        start = datetime(2025, 1, 10, tzinfo=dt_timezone.utc)
+        MeterReading.objects.bulk_create(
+            MeterReading(meter=meter, reading_at=start + timedelta(minutes=30 * i), value_kwh=Decimal("0.5000"))
+            for i in range(48)
+        )
+        self.snapshot = build_usage_snapshot(date(2025, 1, 1), date(2025, 1, 31))
+
+    def change(self, band, rate):
+        return {"tariff": self.tariff.pk, "rates": {str(band.pk): Decimal(rate)}}
+
+    def test_first_band_rate_is_simulated(self):
+        result = simulate_price_change([self.change(self.bands[0], "26.5000")], self.snapshot)
+        self.assertEqual(result["revenue_delta_pence"], 48.0)  # 24 kWh × 2p
+
+    def test_a_tariff_listed_twice_is_rejected(self):
+        changes = [self.change(self.bands[0], "26.5000"), self.change(self.bands[0], "28.5000")]
+        serializer = SimulatePriceChangeSerializer(data={"changes": changes})
+        self.assertFalse(serializer.is_valid())
+        self.assertIn("changes", serializer.errors)
+        with self.assertRaisesRegex(ValueError, "only be changed once"):
+            simulate_price_change(changes, self.snapshot)
+
+    def test_rate_for_a_flat_tariffs_second_band_is_rejected(self):
+        with self.assertRaisesRegex(ValueError, "not time-of-use"):
+            simulate_price_change([self.change(self.bands[1], "5.0000")], self.snapshot)
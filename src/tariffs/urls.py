@@ -1,12 +1,21 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import CustomerTariffViewSet, TariffViewSet
+from .views import (
+    CustomerTariffViewSet,
+    SimulatePriceChangeView,
+    TariffCacheStatsView,
+    TariffViewSet,
+    UsageSnapshotViewSet,
+)
 
 router = DefaultRouter()
 router.register("plans", TariffViewSet, basename="tariff")
 router.register("assignments", CustomerTariffViewSet, basename="customer-tariff")
+router.register("usage-snapshots", UsageSnapshotViewSet, basename="usage-snapshot")
 
 urlpatterns = [
+    path("simulate/", SimulatePriceChangeView.as_view(), name="simulate-price-change"),
+    path("cache-stats/", TariffCacheStatsView.as_view(), name="tariff-cache-stats"),
     path("", include(router.urls)),
 ]
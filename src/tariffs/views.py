@@ -1,15 +1,28 @@
-from rest_framework import viewsets
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework import status, viewsets
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-from .models import CustomerTariff, Tariff
+from .models import CustomerTariff, Tariff, UsageSnapshot
 from .serializers import (
+    BuildUsageSnapshotSerializer,
     CustomerTariffSerializer,
+    SimulatePriceChangeSerializer,
     TariffListSerializer,
     TariffSerializer,
+    UsageSnapshotSerializer,
 )
+from .catalogue import cache_stats, catalogue_response
+from .simulation import simulate_price_change
+from .tasks import build_usage_snapshot_task
 
 
 class TariffViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Public tariff catalogue. Serialized responses are served from the
+    catalogue cache, which tariff and rate band changes invalidate.
+    """
+
     queryset = Tariff.objects.prefetch_related("rate_bands").all()
     permission_classes = [AllowAny]
 
@@ -18,6 +31,15 @@ class TariffViewSet(viewsets.ReadOnlyModelViewSet):
             return TariffListSerializer
         return TariffSerializer
 
+    def list(self, request, *args, **kwargs):
+        data = catalogue_response("list", lambda: super(TariffViewSet, self).list(request, *args, **kwargs).data)
+        return Response(data)
+
+    def retrieve(self, request, *args, **kwargs):
+        key = f"detail:{kwargs[self.lookup_field]}"
+        data = catalogue_response(key, lambda: super(TariffViewSet, self).retrieve(request, *args, **kwargs).data)
+        return Response(data)
+
 
 class CustomerTariffViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = CustomerTariffSerializer
@@ -29,3 +51,51 @@ class CustomerTariffViewSet(viewsets.ReadOnlyModelViewSet):
         if user.is_staff:
             return qs
         return qs.filter(customer__user=user)
+
+
+class UsageSnapshotViewSet(viewsets.ReadOnlyModelViewSet):
+    """Inspect and (re)build price-simulation usage snapshots (staff only)."""
+
+    queryset = UsageSnapshot.objects.prefetch_related("tariff_usage__tariff").all()
+    serializer_class = UsageSnapshotSerializer
+    permission_classes = [IsAdminUser]
+
+    def create(self, request):
+        serializer = BuildUsageSnapshotSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        task = build_usage_snapshot_task.delay(
+            serializer.validated_data["period_start"].isoformat(),
+            serializer.validated_data["period_end"].isoformat(),
+        )
+        return Response({"task_id": task.id}, status=status.HTTP_202_ACCEPTED)
+
+
+class SimulatePriceChangeView(APIView):
+    """
+    Revenue and bill impact of proposed rate-band and standing-charge
+    prices, applied to a usage snapshot. Nothing is written.
+    """
+
+    permission_classes = [IsAdminUser]
+
+    def post(self, request):
+        serializer = SimulatePriceChangeSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        changes = [
+            {**change, "tariff": change["tariff"].pk}
+            for change in serializer.validated_data["changes"]
+        ]
+        try:
+            result = simulate_price_change(changes, serializer.validated_data["snapshot"])
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result)
+
+
+class TariffCacheStatsView(APIView):
+    """Hit/miss counters for the tariff catalogue and compiled tariff caches (staff only)."""
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(cache_stats())